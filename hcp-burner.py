@@ -6,18 +6,28 @@ import time
 import importlib
 import threading
 import signal
+import contextlib
 from datetime import datetime, timezone
+from libs import instrumentation
+from libs import polling
 from libs.arguments import Arguments
 from libs.logging import Logging
 from libs.elasticsearch import Elasticsearch
 from libs.utils import Utils
+from libs.executor import AsyncExecutor
+from libs.journal import Journal
 
 if __name__ == "__main__":
     ts_start = time.time()
     arguments = Arguments(os.environ)
     logging = Logging(arguments["log_level"], arguments["log_file"])
-    es = Elasticsearch(logging, arguments["es_url"], arguments["es_index"], arguments["es_insecure"], arguments["es_index_retry"]) if arguments["es_url"] else None
+    es = Elasticsearch(logging, arguments["es_url"], arguments["es_index"], arguments["es_insecure"], arguments["es_index_retry"], arguments["es_bulk_size"], arguments["es_flush_interval"], arguments["es_spill_file"]) if arguments["es_url"] else None
+    if arguments["enable_instrumentation"]:
+        instrumentation.enable(logging)
+    polling.load(logging, arguments["polling_history"])
     utils = Utils(logging)
+    if arguments["subprocess_engine"] == "asyncio":
+        utils.executor = AsyncExecutor(logging, arguments["command_concurrency"], arguments["command_timeout"])
 
     logging.info(f"Detected {arguments['platform']} as platform")
     try:
@@ -42,11 +52,14 @@ if __name__ == "__main__":
         logging.error(err)
         sys.exit("Exiting...")
 
+    utils.journal = Journal(logging, platform.environment["path"])
+
     logging.info(f"Verifying external binaries required by the {arguments['platform']} platform")
     for command in platform.environment["commands"]:
         utils.verify_cmnd(command)
 
     platform.initialize()
+    platform.start_cli_session()
 
     ts_install_clusters = time.time()
     logging.info("Starting install clusters phase")
@@ -77,8 +90,8 @@ if __name__ == "__main__":
     ts_workloads = time.time()
     logging.info("Start workloads phase")
     if 'enabled' in platform.environment['load'] and str(platform.environment['load']['enabled']).lower() == "true":
-        platform = utils.get_cluster_info(platform)
-        load_threads = utils.load_scheduler(platform)
+        with contextlib.closing(utils.rehydrate_clusters(platform)) as cluster_names:
+            load_threads = utils.load_scheduler(platform, cluster_names)
         logging.info(f"{len(load_threads)} threads created to execute workloads. Waiting for them to finish")
         for thread in load_threads:
             try:
@@ -96,8 +109,8 @@ if __name__ == "__main__":
     ts_cleanup_clusters = time.time()
     logging.info("Starting cleanup clusters phase")
     if str(platform.environment["cleanup_clusters"]).lower() == "true":
-        platform = utils.get_cluster_info(platform)
-        delete_threads = utils.cleanup_scheduler(platform)
+        with contextlib.closing(utils.rehydrate_clusters(platform)) as cluster_names:
+            delete_threads = utils.cleanup_scheduler(platform, cluster_names)
         logging.info(f"{len(delete_threads)} threads created for deleting clusters. Waiting for them to finish")
         for thread in delete_threads:
             try:
@@ -115,6 +128,10 @@ if __name__ == "__main__":
         logging.info("Cleanup clusters phase skipped")
     end_time = time.time()
 
+    if es is not None:
+        logging.info("Flushing pending documents to Elasticsearch")
+        es.close()
+
     # Report phase durations
     logging.info("HCP-burner Phases")
     logging.info(f"* Install Phase: {datetime.fromtimestamp(ts_install_clusters, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')} to {datetime.fromtimestamp(ts_workloads, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')}")
@@ -136,3 +153,4 @@ if __name__ == "__main__":
 
     # Print execution summary
     utils.print_execution_summary(platform)
+    polling.save()
@@ -45,9 +45,22 @@ class Arguments(argparse.ArgumentParser):
         self.common_parser.add_argument("--delay-between-batch", action=EnvDefault, env=environment, envvar="HCP_BURNER_DELAY_BETWEEN_BATCH", default=60, type=int,
                                         help="If set it will wait x seconds between each batch request")
         self.common_parser.add_argument("--batch-size", action=EnvDefault, env=environment, envvar="HCP_BURNER_BATCH_SIZE", type=int, default=0, help="number of clusters in a batch")
+        self.common_parser.add_argument("--max-concurrency", action=EnvDefault, env=environment, envvar="HCP_BURNER_MAX_CONCURRENCY", type=int, default=0, help="Maximum number of cluster installations running at the same time. If 0, no limit")
+        self.common_parser.add_argument("--install-rate", action=EnvDefault, env=environment, envvar="HCP_BURNER_INSTALL_RATE", type=float, default=0, help="Target rate of cluster installations started per minute. If 0, no limit")
+        self.common_parser.add_argument("--install-burst", action=EnvDefault, env=environment, envvar="HCP_BURNER_INSTALL_BURST", type=int, default=1, help="Number of installations that can start at once before --install-rate is applied")
 
         self.common_parser.add_argument("--watcher-delay", action=EnvDefault, env=environment, envvar="HCP_BURNER_WATCHER_DELAY", default=60, type=int, help="Delay between each status check")
 
+        self.common_parser.add_argument("--subprocess-engine", action=EnvDefault, env=environment, envvar="HCP_BURNER_SUBPROCESS_ENGINE", default="thread", choices=["thread", "asyncio"],
+                                        help="Engine used to execute external commands. thread starts the commands from the calling thread, asyncio starts them on a single event loop to apply --command-concurrency and --command-timeout. The calling thread waits for the command with both engines")
+        self.common_parser.add_argument("--command-concurrency", action=EnvDefault, env=environment, envvar="HCP_BURNER_COMMAND_CONCURRENCY", type=str,
+                                        help="Maximum concurrent executions per binary when using the asyncio engine. For example: rosa=50,oc=100")
+        self.common_parser.add_argument("--command-timeout", action=EnvDefault, env=environment, envvar="HCP_BURNER_COMMAND_TIMEOUT", type=str,
+                                        help="Timeout in seconds per binary when using the asyncio engine, * applies to any binary. For example: oc=600,az=300")
+
+        self.common_parser.add_argument("--polling-history", action=EnvDefault, env=environment, envvar="HCP_BURNER_POLLING_HISTORY", type=str, default="", help="JSON file keeping the durations of the waits between executions, so the wait loops poll faster around the usual durations. If empty, durations are only kept during the execution")
+        self.common_parser.add_argument("--enable-instrumentation", action="store_true", help="Measure the time spent on external commands, Elasticsearch, waits and schedulers and write a report on the working directory at the end")
+
         self.common_parser.add_argument("--wildcard-options", action=EnvDefault, env=environment, envvar="HCP_BURNER_WILDCARD_OPTIONS", help="String to be passed directly to cluster create command on any platform. It wont be validated")
 
         self.common_parser.add_argument("--enable-workload", action="store_true", help="Execute workload after clusters are installed")
@@ -59,9 +72,12 @@ class Arguments(argparse.ArgumentParser):
         self.common_parser.add_argument("--workload-duration", action=EnvDefault, env=environment, envvar="HCP_BURNER_WORKLOAD_DURATION", default="1h", type=str, help="Workload execution duration in minutes")
         self.common_parser.add_argument("--workload-jobs", action=EnvDefault, env=environment, envvar="HCP_BURNER_WORKLOAD_JOBS", type=int, default=10, help="Jobs per worker.Workload will scale this number to the number of workers of the cluster")
 
+        self.common_parser.add_argument("--resume", action="store_true", help="Resume the execution stored on --path (or /tmp/--uuid) from its journal, skipping finished clusters and waiting for the ones still installing")
         self.common_parser.add_argument("--cleanup-clusters", action="store_true", help="Delete all created clusters at the end")
         self.common_parser.add_argument("--wait-before-cleanup", action=EnvDefault, env=environment, envvar="HCP_BURNER_WAIT_BEFORE_CLEANUP", help="Minutes to wait before starting the cleanup process", default=0, type=int)
         self.common_parser.add_argument("--delay-between-cleanup", action=EnvDefault, env=environment, envvar="HCP_BURNER_DELAY_BETWEEN_CLEANUP", help="Seconds to wait between cluster deletion", default=0, type=int)
+        self.common_parser.add_argument("--rehydrate-workers", action=EnvDefault, env=environment, envvar="HCP_BURNER_REHYDRATE_WORKERS", type=int, default=10, help="Number of clusters whose metadata is obtained at the same time before the workload or cleanup phases")
+        self.common_parser.add_argument("--rehydrate-rate", action=EnvDefault, env=environment, envvar="HCP_BURNER_REHYDRATE_RATE", type=float, default=0, help="Target rate of cluster metadata requests per minute before the workload or cleanup phases. If 0, no limit")
 
         self.common_args, self.unknown_args = self.common_parser.parse_known_args()
 
@@ -5,21 +5,36 @@ Module to set connection to ElasticSearch and functions to upload documents
 """
 import argparse
 import configparser
+import atexit
+import json
+import os
 import sys
 import ssl
+import threading
+import time
 from elasticsearch import Elasticsearch as ES
 from elasticsearch.exceptions import NotFoundError
 import urllib3
 from urllib3.util import Retry
+from libs import instrumentation
+from libs import polling
 
 
 class Elasticsearch:
     """ES Class"""
 
-    def __init__(self, logging, url, index, insecure, retries):
+    def __init__(self, logging, url, index, insecure, retries, bulk_size=50, flush_interval=5, spill_file=None):
         super().__init__()
         self.logging = logging
         self.index = index
+        self.retries = retries
+        self.bulk_size = bulk_size
+        self.flush_interval = flush_interval
+        self.spill_file = spill_file
+        self._buffer = []
+        self._condition = threading.Condition()
+        self._spill_lock = threading.Lock()
+        self._closed = False
 
         retry_on_timeout = True
         retry_strategy = Retry(total=retries, backoff_factor=0.1)
@@ -53,21 +68,125 @@ class Elasticsearch:
             self.logging.error(f"Cannot stablish connection with {url}")
             sys.exit("Exiting...")
 
+        self._replay_spill_file()
+        self._flusher = threading.Thread(target=self._flush_loop, name="es-bulk-flusher")
+        self._flusher.daemon = True
+        self._flusher.start()
+        atexit.register(self.close)
+
     def _check_index(self):
         try:
             return self.elastic.indices.exists(index=self.index)
         except NotFoundError:
             return False
 
+    @instrumentation.timed("elasticsearch")
     def index_metadata(self, metadata):
-        self.logging.debug(f"Indexing data on {self.elastic.transport.hosts[0]}/{self.index}")
+        """Queue a document to be indexed by the background flusher. Never blocks on Elasticsearch"""
+        self.logging.debug(f"Queuing data to be indexed on {self.elastic.transport.hosts[0]}/{self.index}")
         self.logging.debug(metadata)
         try:
-            self.elastic.index(index=self.index, body=metadata)
+            # Serialize now, callers can keep modifying their dict after this call
+            document = self.elastic.transport.serializer.dumps(metadata)
         except Exception as err:
             self.logging.error(err)
-            self.logging.error(f"Failed to index data on on {self.elastic.transport.hosts[0]}/{self.elastic.info().get('index')})")
+            self.logging.error(f"Failed to serialize data to be indexed on {self.elastic.transport.hosts[0]}/{self.index}")
             self.logging.error(metadata)
+            return
+        with self._condition:
+            self._buffer.append((self.index, document))
+            if len(self._buffer) >= self.bulk_size:
+                self._condition.notify()
+            instrumentation.set_gauge("es_queue_depth", len(self._buffer))
+
+    def _flush_loop(self):
+        while True:
+            with self._condition:
+                if not self._closed and len(self._buffer) < self.bulk_size:
+                    self._condition.wait(timeout=self.flush_interval)
+                batch = self._buffer
+                self._buffer = []
+                closed = self._closed
+            if batch:
+                self._send(batch)
+            if closed:
+                return
+
+    @instrumentation.timed("elasticsearch")
+    def _send(self, batch):
+        """Index a batch of (index, document) tuples using the _bulk API, retrying failed items with exponential backoff"""
+        for attempt in range(self.retries + 1):
+            if attempt > 0:
+                time.sleep(polling.backoff(attempt, initial=0.5, maximum=30))
+            body = "".join(json.dumps({"index": {"_index": index}}) + "\n" + document + "\n" for index, document in batch)
+            try:
+                response = self.elastic.bulk(body=body)
+            except Exception as err:
+                self.logging.warning(f"Try {attempt + 1}/{self.retries + 1}. Failed to index {len(batch)} documents on {self.elastic.transport.hosts[0]}: {err}")
+                continue
+            retry = []
+            for item, (index, document) in zip(response.get("items", []), batch):
+                result = item.get("index", {})
+                status = result.get("status", 0)
+                if status == 429 or status >= 500:
+                    retry.append((index, document))
+                elif status >= 300:
+                    self.logging.error(f"Failed to index document on {self.elastic.transport.hosts[0]}/{index}: {result.get('error')}")
+                    self.logging.error(document)
+            self.logging.debug(f"Indexed {len(batch) - len(retry)} documents on {self.elastic.transport.hosts[0]}")
+            instrumentation.increment("es_documents", "indexed", len(batch) - len(retry))
+            if not retry:
+                return
+            self.logging.warning(f"Try {attempt + 1}/{self.retries + 1}. {len(retry)} documents rejected by {self.elastic.transport.hosts[0]}, retrying")
+            batch = retry
+        self.logging.error(f"Failed to index {len(batch)} documents on {self.elastic.transport.hosts[0]} after {self.retries + 1} tries")
+        instrumentation.increment("es_documents", "spilled", len(batch))
+        self._spill(batch)
+
+    def _spill(self, batch):
+        if not self.spill_file:
+            for index, document in batch:
+                self.logging.error(document)
+            return
+        with self._spill_lock:
+            try:
+                with open(self.spill_file, "a") as spill:
+                    for index, document in batch:
+                        spill.write(json.dumps({"index": {"_index": index}}) + "\n" + document + "\n")
+                self.logging.warning(f"Saved {len(batch)} documents on {self.spill_file}, they will be indexed on the next execution")
+            except Exception as err:
+                self.logging.error(err)
+                self.logging.error(f"Failed to write {self.spill_file}")
+                for index, document in batch:
+                    self.logging.error(document)
+
+    def _replay_spill_file(self):
+        if not self.spill_file or not os.path.isfile(self.spill_file):
+            return
+        with self._spill_lock:
+            replay_file = self.spill_file + ".replay"
+            os.replace(self.spill_file, replay_file)
+        with open(replay_file, "r") as spill:
+            lines = [line.rstrip("\n") for line in spill if line.strip()]
+        batch = []
+        for action, document in zip(lines[::2], lines[1::2]):
+            try:
+                batch.append((json.loads(action)["index"]["_index"], document))
+            except (ValueError, KeyError) as err:
+                self.logging.error(f"Skipping invalid line on {replay_file}: {err}")
+        self.logging.info(f"Replaying {len(batch)} documents saved on {self.spill_file} by a previous execution")
+        for start in range(0, len(batch), self.bulk_size):
+            self._send(batch[start:start + self.bulk_size])
+        os.remove(replay_file)
+
+    def close(self):
+        """Flush every queued document. Documents that cannot be indexed are saved on the spill file"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        self._flusher.join()
 
 
 class ElasticArguments:
@@ -77,6 +196,9 @@ class ElasticArguments:
         parser.add_argument("--es-index", action=EnvDefault, env=environment, envvar="HCP_BURNER_ES_INDEX", help="Elasticsearch Index", default="hcp-burner")
         parser.add_argument("--es-index-retry", action=EnvDefault, env=environment, envvar="HCP_BURNER_ES_INDEX_RETRY", type=int, help="Number of retries when index operation fails", default=5)
         parser.add_argument("--es-insecure", action="store_true", help="Bypass cert verification on SSL connections")
+        parser.add_argument("--es-bulk-size", action=EnvDefault, env=environment, envvar="HCP_BURNER_ES_BULK_SIZE", type=int, help="Number of queued documents that triggers a bulk request", default=50)
+        parser.add_argument("--es-flush-interval", action=EnvDefault, env=environment, envvar="HCP_BURNER_ES_FLUSH_INTERVAL", type=int, help="Maximum seconds a document waits on the queue before being indexed", default=5)
+        parser.add_argument("--es-spill-file", action=EnvDefault, env=environment, envvar="HCP_BURNER_ES_SPILL_FILE", help="NDJSON file storing documents that could not be indexed, replayed on the next execution", default="/tmp/hcp-burner-es-spill.ndjson")
 
         args, unknown_args = parser.parse_known_args()
 
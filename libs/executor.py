@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Module to execute external commands on a single asyncio event loop with per binary concurrency limits and timeouts.
+The callers still wait on their own thread for the result of every command
+"""
+import os
+import sys
+import asyncio
+import threading
+
+
+class _Unlimited:
+    """Async no-op context manager for the binaries without a concurrency limit"""
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+class AsyncExecutor:
+    """
+    Execute commands as asyncio subprocesses on a dedicated event loop.
+    execute() blocks the calling thread until the command finishes, only the run() coroutine waits without a thread
+
+    limits: per binary concurrency limits, as a dict or as a string like "rosa=50,oc=100"
+    timeouts: per binary timeouts in seconds, as a dict or as a string like "oc=600,az=300". Use "*" as key for a default timeout
+    """
+
+    def __init__(self, logging, limits=None, timeouts=None):
+        self.logging = logging
+        self.limits = self._parse(limits)
+        self.timeouts = self._parse(timeouts)
+        self._semaphores = {}
+        self.loop = asyncio.new_event_loop()
+        self._set_child_watcher()
+        self._thread = threading.Thread(target=self._run_loop, name="subprocess-loop")
+        self._thread.daemon = True
+        self._thread.start()
+        self.logging.info(f"Asyncio subprocess engine started. Concurrency limits: {self.limits if self.limits else 'none'}. Timeouts: {self.timeouts if self.timeouts else 'none'}")
+
+    def _parse(self, value):
+        if not value:
+            return {}
+        if isinstance(value, dict):
+            return {binary: int(limit) for binary, limit in value.items()}
+        parsed = {}
+        for item in str(value).split(","):
+            if "=" not in item:
+                self.logging.error(f"Invalid value {item} on {value}, expected binary=number")
+                sys.exit("Exiting...")
+            binary, limit = item.split("=", 1)
+            parsed[binary.strip()] = int(limit)
+        return parsed
+
+    def _set_child_watcher(self):
+        # The default child watcher before python 3.12 spawns a thread per child process, use pidfd when the kernel supports it
+        if sys.version_info < (3, 12) and hasattr(asyncio, "PidfdChildWatcher"):
+            try:
+                os.close(os.pidfd_open(os.getpid()))
+                watcher = asyncio.PidfdChildWatcher()
+                watcher.attach_loop(self.loop)
+                asyncio.set_child_watcher(watcher)
+            except (AttributeError, OSError) as err:
+                self.logging.debug(f"pidfd child watcher not available, using the default one: {err}")
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def _semaphore(self, binary):
+        # Only called from the event loop thread, no lock required
+        if binary not in self.limits:
+            return _Unlimited()
+        if binary not in self._semaphores:
+            self._semaphores[binary] = asyncio.Semaphore(self.limits[binary])
+        return self._semaphores[binary]
+
+    async def run(self, command, output_file=None, extra_params={}, timeout=None):
+        """
+        Coroutine with the same contract as Utils.subprocess_exec: returns (returncode, stdout, stderr)
+        When output_file is defined, stdout and stderr are written to it and returned as None
+        """
+        args = command if isinstance(command, list) else command.split()
+        binary = os.path.basename(args[0])
+        timeout = timeout if timeout is not None else self.timeouts.get(binary, self.timeouts.get("*"))
+        params = dict(extra_params)
+        text = params.pop("universal_newlines", False)
+        text = params.pop("text", False) or text
+        async with self._semaphore(binary):
+            log_file = open(output_file, "w") if output_file else None
+            output = log_file if log_file is not None else asyncio.subprocess.PIPE
+            try:
+                process = await asyncio.create_subprocess_exec(*args, stdout=output, stderr=output, **params)
+                try:
+                    stdout, stderr = await asyncio.wait_for(process.communicate(), timeout)
+                except asyncio.TimeoutError:
+                    process.kill()
+                    await process.wait()
+                    raise TimeoutError(f"Command {binary} killed after {timeout} seconds")
+            finally:
+                if log_file is not None:
+                    log_file.close()
+        if text:
+            stdout = stdout.decode("utf-8", errors="replace") if stdout is not None else None
+            stderr = stderr.decode("utf-8", errors="replace") if stderr is not None else None
+        return process.returncode, stdout, stderr
+
+    def execute(self, command, output_file=None, extra_params={}, timeout=None):
+        """Blocking wrapper of run(), callable from any thread"""
+        future = asyncio.run_coroutine_threadsafe(self.run(command, output_file, extra_params, timeout), self.loop)
+        return future.result()
@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Module to keep a shared, in-memory snapshot of the clusters of a test, refreshed with a single list call per tick
+"""
+import datetime
+import threading
+
+
+class FleetPoller:
+    """
+    Poll the whole fleet of clusters with one list call per tick and publish state transitions.
+
+    list_function: callable returning a dict of cluster records keyed by cluster name, or None when the list call failed
+    state_function: callable returning the state of a cluster record
+    interval: seconds between two list calls
+    """
+
+    def __init__(self, logging, utils, name, list_function, state_function=None, interval=5):
+        self.logging = logging
+        self.utils = utils
+        self.name = name
+        self.list_function = list_function
+        self.state_function = state_function if state_function else (lambda record: record.get("state", ""))
+        self.interval = interval
+        self.clusters = {}
+        self.states = {}
+        self.history = {}
+        self.last_refresh = 0
+        self._condition = threading.Condition()
+        self._refresh_lock = threading.Lock()
+        self._subscribers = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def _now(self):
+        return int(datetime.datetime.utcnow().timestamp())
+
+    def start(self):
+        """Start the polling thread if it is not already running"""
+        with self._condition:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"{self.name}-poller")
+            self._thread.daemon = True
+            self._thread.start()
+        self.logging.info(f"Fleet poller {self.name} started, listing clusters every {self.interval} seconds")
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+            self.logging.info(f"Fleet poller {self.name} stopped")
+
+    def is_running(self):
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.refresh()
+            self._stop.wait(self.interval)
+
+    def refresh(self, max_age=None):
+        """Execute the list call and update the snapshot. With max_age, skip it when the snapshot is recent enough"""
+        with self._refresh_lock:
+            if max_age is not None and self._now() - self.last_refresh <= max_age:
+                return True
+            try:
+                clusters = self.list_function()
+            except Exception as err:
+                self.logging.error(f"Fleet poller {self.name} failed to list clusters")
+                self.logging.error(err)
+                clusters = None
+            if clusters is None:
+                self.logging.warning(f"Fleet poller {self.name} keeping previous snapshot of {len(self.clusters)} clusters")
+                return False
+            self._update(clusters, self._now())
+            return True
+
+    def _update(self, clusters, timestamp):
+        events = []
+        with self._condition:
+            for cluster_name, record in clusters.items():
+                state = self.state_function(record)
+                previous = self.states.get(cluster_name)
+                if state != previous:
+                    self.history.setdefault(cluster_name, []).append((state, timestamp))
+                    events.append({"cluster_name": cluster_name, "previous": previous, "state": state, "timestamp": timestamp})
+                    self.states[cluster_name] = state
+            for cluster_name in [name for name in self.clusters if name not in clusters]:
+                # Cluster no longer listed, usually because it has been deleted
+                self.history.setdefault(cluster_name, []).append((None, timestamp))
+                events.append({"cluster_name": cluster_name, "previous": self.states.get(cluster_name), "state": None, "timestamp": timestamp})
+                self.states.pop(cluster_name, None)
+            self.clusters = clusters
+            self.last_refresh = timestamp
+            for subscriber in self._subscribers:
+                for event in events:
+                    subscriber(event)
+            self._condition.notify_all()
+        for event in events:
+            self.logging.debug(f"Fleet poller {self.name}: cluster {event['cluster_name']} moved from {event['previous']} to {event['state']}")
+
+    def subscribe(self, callback):
+        """Register a callback receiving every state transition event. It is called holding the poller lock, so it must not block"""
+        with self._condition:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._condition:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def get(self, cluster_name, max_age=None):
+        """Return the last record of a cluster. With max_age, refresh the snapshot first when it is older than max_age seconds"""
+        if max_age is not None:
+            self.refresh(max_age=max_age)
+        with self._condition:
+            return self.clusters.get(cluster_name)
+
+    def snapshot(self):
+        with self._condition:
+            return dict(self.clusters)
+
+    def get_history(self, cluster_name):
+        """List of (state, timestamp) tuples observed for a cluster"""
+        with self._condition:
+            return list(self.history.get(cluster_name, []))
+
+    def wait_for_state(self, cluster_name, states, timeout):
+        """Block until the cluster reaches one of the given states or the timeout expires. Return the current state"""
+        with self._condition:
+            self._condition.wait_for(lambda: self.states.get(cluster_name) in states, timeout=timeout)
+            return self.states.get(cluster_name)
+
+    def wait_for_change(self, cluster_name, state, timeout):
+        """Block until the cluster leaves the given state or the timeout expires. Return the current state"""
+        with self._condition:
+            self._condition.wait_for(lambda: self.states.get(cluster_name) != state, timeout=timeout)
+            return self.states.get(cluster_name)
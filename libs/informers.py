@@ -0,0 +1,348 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Module to follow Kubernetes objects with a single list+watch stream per cluster instead of polling them with `oc get`,
+and to share the Kubernetes API clients of every cluster
+"""
+import os
+import abc
+import datetime
+import threading
+import functools
+from kubernetes import client as k8s_client, config as k8s_config, watch as k8s_watch
+
+
+class Informer(abc.ABC):
+    """
+    Keep an in-memory index of Kubernetes objects updated from a watch stream and wake up waiters on every change.
+
+    Subclasses implement connect(), returning the list function of the kubernetes client to watch (for example CoreV1Api.list_node),
+    and transform(), returning the value stored on the index for each object.
+    """
+
+    watch_timeout = 60
+
+    def __init__(self, logging, name):
+        self.logging = logging
+        self.name = name
+        self.objects = {}
+        self.synced = False
+        self.last_change = None
+        self._condition = threading.Condition()
+        self._subscribers = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    @abc.abstractmethod
+    def connect(self):
+        """Return the list function of the kubernetes client to watch"""
+
+    def transform(self, obj):
+        return obj
+
+    def key(self, obj):
+        if obj.metadata.namespace:
+            return obj.metadata.namespace + "/" + obj.metadata.name
+        return obj.metadata.name
+
+    def items(self, object_list):
+        return object_list.items
+
+    def resource_version(self, obj):
+        return obj.metadata.resource_version
+
+    def start(self):
+        with self._condition:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name=f"informer-{self.name}")
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _now(self):
+        return int(datetime.datetime.now(datetime.timezone.utc).timestamp())
+
+    def _run(self):
+        backoff = 1
+        list_function = None
+        resource_version = None
+        while not self._stop.is_set():
+            try:
+                if list_function is None:
+                    list_function = self.connect()
+                if resource_version is None:
+                    object_list = list_function()
+                    with self._condition:
+                        self.objects = {self.key(obj): self.transform(obj) for obj in self.items(object_list)}
+                        self.synced = True
+                        self._changed(None, None)
+                    resource_version = self.resource_version(object_list)
+                    self.logging.debug(f"Informer {self.name} synced with {len(self.objects)} objects")
+                watcher = k8s_watch.Watch()
+                for event in watcher.stream(list_function, resource_version=resource_version, timeout_seconds=self.watch_timeout):
+                    if self._stop.is_set():
+                        watcher.stop()
+                        break
+                    if event["type"] == "ERROR":
+                        # Usually 410 Gone, the resource version is too old and a new list is required
+                        self.logging.debug(f"Informer {self.name} received an error event, listing again: {event['raw_object']}")
+                        resource_version = None
+                        watcher.stop()
+                        break
+                    obj = event["object"]
+                    resource_version = self.resource_version(obj)
+                    with self._condition:
+                        if event["type"] == "DELETED":
+                            self.objects.pop(self.key(obj), None)
+                        else:
+                            self.objects[self.key(obj)] = self.transform(obj)
+                        self._changed(event["type"], obj)
+                backoff = 1
+            except Exception as err:
+                self.logging.debug(f"Informer {self.name} failed, retrying in {backoff} seconds: {err}")
+                list_function = None
+                resource_version = None
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, 60)
+
+    def _changed(self, event_type, obj):
+        # Called holding the condition lock
+        self.last_change = self._now()
+        for subscriber in self._subscribers:
+            subscriber(event_type, obj)
+        self._condition.notify_all()
+
+    def subscribe(self, callback):
+        """Register a callback receiving (event_type, object) for every change. It is called holding the informer lock, so it must not block"""
+        with self._condition:
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._condition:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def wait_for(self, predicate, timeout, cancelled=None):
+        """
+        Block until predicate(objects) is True, the timeout (seconds) expires or cancelled() returns True.
+        Returns True when the predicate is satisfied. Waiters are woken up on every change, so callers can take their own timestamp right after
+        """
+        deadline = self._now() + timeout
+        with self._condition:
+            while True:
+                if self.synced and predicate(self.objects):
+                    return True
+                remaining = deadline - self._now()
+                if remaining <= 0 or (cancelled is not None and cancelled()):
+                    return False
+                # Wake up at least every 5 seconds to check the cancel function
+                self._condition.wait(timeout=min(remaining, 5))
+
+
+class NodeInformer(Informer):
+    """Index of nodes of a cluster with their labels and Ready condition"""
+
+    def __init__(self, logging, kubeconfig, api_clients):
+        super().__init__(logging, f"nodes-{kubeconfig}")
+        self.kubeconfig = kubeconfig
+        self.api_clients = api_clients
+
+    def connect(self):
+        return k8s_client.CoreV1Api(self.api_clients.get(self.kubeconfig)).list_node
+
+    def transform(self, obj):
+        conditions = obj.status.conditions if obj.status and obj.status.conditions else []
+        return {
+            "labels": obj.metadata.labels or {},
+            "ready": any(condition.type == "Ready" and condition.status == "True" for condition in conditions),
+        }
+
+    def ready_nodes(self, selector):
+        """Number of Ready nodes whose labels match the selector function"""
+        with self._condition:
+            return sum(1 for node in self.objects.values() if node["ready"] and selector(node["labels"]))
+
+    def wait_for_ready_nodes(self, selector, expected, timeout, cancelled=None, at_least=False):
+        """Wait until the number of Ready nodes matching the selector is expected (or at least expected). Returns (ready_nodes, reached)"""
+        def predicate(nodes):
+            ready = sum(1 for node in nodes.values() if node["ready"] and selector(node["labels"]))
+            return ready >= expected if at_least else ready == expected
+        reached = self.wait_for(predicate, timeout, cancelled)
+        return self.ready_nodes(selector), reached
+
+
+class NamespaceInformer(Informer):
+    """
+    Index of the namespaces of a cluster with their creation time, and of the namespaces of every cluster ID.
+    Namespaces are indexed by each dash separated part of their name, like the cluster ID of ocm-staging-<cluster_id>-<name>
+    """
+
+    def __init__(self, logging, kubeconfig, api_clients):
+        super().__init__(logging, f"namespaces-{kubeconfig}")
+        self.kubeconfig = kubeconfig
+        self.api_clients = api_clients
+        self.by_part = {}
+        self.subscribe(self._index)
+
+    def connect(self):
+        return k8s_client.CoreV1Api(self.api_clients.get(self.kubeconfig)).list_namespace
+
+    def transform(self, obj):
+        return obj.metadata.creation_timestamp.timestamp() if obj.metadata.creation_timestamp else self._now()
+
+    def _index(self, event_type, obj):
+        # Called holding the informer lock after every change of the objects
+        if event_type is None:
+            self.by_part = {}
+            for name in self.objects:
+                for part in name.split("-"):
+                    self.by_part.setdefault(part, set()).add(name)
+            return
+        for part in obj.metadata.name.split("-"):
+            if event_type == "DELETED":
+                self.by_part.get(part, set()).discard(obj.metadata.name)
+            else:
+                self.by_part.setdefault(part, set()).add(obj.metadata.name)
+
+    def _creation_times(self, cluster_id):
+        # Called holding the informer lock
+        return [self.objects[name] for name in self.by_part.get(cluster_id, ()) if name in self.objects]
+
+    def wait_for_namespaces(self, cluster_id, expected, timeout, cancelled=None):
+        """Wait until at least expected namespaces of the cluster ID exist. Return the creation time of the last one, None if not reached"""
+        if not self.wait_for(lambda objects: len(self._creation_times(cluster_id)) >= expected, timeout, cancelled):
+            return None
+        with self._condition:
+            return max(self._creation_times(cluster_id))
+
+
+class CustomObjectInformer(Informer):
+    """
+    Index of the custom objects of a namespace, like the hostedclusters of a management cluster.
+    The kubernetes client returns them as dicts, they are stored as they are and keyed by name
+    """
+
+    def __init__(self, logging, kubeconfig, api_clients, group, version, plural, namespace):
+        super().__init__(logging, f"{plural}-{kubeconfig}")
+        self.kubeconfig = kubeconfig
+        self.api_clients = api_clients
+        self.group = group
+        self.version = version
+        self.plural = plural
+        self.namespace = namespace
+
+    def connect(self):
+        custom_objects = k8s_client.CustomObjectsApi(self.api_clients.get(self.kubeconfig))
+        return functools.partial(custom_objects.list_namespaced_custom_object, self.group, self.version, self.namespace, self.plural)
+
+    def key(self, obj):
+        return obj["metadata"]["name"]
+
+    def items(self, object_list):
+        return object_list.get("items", [])
+
+    def resource_version(self, obj):
+        return obj["metadata"]["resourceVersion"]
+
+    def get(self, name):
+        """Return the last version of the object, or None when it does not exist or the informer is not synced yet"""
+        with self._condition:
+            return self.objects.get(name)
+
+    def values(self):
+        with self._condition:
+            return list(self.objects.values())
+
+
+class ApiClientRegistry:
+    """
+    Share one Kubernetes ApiClient per kubeconfig between all the threads, instead of loading the kubeconfig on the
+    process wide default configuration. The client is built again when the kubeconfig file is modified.
+
+    pool_size: connections kept open to each API server
+    """
+
+    def __init__(self, logging, pool_size=4):
+        self.logging = logging
+        self.pool_size = pool_size
+        self.clients = {}
+        self._lock = threading.Lock()
+
+    def get(self, kubeconfig):
+        modified = os.path.getmtime(kubeconfig)
+        replaced = None
+        with self._lock:
+            entry = self.clients.get(kubeconfig)
+            if entry is None or entry[0] != modified:
+                configuration = k8s_client.Configuration()
+                k8s_config.load_kube_config(config_file=kubeconfig, client_configuration=configuration, persist_config=False)
+                configuration.connection_pool_maxsize = self.pool_size
+                replaced = entry
+                entry = (modified, k8s_client.ApiClient(configuration))
+                self.clients[kubeconfig] = entry
+                self.logging.debug(f"Kubernetes API client created for {kubeconfig}")
+        if replaced is not None:
+            # Watches still using the previous client fail and connect again with the new one
+            replaced[1].close()
+        return entry[1]
+
+    def release(self, kubeconfig):
+        with self._lock:
+            entry = self.clients.pop(kubeconfig, None)
+        if entry is not None:
+            entry[1].close()
+
+    def close_all(self):
+        with self._lock:
+            clients = list(self.clients.values())
+            self.clients = {}
+        for modified, api_client in clients:
+            api_client.close()
+
+
+class InformerRegistry:
+    """Share one informer per key (usually a kubeconfig path) between all the threads of a cluster"""
+
+    def __init__(self, logging, factory):
+        self.logging = logging
+        self.factory = factory
+        self.informers = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self.informers:
+                self.informers[key] = self.factory(key)
+                self.informers[key].start()
+            return self.informers[key]
+
+    def release(self, key):
+        with self._lock:
+            informer = self.informers.pop(key, None)
+        if informer is not None:
+            informer.stop()
+
+    def stop_all(self):
+        with self._lock:
+            informers = list(self.informers.values())
+            self.informers = {}
+        for informer in informers:
+            informer.stop()
+
+
+def nodepool_selector(nodepool):
+    """Select nodes created by a hypershift nodePool whose name contains nodepool"""
+    return lambda labels: nodepool in labels.get("hypershift.openshift.io/nodePool", "")
+
+
+def worker_selector(labels):
+    """Select worker nodes that are neither control-plane nor infra nodes"""
+    return "node-role.kubernetes.io/worker" in labels and "node-role.kubernetes.io/control-plane" not in labels and "node-role.kubernetes.io/infra" not in labels
+
+
+def infra_selector(labels):
+    return "node-role.kubernetes.io/infra" in labels
@@ -0,0 +1,177 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Module to measure where the driver process spends its time: external commands, Elasticsearch calls, waits and schedulers.
+It is disabled by default, all the functions are no-ops until enable() is called
+"""
+import os
+import json
+import time
+import resource
+import functools
+import threading
+
+BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300, 900, 3600, float("inf"))
+
+_registry = None
+
+
+class Registry:
+    """Latency histograms, counters and gauges keyed by metric and label"""
+
+    def __init__(self, logging):
+        self.logging = logging
+        self.histograms = {}
+        self.counters = {}
+        self.gauges = {}
+        self.start_time = time.monotonic()
+        self._lock = threading.Lock()
+
+    def observe(self, metric, label, seconds):
+        threads = threading.active_count()
+        with self._lock:
+            histogram = self.histograms.setdefault((metric, label), {"buckets": [0] * len(BUCKETS), "count": 0, "sum": 0.0, "max": 0.0})
+            for position, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    histogram["buckets"][position] += 1
+                    break
+            histogram["count"] += 1
+            histogram["sum"] += seconds
+            histogram["max"] = max(histogram["max"], seconds)
+            self._set_gauge("threads", threads)
+
+    def increment(self, metric, label, value=1):
+        with self._lock:
+            self.counters[(metric, label)] = self.counters.get((metric, label), 0) + value
+
+    def set_gauge(self, metric, value):
+        with self._lock:
+            self._set_gauge(metric, value)
+
+    def _set_gauge(self, metric, value):
+        gauge = self.gauges.setdefault(metric, {"value": 0, "max": 0})
+        gauge["value"] = value
+        gauge["max"] = max(gauge["max"], value)
+
+    def _resources(self):
+        driver = resource.getrusage(resource.RUSAGE_SELF)
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        return {
+            "wall_clock_seconds": round(time.monotonic() - self.start_time, 3),
+            "driver_cpu_user_seconds": driver.ru_utime,
+            "driver_cpu_system_seconds": driver.ru_stime,
+            "driver_max_rss_kilobytes": driver.ru_maxrss,
+            "children_cpu_user_seconds": children.ru_utime,
+            "children_cpu_system_seconds": children.ru_stime,
+        }
+
+    def to_dict(self):
+        with self._lock:
+            histograms = {}
+            for (metric, label), histogram in sorted(self.histograms.items()):
+                histograms.setdefault(metric, {})[label] = {
+                    "count": histogram["count"],
+                    "sum_seconds": round(histogram["sum"], 3),
+                    "avg_seconds": round(histogram["sum"] / histogram["count"], 3),
+                    "max_seconds": round(histogram["max"], 3),
+                    "buckets": {str(bound): count for bound, count in zip(BUCKETS, histogram["buckets"])},
+                }
+            counters = {}
+            for (metric, label), value in sorted(self.counters.items()):
+                counters.setdefault(metric, {})[label] = value
+            gauges = {metric: dict(gauge) for metric, gauge in self.gauges.items()}
+        return {"resources": self._resources(), "histograms": histograms, "counters": counters, "gauges": gauges}
+
+    def to_prometheus(self):
+        data = self.to_dict()
+        lines = []
+        for metric, value in data["resources"].items():
+            lines.append(f"# TYPE hcp_burner_{metric} gauge")
+            lines.append(f"hcp_burner_{metric} {value}")
+        for metric, labels in data["histograms"].items():
+            lines.append(f"# TYPE hcp_burner_{metric}_seconds histogram")
+            for label, histogram in labels.items():
+                cumulative = 0
+                for bound, count in histogram["buckets"].items():
+                    cumulative += count
+                    bound = "+Inf" if bound == "inf" else bound
+                    lines.append(f'hcp_burner_{metric}_seconds_bucket{{name="{label}",le="{bound}"}} {cumulative}')
+                lines.append(f'hcp_burner_{metric}_seconds_sum{{name="{label}"}} {histogram["sum_seconds"]}')
+                lines.append(f'hcp_burner_{metric}_seconds_count{{name="{label}"}} {histogram["count"]}')
+        for metric, labels in data["counters"].items():
+            lines.append(f"# TYPE hcp_burner_{metric}_total counter")
+            for label, value in labels.items():
+                lines.append(f'hcp_burner_{metric}_total{{name="{label}"}} {value}')
+        for metric, gauge in data["gauges"].items():
+            lines.append(f"# TYPE hcp_burner_{metric}_max gauge")
+            lines.append(f"hcp_burner_{metric}_max {gauge['max']}")
+        return "\n".join(lines) + "\n"
+
+
+def enable(logging):
+    global _registry
+    if _registry is None:
+        _registry = Registry(logging)
+        logging.info("Driver instrumentation enabled")
+    return _registry
+
+
+def enabled():
+    return _registry is not None
+
+
+def observe(metric, label, seconds):
+    if _registry is not None:
+        _registry.observe(metric, label, seconds)
+
+
+def increment(metric, label, value=1):
+    if _registry is not None:
+        _registry.increment(metric, label, value)
+
+
+def set_gauge(metric, value):
+    if _registry is not None:
+        _registry.set_gauge(metric, value)
+
+
+def command_label(command):
+    """Command type used as label, the binary and its first subcommand. For example: `rosa list` or `oc get`"""
+    args = command if isinstance(command, list) else command.split()
+    if not args:
+        return ""
+    label = os.path.basename(args[0])
+    if len(args) > 1 and not args[1].startswith("-"):
+        label += " " + args[1]
+    return label
+
+
+def timed(metric):
+    """Decorator recording the duration of every call of the function on the metric histogram, labeled with the function name"""
+    def decorator(function):
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            if _registry is None:
+                return function(*args, **kwargs)
+            start = time.monotonic()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                _registry.observe(metric, function.__qualname__, time.monotonic() - start)
+        return wrapper
+    return decorator
+
+
+def report(logging, path):
+    """Write the instrumentation report as JSON and Prometheus text on path"""
+    if _registry is None:
+        return
+    try:
+        with open(os.path.join(path, "instrumentation.json"), "w") as report_file:
+            json.dump(_registry.to_dict(), report_file, indent=2)
+        with open(os.path.join(path, "instrumentation.prom"), "w") as report_file:
+            report_file.write(_registry.to_prometheus())
+        logging.info(f"Instrumentation report written on {path}/instrumentation.json and {path}/instrumentation.prom")
+    except Exception as err:
+        logging.error(f"Failed to write instrumentation report on {path}")
+        logging.error(err)
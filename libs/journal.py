@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Module to persist the cluster state transitions of a test, so an interrupted execution can be resumed
+"""
+import os
+import json
+import atexit
+import datetime
+import threading
+
+
+class Journal:
+    """
+    Append-only journal of cluster state transitions, stored as NDJSON on journal.ndjson under the working directory.
+
+    Events are buffered and written by a background thread, which fsyncs the file once per batch.
+    flush_interval: seconds to accumulate events before writing a batch
+    """
+
+    file_name = "journal.ndjson"
+
+    def __init__(self, logging, path, flush_interval=1):
+        self.logging = logging
+        self.file_path = os.path.join(path, self.file_name)
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._condition = threading.Condition()
+        self._closed = threading.Event()
+        self._file = open(self.file_path, "a")
+        self._thread = threading.Thread(target=self._flush_loop, name="journal")
+        self._thread.daemon = True
+        self._thread.start()
+        atexit.register(self.close)
+        self.logging.debug(f"Recording cluster state transitions on {self.file_path}")
+
+    def record(self, cluster_name, fields):
+        """Queue an event with the fields of a cluster, it never blocks on disk"""
+        event = dict(fields)
+        event["cluster_name"] = cluster_name
+        event["journal_timestamp"] = int(datetime.datetime.utcnow().timestamp())
+        try:
+            line = json.dumps(event, default=str)
+        except (TypeError, ValueError, RuntimeError) as err:
+            self.logging.warning(f"Cannot record state of cluster {cluster_name} on the journal: {err}")
+            return
+        with self._condition:
+            self._buffer.append(line)
+            self._condition.notify()
+
+    def _flush_loop(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._buffer or self._closed.is_set())
+                if not self._buffer:
+                    return
+            # Linger to write and fsync many events at once
+            self._closed.wait(self.flush_interval)
+            with self._condition:
+                batch = self._buffer
+                self._buffer = []
+            self._write(batch)
+
+    def _write(self, batch):
+        try:
+            self._file.write("\n".join(batch) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except Exception as err:
+            self.logging.error(f"Failed to write {len(batch)} events on {self.file_path}")
+            self.logging.error(err)
+
+    def close(self):
+        if self._file.closed:
+            return
+        with self._condition:
+            self._closed.set()
+            self._condition.notify()
+        self._thread.join()
+        self._file.close()
+
+    @classmethod
+    def replay(cls, logging, path):
+        """Rebuild the last known state of every cluster reading the journal once. Returns a dict keyed by cluster name"""
+        file_path = os.path.join(path, cls.file_name)
+        clusters = {}
+        if not os.path.isfile(file_path):
+            logging.warning(f"Journal {file_path} not found, nothing to resume")
+            return clusters
+        events = 0
+        with open(file_path, "r") as journal_file:
+            for line in journal_file:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    # Usually the last line, written partially when the previous execution died
+                    logging.debug(f"Skipping malformed line on {file_path}: {line.strip()}")
+                    continue
+                events += 1
+                cluster_name = event.pop("cluster_name", None)
+                if cluster_name is None:
+                    continue
+                state = clusters.setdefault(cluster_name, {"journal_first_timestamp": event.get("journal_timestamp")})
+                state.update(event)
+        logging.info(f"Replayed {events} events of {len(clusters)} clusters from {file_path}")
+        return clusters
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Module to cache OCM cluster metadata, filled in bulk from the paginated clusters API instead of one `ocm` call per cluster
+"""
+import datetime
+import json
+import threading
+
+
+class OcmMetadataCache:
+    """
+    Thread-safe cache of OCM cluster records keyed by cluster name.
+
+    seed: cluster name seed, all the clusters of the test are listed with a single search on it
+    ttl: seconds a record is considered fresh. Expired records trigger a new bulk list
+    page_size: number of clusters requested per page
+    """
+
+    def __init__(self, logging, utils, seed, ttl=60, page_size=100):
+        self.logging = logging
+        self.utils = utils
+        self.seed = seed
+        self.ttl = ttl
+        self.page_size = page_size
+        self.clusters = {}
+        self.timestamps = {}
+        self.memos = {}
+        self.last_refresh = 0
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()
+
+    def _now(self):
+        return int(datetime.datetime.utcnow().timestamp())
+
+    def _fresh(self, timestamp):
+        return self._now() - timestamp <= self.ttl
+
+    def _list(self, search):
+        """Return every cluster matching the search, following the pages of the API. None if any call failed"""
+        clusters = []
+        page = 1
+        while True:
+            list_code, list_out, list_err = self.utils.subprocess_exec(
+                ["ocm", "get", "/api/clusters_mgmt/v1/clusters", "--parameter", "search=" + search, "--parameter", f"page={page}", "--parameter", f"size={self.page_size}"],
+                extra_params={"universal_newlines": True},
+                log_output=False,
+            )
+            if list_code != 0:
+                self.logging.error(f"Failed to list OCM clusters with search {search} on page {page}")
+                self.logging.error(list_err)
+                return None
+            try:
+                result = json.loads(list_out)
+            except Exception as err:
+                self.logging.error(f"Cannot load OCM clusters list with search {search} on page {page}")
+                self.logging.error(err)
+                return None
+            items = result.get("items", [])
+            clusters.extend(items)
+            if len(items) < self.page_size or len(clusters) >= result.get("total", 0):
+                return clusters
+            page += 1
+
+    def prime(self, records):
+        """Store records obtained elsewhere (for example `rosa list clusters -o json`), they share the OCM cluster format"""
+        timestamp = self._now()
+        with self._lock:
+            for record in records:
+                if "name" in record and "id" in record:
+                    self.clusters[record["name"]] = record
+                    self.timestamps[record["name"]] = timestamp
+
+    def refresh(self, max_age=None):
+        """List all the clusters of the seed, unless the last list is younger than max_age seconds (ttl by default).
+        Concurrent callers wait for the running list instead of starting another one"""
+        max_age = self.ttl if max_age is None else max_age
+        with self._refresh_lock:
+            if self._now() - self.last_refresh <= max_age:
+                return True
+            clusters = self._list(f"name like '{self.seed}%'")
+            if clusters is None:
+                return False
+            self.prime(clusters)
+            names = set(cluster["name"] for cluster in clusters if "name" in cluster)
+            with self._lock:
+                # Clusters of the seed missing on the list have been deleted
+                for cluster_name in [name for name in self.clusters if name.startswith(self.seed) and name not in names]:
+                    self.clusters.pop(cluster_name, None)
+                    self.timestamps.pop(cluster_name, None)
+            self.last_refresh = self._now()
+            self.logging.debug(f"OCM metadata cache refreshed with {len(clusters)} clusters of seed {self.seed}")
+            return True
+
+    def get(self, cluster_name):
+        """Return the OCM record of a cluster, or None if it does not exist"""
+        with self._lock:
+            record = self.clusters.get(cluster_name)
+            if record is not None and self._fresh(self.timestamps[cluster_name]):
+                return record
+        if cluster_name.startswith(self.seed):
+            # Clusters created after the last list are not on it, list again if it is a few seconds old
+            self.refresh(max_age=min(self.ttl, 5) if record is None else None)
+            with self._lock:
+                if cluster_name in self.clusters:
+                    return self.clusters[cluster_name]
+        # Clusters out of the test, like management clusters, are searched by name
+        clusters = self._list(f"name = '{cluster_name}'")
+        self.prime(clusters if clusters else [])
+        with self._lock:
+            return self.clusters.get(cluster_name)
+
+    def invalidate(self, cluster_name):
+        with self._lock:
+            self.clusters.pop(cluster_name, None)
+            self.timestamps.pop(cluster_name, None)
+
+    def memoize(self, key, function):
+        """Return the value stored for key, calling function to obtain it the first time. None values are not stored"""
+        with self._lock:
+            if key in self.memos:
+                return self.memos[key]
+        value = function()
+        if value is not None:
+            with self._lock:
+                self.memos[key] = value
+        return value
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Module to share a single Azure Resource Manager REST client between all the clusters of the ARO platform
+"""
+import time
+import threading
+import requests
+from requests.adapters import HTTPAdapter
+from libs import polling
+
+
+class ArmClient:
+    """
+    Thread-safe ARM REST client with a token cache and a keep-alive connection pool.
+
+    The token is requested once and refreshed refresh_margin seconds before it expires, instead of once per call.
+    Throttled responses (429) and unavailable ones (503) are retried after the Retry-After header.
+
+    credential: azure.identity credential used to request the tokens
+    pool_size: connections kept open, it should match the number of clusters installed at the same time
+    scope: token scope, by default the ARM one. Other Azure APIs like Microsoft Graph only need their scope and base_url
+    base_url: prepended to the paths which are not absolute URLs
+    """
+
+    retry_status_codes = (429, 503)
+
+    def __init__(self, logging, credential, pool_size=10, scope="https://management.azure.com/.default", base_url="https://management.azure.com", max_retries=5, refresh_margin=300):
+        self.logging = logging
+        self.credential = credential
+        self.scope = scope
+        self.base_url = base_url.rstrip("/")
+        self.max_retries = max_retries
+        self.refresh_margin = refresh_margin
+        self._token = None
+        self._token_lock = threading.Lock()
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def token(self):
+        """Return a valid access token, requesting a new one only when the cached one is about to expire"""
+        with self._token_lock:
+            if self._token is None or self._token.expires_on - time.time() < self.refresh_margin:
+                self._token = self.credential.get_token(self.scope)
+                self.logging.debug(f"Obtained new token for {self.scope}, expiring at {self._token.expires_on}")
+            return self._token.token
+
+    def headers(self):
+        return {"Authorization": f"Bearer {self.token()}", "Content-Type": "application/json"}
+
+    def _retry_after(self, response, attempt):
+        """Seconds to wait before retrying, from the Retry-After header or jittered exponential when it is missing"""
+        try:
+            return max(1, int(response.headers.get("Retry-After")))
+        except (TypeError, ValueError):
+            return round(polling.backoff(attempt, initial=2, maximum=60), 1)
+
+    def request(self, method, url, **kwargs):
+        """
+        Send a request to ARM and return the requests.Response.
+
+        url can be a path like /subscriptions/... or an absolute URL, like the ones on Location headers.
+        Throttled responses are retried up to max_retries times, the last response is returned as it is.
+        """
+        if not url.startswith("http"):
+            url = self.base_url + url
+        headers = kwargs.pop("headers", {})
+        attempt = 0
+        while True:
+            response = self.session.request(method, url, headers={**self.headers(), **headers}, **kwargs)
+            if response.status_code not in self.retry_status_codes or attempt >= self.max_retries:
+                return response
+            attempt += 1
+            wait = self._retry_after(response, attempt)
+            self.logging.warning(f"{method} {url.split('?')[0]} returned {response.status_code}, retrying in {wait} seconds ({attempt}/{self.max_retries})")
+            time.sleep(wait)
+
+    def get(self, url, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    def close(self):
+        self.session.close()
@@ -10,6 +10,7 @@ from azure.mgmt.resource import ResourceManagementClient, SubscriptionClient
 from azure.core.exceptions import HttpResponseError
 from libs.platforms.platform import Platform
 from libs.platforms.platform import PlatformArguments
+from libs.platforms.aro.arm import ArmClient
 
 
 class Aro(Platform):
@@ -72,6 +73,10 @@ class Aro(Platform):
         # Initialize Azure Resource Management Client
         self.resource_client = ResourceManagementClient(self.credential, self.environment['subscription_id'])
 
+        # REST client shared by all the clusters, one connection per cluster installed at the same time
+        concurrency = self.environment["max_concurrency"] or self.environment["batch_size"] or self.environment["cluster_count"]
+        self.arm = ArmClient(self.logging, self.credential, pool_size=max(10, concurrency))
+
         # Verify subscription access using SubscriptionClient
         self.logging.info("Verifying Azure subscription access")
         try:
@@ -123,6 +128,7 @@ class Aro(Platform):
 
     def platform_cleanup(self):
         super().platform_cleanup()
+        self.arm.close()
 
     def create_cluster(self, platform, cluster_name):
         super().create_cluster(platform, cluster_name)
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Module to group the infrastructure of several ARO clusters into a single ARM deployment
+"""
+import threading
+import concurrent.futures
+
+
+class InfraBatcher:
+    """
+    Batches of infrastructure requests of the clusters.
+
+    A batch is deployed as soon as batch_size clusters joined it, or linger seconds after its first cluster joined,
+    whatever happens first. The cluster completing a batch deploys it from its own thread, the others wait for it.
+
+    deploy: callable receiving the batch number and a dict of requests keyed by cluster name. It returns a dict keyed by
+    cluster name with the outputs of every cluster, or with the Exception of the clusters which failed
+    """
+
+    def __init__(self, logging, deploy, batch_size, linger=10):
+        self.logging = logging
+        self.deploy = deploy
+        self.batch_size = batch_size
+        self.linger = linger
+        self.batches = 0
+        self._pending = {}
+        self._lock = threading.Lock()
+        self._timer = None
+
+    def submit(self, cluster_name, request):
+        """Add the cluster to the current batch and return its outputs once the batch is deployed, raising its error if it failed"""
+        future = concurrent.futures.Future()
+        with self._lock:
+            self._pending[cluster_name] = (request, future)
+            batch = self._take() if len(self._pending) >= self.batch_size else None
+            if batch is None and self._timer is None:
+                self._timer = threading.Timer(self.linger, self._flush)
+                self._timer.daemon = True
+                self._timer.start()
+        if batch is not None:
+            self._deploy(*batch)
+        return future.result()
+
+    def _take(self):
+        # Called with the lock held
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if not self._pending:
+            return None
+        self.batches += 1
+        batch, self._pending = self._pending, {}
+        return self.batches, batch
+
+    def _flush(self):
+        with self._lock:
+            # A timer that fired while submit() took its batch must not take the next one
+            if self._timer is not threading.current_thread():
+                return
+            batch = self._take()
+        if batch is not None:
+            self._deploy(*batch)
+
+    def _deploy(self, number, batch):
+        self.logging.info(f"Deploying infrastructure batch {number} of {len(batch)} clusters: {', '.join(batch)}")
+        try:
+            results = self.deploy(number, {cluster_name: request for cluster_name, (request, future) in batch.items()})
+        except Exception as err:
+            results = {cluster_name: err for cluster_name in batch}
+        for cluster_name, (request, future) in batch.items():
+            result = results.get(cluster_name, Exception(f"No outputs for {cluster_name} in infrastructure batch {number}"))
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
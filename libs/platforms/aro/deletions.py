@@ -0,0 +1,164 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Module to follow the deletion of all the ARO clusters from a single background thread instead of one blocked thread per cluster
+"""
+import datetime
+import threading
+
+
+class DeletionTracker:
+    """
+    In-flight deletions of ARO clusters and of their resource groups.
+
+    The DELETE requests are sent without waiting for their long running operations. Every interval seconds the tracker
+    lists the clusters and the resource groups once to find the deletions that finished, then it starts the deletion of
+    the resource groups of the deleted clusters and calls back the platform when a resource group is gone.
+
+    list_clusters: callable returning the names of the existing clusters, or None when the list failed
+    list_resource_groups: callable returning the names of the existing resource groups, or None when the list failed
+    delete_resource_group: callable starting the deletion of a resource group without waiting for it
+    timeout: seconds after which a deletion not finished is considered failed
+    """
+
+    def __init__(self, logging, list_clusters, list_resource_groups, delete_resource_group, interval=15, timeout=3600):
+        self.logging = logging
+        self.list_clusters = list_clusters
+        self.list_resource_groups = list_resource_groups
+        self.delete_resource_group = delete_resource_group
+        self.interval = interval
+        self.timeout = timeout
+        self.deletions = {}
+        self.deleted = 0
+        self.failed = 0
+        self.first_start_time = None
+        self._condition = threading.Condition()
+        self._thread = None
+
+    def _now(self):
+        return int(datetime.datetime.now(datetime.timezone.utc).timestamp())
+
+    def track(self, cluster_name, resource_group, start_time, callback, cluster_deleted=False):
+        """
+        Follow the deletion of a cluster whose DELETE request has been accepted.
+
+        callback is called from the tracker thread with the cluster name and a dict with start_time, cluster_end_time,
+        resource_group_end_time and error (None on success). With cluster_deleted, the cluster was already gone and
+        the tracker starts straight with the resource group.
+        """
+        deletion = {"resource_group": resource_group, "start_time": start_time, "cluster_end_time": None, "resource_group_end_time": None, "error": None, "callback": callback}
+        if cluster_deleted:
+            deletion["cluster_end_time"] = self._now()
+            self._delete_resource_group(cluster_name, deletion)
+        with self._condition:
+            self.deletions[cluster_name] = deletion
+            if self.first_start_time is None:
+                self.first_start_time = start_time
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="aro-deletions")
+                self._thread.daemon = True
+                self._thread.start()
+
+    def is_tracking(self, cluster_name):
+        with self._condition:
+            return cluster_name in self.deletions
+
+    def in_flight(self):
+        with self._condition:
+            return len(self.deletions)
+
+    def wait(self, cancelled=None):
+        """Block until every tracked deletion finished. Return False if cancelled before"""
+        with self._condition:
+            while self.deletions:
+                if cancelled is not None and cancelled():
+                    self.logging.warning(f"Stopped waiting for {len(self.deletions)} deletions in progress")
+                    return False
+                self._condition.wait(timeout=5)
+        return True
+
+    def _delete_resource_group(self, cluster_name, deletion):
+        try:
+            self.delete_resource_group(deletion["resource_group"])
+            self.logging.info(f"[{cluster_name}] Resource group {deletion['resource_group']} deletion initiated")
+        except Exception as err:
+            deletion["error"] = f"Failed to delete resource group {deletion['resource_group']}: {err}"
+
+    def _run(self):
+        while True:
+            with self._condition:
+                if not self.deletions:
+                    self._thread = None
+                    self._condition.notify_all()
+                    return
+            self._tick()
+            with self._condition:
+                self._condition.wait(timeout=self.interval)
+
+    def _tick(self):
+        with self._condition:
+            deletions = dict(self.deletions)
+        pending_clusters = [cluster_name for cluster_name, deletion in deletions.items() if deletion["cluster_end_time"] is None]
+        pending_resource_groups = [cluster_name for cluster_name, deletion in deletions.items() if deletion["cluster_end_time"] is not None]
+
+        if pending_clusters:
+            existing_clusters = self._list("clusters", self.list_clusters)
+            if existing_clusters is not None:
+                now = self._now()
+                for cluster_name in [cluster_name for cluster_name in pending_clusters if cluster_name not in existing_clusters]:
+                    deletion = deletions[cluster_name]
+                    deletion["cluster_end_time"] = now
+                    self.logging.info(f"[{cluster_name}] Cluster resource deleted in {now - deletion['start_time']} seconds")
+                    self._delete_resource_group(cluster_name, deletion)
+
+        if pending_resource_groups:
+            existing_resource_groups = self._list("resource groups", self.list_resource_groups)
+            if existing_resource_groups is not None:
+                now = self._now()
+                for cluster_name in pending_resource_groups:
+                    deletion = deletions[cluster_name]
+                    if deletion["resource_group"] not in existing_resource_groups:
+                        deletion["resource_group_end_time"] = now
+
+        now = self._now()
+        finished = []
+        for cluster_name, deletion in deletions.items():
+            if deletion["error"] is None and deletion["resource_group_end_time"] is None and now - deletion["start_time"] > self.timeout:
+                deletion["error"] = f"Deletion not finished after {self.timeout} seconds"
+            if deletion["error"] is not None or deletion["resource_group_end_time"] is not None:
+                finished.append(cluster_name)
+
+        for cluster_name in finished:
+            deletion = deletions[cluster_name]
+            try:
+                deletion["callback"](cluster_name, deletion)
+            except Exception as err:
+                self.logging.error(f"[{cluster_name}] Failed to process the end of the deletion: {err}")
+            with self._condition:
+                self.deletions.pop(cluster_name, None)
+                if deletion["error"] is None:
+                    self.deleted += 1
+                else:
+                    self.failed += 1
+                self._condition.notify_all()
+
+        if finished or pending_clusters:
+            self._log_progress()
+
+    def _list(self, resource_type, list_function):
+        try:
+            return list_function()
+        except Exception as err:
+            self.logging.warning(f"Deletion tracker failed to list {resource_type}, retrying in {self.interval} seconds: {err}")
+            return None
+
+    def _log_progress(self):
+        with self._condition:
+            clusters = sum(1 for deletion in self.deletions.values() if deletion["cluster_end_time"] is None)
+            resource_groups = len(self.deletions) - clusters
+            deleted, failed = self.deleted, self.failed
+            elapsed = max(1, self._now() - self.first_start_time)
+        self.logging.info(
+            f"Deletions in progress: {clusters} clusters, {resource_groups} resource groups. "
+            f"Finished: {deleted} deleted, {failed} failed ({round(deleted * 60 / elapsed, 2)} clusters deleted per minute)"
+        )
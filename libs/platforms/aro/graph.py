@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Module to resolve the Azure AD objects used by the external auth of the ARO clusters through the Microsoft Graph API
+"""
+import time
+import threading
+import concurrent.futures
+from libs import polling
+
+LOCALHOST_REDIRECT_URI = "http://localhost:8000"
+
+
+class AdAppPool:
+    """
+    Azure AD group lookups and applications of the external auth of the clusters.
+
+    Group IDs are resolved once per execution. Applications and their secrets are created ahead of the clusters by a
+    small pool of workers, so the clusters only have to add the OAuth callback of their console as redirect URI.
+
+    graph: ArmClient with the Microsoft Graph scope and base URL, it retries the throttled (429) requests
+    workers: applications created at the same time, Graph throttles the creation of applications per tenant
+    """
+
+    def __init__(self, logging, graph, workers=4):
+        self.logging = logging
+        self.graph = graph
+        self.apps = {}
+        self.used = set()
+        self.groups = {}
+        self._lock = threading.Lock()
+        self._group_lock = threading.Lock()
+        self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="ad-apps")
+
+    def group_id(self, group_name):
+        """Return the object ID of an Azure AD group, looking it up only the first time"""
+        with self._group_lock:
+            if group_name not in self.groups:
+                response = self.graph.get("/groups", params={"$filter": f"displayName eq '{group_name}'", "$select": "id"})
+                response.raise_for_status()
+                groups = response.json().get("value", [])
+                if not groups:
+                    raise Exception(f"Azure AD group {group_name} not found")
+                self.groups[group_name] = groups[0]["id"]
+                self.logging.info(f"Azure AD group {group_name} resolved to {self.groups[group_name]}")
+            return self.groups[group_name]
+
+    def prefetch(self, display_names):
+        """Queue the creation of the applications not created or queued yet"""
+        with self._lock:
+            for display_name in display_names:
+                if display_name not in self.apps:
+                    self.apps[display_name] = self._executor.submit(self._create_app, display_name)
+
+    def _retry_not_found(self, method, url, **kwargs):
+        # Objects just created may not be replicated yet on every Graph node, they return 404 for a few seconds
+        for attempt in range(5):
+            response = self.graph.request(method, url, **kwargs)
+            if response.status_code != 404:
+                break
+            time.sleep(polling.backoff(attempt + 1))
+        response.raise_for_status()
+        return response
+
+    def _create_app(self, display_name):
+        response = self.graph.post("/applications", json={"displayName": display_name, "web": {"redirectUris": [LOCALHOST_REDIRECT_URI]}})
+        response.raise_for_status()
+        app = response.json()
+        secret = self._retry_not_found("POST", f"/applications/{app['id']}/addPassword", json={"passwordCredential": {"displayName": display_name}}).json()
+        self.logging.debug(f"AD App {display_name} created with Client ID {app['appId']}")
+        return {"id": app["id"], "app_id": app["appId"], "secret": secret["secretText"]}
+
+    def get(self, display_name, redirect_uri):
+        """
+        Return (client_id, client_secret) of the application, creating it now if it was not queued before,
+        after adding redirect_uri to its redirect URIs. Failed creations are forgotten so the next call tries again
+        """
+        self.prefetch([display_name])
+        with self._lock:
+            future = self.apps[display_name]
+            self.used.add(display_name)
+        try:
+            app = future.result()
+        except Exception:
+            with self._lock:
+                if self.apps.get(display_name) is future:
+                    del self.apps[display_name]
+            raise
+        self._retry_not_found("PATCH", f"/applications/{app['id']}", json={"web": {"redirectUris": [redirect_uri, LOCALHOST_REDIRECT_URI]}})
+        return app["app_id"], app["secret"]
+
+    def delete(self, display_name):
+        """Delete the application of a cluster, looking it up by name when it was not created by this execution"""
+        with self._lock:
+            future = self.apps.pop(display_name, None)
+            self.used.discard(display_name)
+        app_ids = []
+        if future is not None and not future.cancel():
+            try:
+                app_ids.append(future.result()["id"])
+            except Exception:
+                pass
+        if not app_ids:
+            response = self.graph.get("/applications", params={"$filter": f"displayName eq '{display_name}'", "$select": "id"})
+            response.raise_for_status()
+            app_ids = [app["id"] for app in response.json().get("value", [])]
+        for app_id in app_ids:
+            response = self.graph.request("DELETE", f"/applications/{app_id}")
+            if response.status_code != 404:
+                response.raise_for_status()
+            self.logging.debug(f"AD App {display_name} deleted")
+
+    def delete_unused(self):
+        """Delete the applications created ahead of clusters which never used them, cancelling the ones not created yet"""
+        with self._lock:
+            unused = [display_name for display_name in self.apps if display_name not in self.used]
+        if unused:
+            self.logging.info(f"Deleting {len(unused)} AD Apps not used by any cluster")
+        for display_name in unused:
+            with self._lock:
+                future = self.apps.pop(display_name, None)
+            if future is None or future.cancel():
+                continue
+            try:
+                app = future.result()
+            except Exception:
+                continue
+            try:
+                response = self.graph.request("DELETE", f"/applications/{app['id']}")
+                if response.status_code != 404:
+                    response.raise_for_status()
+            except Exception as err:
+                self.logging.warning(f"Failed to delete AD App {display_name}: {err}")
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
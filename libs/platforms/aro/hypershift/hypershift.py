@@ -2,23 +2,36 @@
 # -*- coding: utf-8 -*-
 import json
 import os
+import yaml
 import time
 import datetime
 import configparser
 import argparse
-import shlex
 from copy import deepcopy
 from azure.mgmt.resource.resources.v2022_09_01.models import DeploymentMode, Deployment, DeploymentProperties
 from azure.core.exceptions import HttpResponseError
 import requests
 import subprocess
-from kubernetes import client as k8s_client, config as k8s_config
+from kubernetes import client as k8s_client
 from kubernetes.client.rest import ApiException
+from libs import instrumentation
+from libs import polling
+from libs.fleet import FleetPoller
+from libs.informers import infra_selector, nodepool_selector
 from libs.platforms.aro.aro import Aro
 from libs.platforms.aro.aro import AroArguments
+from libs.platforms.aro.templates import BicepTemplateCache
+from libs.platforms.aro.deletions import DeletionTracker
+from libs.platforms.aro.stages import StagePipeline
+from libs.platforms.aro.graph import AdAppPool
+from libs.platforms.aro.batches import InfraBatcher
+from libs.platforms.aro.arm import ArmClient
 
 
 class Hypershift(Aro):
+    ready_states = ("Succeeded",)
+    error_states = ("Failed",)
+
     def __init__(self, arguments, logging, utils, es):
         super().__init__(arguments, logging, utils, es)
 
@@ -42,6 +55,18 @@ class Hypershift(Aro):
         self.environment["add_aro_hcp_infra"] = arguments["add_aro_hcp_infra"]
         self.environment["issuer_url"] = arguments["issuer_url"]
         self.environment["azure_prom_token_file"] = arguments["azure_prom_token_file"]
+        self.environment["ad_app_workers"] = arguments["ad_app_workers"]
+        # Compiled Bicep templates shared by all the clusters
+        self.bicep = BicepTemplateCache(logging, self.environment["path"] + "/bicep")
+        # Single subscription wide list of hcpOpenShiftClusters feeding the provisioning waits, the watcher and get_metadata
+        self.fleet = FleetPoller(logging, utils, "hcpopenshiftclusters", self._list_hcp_clusters, state_function=self._hcp_cluster_state, interval=arguments["fleet_poll_interval"])
+        self.fleet.subscribe(lambda event: self.tracker.update(event["cluster_name"], event["state"]))
+        # In-flight cluster and resource group deletions, followed from one thread with bulk lists
+        self.deletions = DeletionTracker(logging, self._existing_clusters, self._existing_resource_groups, self._delete_resource_group, interval=arguments["fleet_poll_interval"])
+        # Optional subscription scope deployments creating the resource groups and the infrastructure of several clusters at once
+        self.environment["infra_batch_size"] = arguments["infra_batch_size"]
+        self.environment["infra_batch_linger"] = arguments["infra_batch_linger"]
+        self.infra_batcher = InfraBatcher(logging, self._deploy_infra_batch, arguments["infra_batch_size"], linger=arguments["infra_batch_linger"]) if arguments["infra_batch_size"] > 1 else None
 
     def initialize(self):
         super().initialize()
@@ -54,6 +79,21 @@ class Hypershift(Aro):
         # Convert string boolean arguments to actual booleans
         self.environment["add_aro_hcp_infra"] = self._str_to_bool(self.environment.get("add_aro_hcp_infra", "False"))
 
+        # Compile the Bicep templates now, out of the critical path of the clusters
+        templates = ["customer-infra.bicep", "cluster.bicep", "nodepool.bicep"]
+        if self.environment.get("issuer_url"):
+            templates.append("externalauth.bicep")
+        if self.environment["add_aro_hcp_infra"]:
+            templates.append("nodepool-infra.bicep")
+        self.bicep.warm([self._get_bicep_template_path(template) for template in templates])
+
+        # Azure AD lookups and applications through Microsoft Graph, applications are created ahead of the clusters
+        self.graph = ArmClient(self.logging, self.credential, pool_size=self.environment["ad_app_workers"] + 2, scope="https://graph.microsoft.com/.default", base_url="https://graph.microsoft.com/v1.0")
+        self.ad_apps = AdAppPool(self.logging, self.graph, workers=self.environment["ad_app_workers"])
+        if self.environment.get("issuer_url") and self.environment["install_clusters"]:
+            self.logging.info(f"Creating AD Apps of {self.environment['cluster_count']} clusters in background with {self.environment['ad_app_workers']} workers")
+            self.ad_apps.prefetch([f"{self.environment['cluster_name_seed']}-{index}-auth" for index in range(1, self.environment["cluster_count"] + 1)])
+
         self.logging.info("ARO Hypershift platform initialized")
 
     def _str_to_bool(self, value):
@@ -93,6 +133,9 @@ class Hypershift(Aro):
         Raises:
             Exception: If resource group creation or infrastructure deployment fails
         """
+        if self.infra_batcher is not None:
+            return self._create_batched_infrastructure(cluster_name, customer_rg_name, location, ticket_id, customer_nsg, customer_vnet_name, customer_vnet_subnet1, cluster_path)
+
         # Step 1: Create Resource Group
         self.logging.info(f"[{cluster_name}] Creating resource group {customer_rg_name}")
         from azure.mgmt.resource.resources.v2022_09_01.models import ResourceGroup
@@ -119,19 +162,8 @@ class Hypershift(Aro):
             "customerVnetSubnetName": {"value": customer_vnet_subnet1}
         }
 
-        # Compile Bicep template to JSON
-        import subprocess
-        output_file = os.path.join(cluster_path, "customer-infra.json")
-        compile_cmd = f"az bicep build --file {shlex.quote(bicep_template_path)} --outfile {shlex.quote(output_file)}"
-        compile_result = subprocess.run(compile_cmd, shell=True, capture_output=True, text=True)
-
-        if compile_result.returncode != 0:
-            self.logging.error(f"[{cluster_name}] Failed to compile Bicep template: {compile_result.stderr}")
-            raise Exception(f"Bicep compilation failed: {compile_result.stderr}")
-
-        compiled_template_path = f"{cluster_path}/customer-infra.json"
-        with open(compiled_template_path, 'r') as f:
-            template_json = json.load(f)
+        # Compiled Bicep template, from the cache
+        template_json = self.bicep.get(bicep_template_path, copy_to=os.path.join(cluster_path, "customer-infra.json"))
 
         # Create deployment
         deployment_properties = DeploymentProperties(
@@ -182,6 +214,179 @@ class Hypershift(Aro):
 
         return key_vault_name, customer_rg_name
 
+    def _create_batched_infrastructure(self, cluster_name, customer_rg_name, location, ticket_id, customer_nsg, customer_vnet_name, customer_vnet_subnet1, cluster_path):
+        """
+        Create resource group and infrastructure of the cluster as part of the next infrastructure batch.
+
+        Args and return value are the ones of _create_infrastructure
+        """
+        self.logging.info(f"[{cluster_name}] Adding resource group {customer_rg_name} and its infrastructure to the next infrastructure batch")
+        infra_request = {
+            "resource_group": customer_rg_name,
+            "location": location,
+            "ticket_id": ticket_id,
+            "nsg_name": customer_nsg,
+            "vnet_name": customer_vnet_name,
+            "subnet_name": customer_vnet_subnet1,
+            "path": cluster_path
+        }
+        try:
+            outputs = self.infra_batcher.submit(cluster_name, infra_request)
+        except Exception as err:
+            self.logging.error(f"[{cluster_name}] Failed to create infrastructure: {err}")
+            raise
+        self.logging.info(f"[{cluster_name}] Infrastructure created by deployment {outputs['deployment']}, Key Vault name: {outputs['keyVaultName']}")
+
+        deployment_output_file = os.path.join(cluster_path, "infra-deployment-result.json")
+        try:
+            with open(deployment_output_file, 'w') as f:
+                json.dump(outputs, f, indent=2, default=str)
+        except Exception as save_err:
+            self.logging.warning(f"[{cluster_name}] Failed to save deployment result JSON: {save_err}")
+
+        return outputs["keyVaultName"], customer_rg_name
+
+    def _infra_batch_template(self, infra_template):
+        """
+        Subscription scope ARM template creating a resource group per cluster and deploying on each one the
+        customer-infra template as a nested deployment named infra, like the per cluster deployments
+        """
+        cluster = "parameters('clusters')[copyIndex()]"
+        count = "[length(parameters('clusters'))]"
+        return {
+            "$schema": "https://schema.management.azure.com/schemas/2018-05-01/subscriptionDeploymentTemplate.json#",
+            "contentVersion": "1.0.0.0",
+            "parameters": {
+                "clusters": {"type": "array"},
+                "location": {"type": "string"},
+                "ticketId": {"type": "string"}
+            },
+            "resources": [
+                {
+                    "type": "Microsoft.Resources/resourceGroups",
+                    "apiVersion": "2022-09-01",
+                    "name": f"[{cluster}.resourceGroup]",
+                    "location": "[parameters('location')]",
+                    "tags": {"TicketId": "[parameters('ticketId')]"},
+                    "copy": {"name": "resourceGroups", "count": count}
+                },
+                {
+                    "type": "Microsoft.Resources/deployments",
+                    "apiVersion": "2022-09-01",
+                    "name": "infra",
+                    "resourceGroup": f"[{cluster}.resourceGroup]",
+                    "dependsOn": [f"[subscriptionResourceId('Microsoft.Resources/resourceGroups', {cluster}.resourceGroup)]"],
+                    "copy": {"name": "infra", "count": count},
+                    "properties": {
+                        "mode": "Incremental",
+                        "expressionEvaluationOptions": {"scope": "inner"},
+                        "template": infra_template,
+                        "parameters": {
+                            "customerNsgName": {"value": f"[{cluster}.nsgName]"},
+                            "customerVnetName": {"value": f"[{cluster}.vnetName]"},
+                            "customerVnetSubnetName": {"value": f"[{cluster}.subnetName]"}
+                        }
+                    }
+                }
+            ],
+            "outputs": {
+                "keyVaultNames": {
+                    "type": "array",
+                    "copy": {
+                        "count": count,
+                        "input": f"[reference(resourceId({cluster}.resourceGroup, 'Microsoft.Resources/deployments', 'infra'), '2022-09-01').outputs.keyVaultName.value]"
+                    }
+                }
+            }
+        }
+
+    def _deploy_infra_batch(self, batch_number, infra_requests):
+        """
+        Deploy the infrastructure of a batch of clusters with a single subscription scope deployment.
+
+        Args:
+            batch_number: Number of the batch, used on the deployment name
+            infra_requests: Dict of infrastructure requests built by _create_batched_infrastructure, keyed by cluster name
+
+        Returns:
+            dict: Outputs of every cluster keyed by cluster name, or the Exception of the clusters whose infrastructure failed
+        """
+        deployment_name = f"{self.environment['cluster_name_seed']}-infra-{batch_number}"
+        infra_template = self.bicep.get(self._get_bicep_template_path("customer-infra.bicep"))
+        clusters = []
+        for cluster_name, infra_request in infra_requests.items():
+            clusters.append({
+                "name": cluster_name,
+                "resourceGroup": infra_request["resource_group"],
+                "nsgName": infra_request["nsg_name"],
+                "vnetName": infra_request["vnet_name"],
+                "subnetName": infra_request["subnet_name"]
+            })
+            with open(os.path.join(infra_request["path"], "customer-infra.json"), "w") as template_file:
+                json.dump(infra_template, template_file, indent=2)
+        first_request = next(iter(infra_requests.values()))
+
+        deployment = Deployment(
+            location=first_request["location"],
+            properties=DeploymentProperties(
+                mode=DeploymentMode.INCREMENTAL,
+                template=self._infra_batch_template(infra_template),
+                parameters={
+                    "clusters": {"value": clusters},
+                    "location": {"value": first_request["location"]},
+                    "ticketId": {"value": first_request["ticket_id"]}
+                }
+            )
+        )
+        try:
+            deployment_result = self.resource_client.deployments.begin_create_or_update_at_subscription_scope(
+                deployment_name=deployment_name,
+                parameters=deployment
+            ).result()
+            key_vault_names = deployment_result.properties.outputs["keyVaultNames"]["value"]
+            self.logging.info(f"Infrastructure deployment {deployment_name} of {len(clusters)} clusters created successfully")
+            return {cluster["name"]: {"deployment": deployment_name, "keyVaultName": key_vault_name} for cluster, key_vault_name in zip(clusters, key_vault_names)}
+        except HttpResponseError as err:
+            self.logging.error(f"Infrastructure deployment {deployment_name} failed, checking the infrastructure of every cluster: {err}")
+
+        # A single failed cluster fails the whole deployment, keep the clusters whose nested deployment succeeded
+        results = {}
+        for cluster in clusters:
+            try:
+                infra_deployment = self.resource_client.deployments.get(resource_group_name=cluster["resourceGroup"], deployment_name="infra")
+                outputs = infra_deployment.properties.outputs or {}
+                if infra_deployment.properties.provisioning_state == "Succeeded" and "keyVaultName" in outputs:
+                    results[cluster["name"]] = {"deployment": deployment_name, "keyVaultName": outputs["keyVaultName"]["value"]}
+                    continue
+            except HttpResponseError:
+                pass
+            results[cluster["name"]] = Exception(f"Infrastructure deployment failed: nested deployment of {deployment_name} did not succeed")
+        return results
+
+    def _list_hcp_clusters(self):
+        """
+        List the hcpOpenShiftClusters of the subscription following the nextLink of every page.
+
+        Returns:
+            dict: Clusters of the seed keyed by name, or None if the list failed
+        """
+        clusters = {}
+        url = f"/subscriptions/{self.environment['subscription_id']}/providers/Microsoft.RedHatOpenShift/hcpOpenShiftClusters?api-version=2024-06-10-preview"
+        while url:
+            response = self.arm.get(url)
+            if response.status_code != 200:
+                self.logging.error(f"Failed to list hcpOpenShiftClusters, status code {response.status_code}: {response.text[:500]}")
+                return None
+            result = response.json()
+            for cluster in result.get("value", []):
+                if cluster.get("name", "").startswith(self.environment["cluster_name_seed"]):
+                    clusters[cluster["name"]] = cluster
+            url = result.get("nextLink")
+        return clusters
+
+    def _hcp_cluster_state(self, cluster):
+        return cluster.get("properties", {}).get("provisioningState", None)
+
     def _check_cluster_exists_and_ready(self, cluster_name, customer_rg_name, subscription_id):
         """
         Check if the cluster already exists and is in a succeeded/ready state.
@@ -192,17 +397,7 @@ class Hypershift(Aro):
         try:
             api_version = "2024-06-10-preview"
             cluster_resource_id = f"/subscriptions/{subscription_id}/resourceGroups/{customer_rg_name}/providers/Microsoft.RedHatOpenShift/hcpOpenShiftClusters/{cluster_name}"
-            cluster_url = f"https://management.azure.com{cluster_resource_id}?api-version={api_version}"
-
-            # Get access token
-            token = self.credential.get_token("https://management.azure.com/.default").token
-
-            headers = {
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json"
-            }
-
-            response = requests.get(cluster_url, headers=headers)
+            response = self.arm.get(f"{cluster_resource_id}?api-version={api_version}")
 
             if response.status_code == 404:
                 self.logging.info(f"[{cluster_name}] Cluster does not exist")
@@ -359,21 +554,15 @@ class Hypershift(Aro):
             self.logging.info(f"[{cluster_name}] Step 4: Creating ARO HCP cluster deployment")
             cluster_bicep_path = self._get_bicep_template_path("cluster.bicep")
 
-            # Compile cluster Bicep template
-            output_file = os.path.join(cluster_info['path'], "cluster.json")
-            compile_cmd = f"az bicep build --file {shlex.quote(cluster_bicep_path)} --outfile {shlex.quote(output_file)}"
-            compile_result = subprocess.run(compile_cmd, shell=True, capture_output=True, text=True)
-
-            if compile_result.returncode != 0:
-                self.logging.error(f"[{cluster_name}] Failed to compile cluster Bicep template: {compile_result.stderr}")
+            # Compiled cluster Bicep template, from the cache
+            try:
+                cluster_template_json = self.bicep.get(cluster_bicep_path, copy_to=os.path.join(cluster_info['path'], "cluster.json"))
+            except Exception as err:
+                self.logging.error(f"[{cluster_name}] Failed to compile cluster Bicep template: {err}")
                 cluster_info["status"] = "Failed - Cluster Bicep Compilation"
                 self.utils.increment_counter("clusters_created_failed")
                 return 1
 
-            compiled_cluster_template_path = f"{cluster_info['path']}/cluster.json"
-            with open(compiled_cluster_template_path, 'r') as f:
-                cluster_template_json = json.load(f)
-
             # Prepare parameters for cluster deployment
             aro_version = self.environment.get("aro_version", "4.20.8")
             aro_version_channel = self.environment.get("aro_version_channel", "stable")
@@ -430,44 +619,38 @@ class Hypershift(Aro):
                 provisioning_state = None
                 cluster_ready_time = None
 
+                # The provisioning state comes from the shared hcpOpenShiftClusters list, not from one GET per cluster
+                self.fleet.start()
                 while datetime.datetime.now(datetime.timezone.utc).timestamp() < provisioning_start_time + wait_timeout:
                     if self.utils.force_terminate:
                         self.logging.error(f"[{cluster_name}] Exiting cluster creation after capturing Ctrl-C")
                         return 0
 
-                    try:
-                        # Get current deployment status
-                        deployment = self.resource_client.deployments.get(
-                            resource_group_name=customer_rg_name,
-                            deployment_name="aro-hcp"
-                        )
-
-                        if deployment.properties and deployment.properties.provisioning_state:
-                            provisioning_state = deployment.properties.provisioning_state
-                            self.logging.info(f"[{cluster_name}] Cluster deployment provisioning state: {provisioning_state}")
-
-                            if provisioning_state == "Succeeded":
-                                cluster_info["status"] = "ready"
-                                cluster_ready_time = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
-                                self.logging.info(f"[{cluster_name}] Cluster deployment provisioning state is Succeeded, status updated to ready")
-                                break
-                            elif provisioning_state == "Failed":
-                                cluster_info["status"] = "Failed - Cluster Deployment"
-                                self.logging.error(f"[{cluster_name}] Cluster deployment provisioning state is Failed")
-                                self.utils.increment_counter("clusters_created_failed")
-                                return 1
-                            else:
-                                cluster_info["status"] = "Installing"
-                                elapsed_time = int(datetime.datetime.now(datetime.timezone.utc).timestamp()) - provisioning_start_time
-                                self.logging.info(f"[{cluster_name}] Cluster deployment provisioning state is Running (elapsed: {elapsed_time}s), waiting...")
-                        else:
-                            self.logging.warning(f"[{cluster_name}] Could not determine provisioning state from deployment, waiting...")
-                            cluster_info["status"] = "Installing"
-                    except HttpResponseError as err:
-                        self.logging.warning(f"[{cluster_name}] Error checking deployment status: {err}, waiting...")
-
-                    # Wait before next check
-                    time.sleep(check_interval)
+                    # Wakes up as soon as the state changes on the list, or after check_interval to check Ctrl-C and the timeout
+                    current_state = self.fleet.wait_for_change(cluster_name, provisioning_state, timeout=check_interval)
+                    elapsed_time = int(datetime.datetime.now(datetime.timezone.utc).timestamp()) - provisioning_start_time
+                    if current_state is None:
+                        self.logging.info(f"[{cluster_name}] Cluster not listed yet on the hcpOpenShiftClusters list (elapsed: {elapsed_time}s), waiting...")
+                        cluster_info["status"] = "Installing"
+                        continue
+                    if current_state == provisioning_state:
+                        continue
+                    provisioning_state = current_state
+                    self.logging.info(f"[{cluster_name}] Cluster provisioning state: {provisioning_state}")
+
+                    if provisioning_state == "Succeeded":
+                        cluster_info["status"] = "ready"
+                        cluster_ready_time = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
+                        self.logging.info(f"[{cluster_name}] Cluster provisioning state is Succeeded, status updated to ready")
+                        break
+                    elif provisioning_state == "Failed":
+                        cluster_info["status"] = "Failed - Cluster Deployment"
+                        self.logging.error(f"[{cluster_name}] Cluster provisioning state is Failed")
+                        self.utils.increment_counter("clusters_created_failed")
+                        return 1
+                    else:
+                        cluster_info["status"] = "Installing"
+                        self.logging.info(f"[{cluster_name}] Cluster provisioning state is {provisioning_state} (elapsed: {elapsed_time}s), waiting...")
 
                 # Check if we timed out
                 if provisioning_state not in ["Succeeded", "Failed"]:
@@ -481,19 +664,16 @@ class Hypershift(Aro):
                 self.logging.error(f"[{cluster_name}] Failed to create ARO HCP cluster deployment: {err}")
                 # Retry checking cluster state for up to 5 minutes
                 self.logging.info(f"[{cluster_name}] Checking cluster state for up to 5 minutes...")
-                retry_timeout = 300  # 5 minutes
-                retry_interval = 30  # Check every 30 seconds
-                retry_start = datetime.datetime.now(datetime.timezone.utc).timestamp()
+                poll = polling.PollingPolicy("aro_deployment_recheck", initial=10, maximum=60, timeout=300)
 
-                while datetime.datetime.now(datetime.timezone.utc).timestamp() < retry_start + retry_timeout:
-                    time.sleep(retry_interval)
-                    elapsed = int(datetime.datetime.now(datetime.timezone.utc).timestamp() - retry_start)
-                    self.logging.info(f"[{cluster_name}] Checking cluster provisioning state ({elapsed}s elapsed)...")
+                while poll.sleep():
+                    self.logging.info(f"[{cluster_name}] Checking cluster provisioning state ({int(poll.elapsed())}s elapsed)...")
 
                     metadata = self.get_metadata(platform, cluster_name)
                     actual_state = metadata.get("status") or metadata.get("provisioning_state")
 
                     if actual_state == "Succeeded":
+                        poll.done()
                         self.logging.info(f"[{cluster_name}] Cluster is in Succeeded state, continuing...")
                         cluster_info["status"] = "ready"
                         cluster_ready_time = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
@@ -532,65 +712,71 @@ class Hypershift(Aro):
         else:
             self.logging.debug(f"[{cluster_name}] MC_NAME environment variable not set, mgmt_cluster_name will not be set")
 
-        # Create nodepools before downloading kubeconfig
-        if cluster_info.get("workers", 0) > 0:
-            self.logging.info(f"[{cluster_name}] Creating nodepools with {cluster_info.get('workers')} workers")
-            try:
-                # Get nodepool parameters from cluster_info or use defaults
-                replica = cluster_info.get("workers", 0)
-                node_size = cluster_info.get("node_size") or self.environment.get("node_size")
-                autoscale = cluster_info.get("autoscale", False)
-                max_replica = cluster_info.get("max_replicas") if autoscale else None
-                min_replica = cluster_info.get("min_replicas") if autoscale else None
-                # Default to False if not specified
-                add_aro_hcp_infra = self.environment.get("add_aro_hcp_infra")
-                if add_aro_hcp_infra is None:
-                    add_aro_hcp_infra = False
-
-                self.create_nodepool(
-                    cluster_name=cluster_name,
-                    replica=replica,
-                    max_replica=max_replica,
-                    min_replica=min_replica,
-                    node_size=node_size,
-                    autoscale=autoscale,
-                    customer_rg_name=customer_rg_name,
-                    add_aro_hcp_infra=add_aro_hcp_infra
-                )
-                self.logging.info(f"[{cluster_name}] Nodepools created successfully")
-            except Exception as err:
-                self.logging.error(f"[{cluster_name}] Failed to create nodepools: {err}")
-                self.logging.warning(f"[{cluster_name}] Continuing with kubeconfig download despite nodepool creation failure")
+        # Post-create stages, run as a dependency graph: every stage starts as soon as the stages it requires succeeded
+        issuer_url = self.environment.get("issuer_url")
+        external_auth_name = f"{cluster_name}-auth"
+        add_aro_hcp_infra = self.environment.get("add_aro_hcp_infra", False)
+        autoscale = cluster_info.get("autoscale", False)
+        expected_workers = cluster_info.get("workers", 0)
+        pipeline = StagePipeline(self.logging, cluster_name)
+
+        if expected_workers > 0:
+            self.logging.info(f"[{cluster_name}] Creating nodepools with {expected_workers} workers")
+            pipeline.add("nodepools", lambda results: self.create_nodepool(
+                cluster_name=cluster_name,
+                replica=expected_workers,
+                max_replica=cluster_info.get("max_replicas") if autoscale else None,
+                min_replica=cluster_info.get("min_replicas") if autoscale else None,
+                node_size=cluster_info.get("node_size") or self.environment.get("node_size"),
+                autoscale=autoscale,
+                customer_rg_name=customer_rg_name,
+                add_aro_hcp_infra=bool(add_aro_hcp_infra)
+            ))
         else:
             self.logging.info(f"[{cluster_name}] No workers specified, skipping nodepool creation")
 
-        # Download kubeconfig
-        self.logging.info(f"[{cluster_name}] Downloading kubeconfig")
-        kubeconfig_start_time = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
-        try:
-            # Get issuer_url from environment (default already set in initialize if needed)
-            issuer_url = self.environment.get("issuer_url")
-            kubeconfig_path = self.download_kubeconfig(
+        # The admin kubeconfig only needs the cluster resource, the external auth stages run beside it
+        pipeline.add("kubeconfig", lambda results: self._download_admin_kubeconfig(cluster_name, customer_rg_name, cluster_info["path"]))
+        if issuer_url:
+            pipeline.add("console_url", lambda results: self._wait_for_console_url(cluster_name))
+            pipeline.add("ad_app", lambda results: self._create_ad_app(cluster_name, external_auth_name, results["console_url"][0]), requires=["console_url"])
+            pipeline.add("external_auth", lambda results: self._deploy_external_auth(cluster_name, customer_rg_name, cluster_info["path"], external_auth_name, issuer_url, results["ad_app"][0]), requires=["ad_app"])
+            pipeline.add("external_auth_config", lambda results: self._configure_cluster_external_auth(cluster_name, results["kubeconfig"], external_auth_name, results["ad_app"][1]), requires=["kubeconfig", "external_auth"])
+        else:
+            self.logging.warning(f"[{cluster_name}] Issuer URL not provided, skipping external auth deployment")
+
+        nodepool_stages = ["nodepools"] if expected_workers > 0 else []
+        if cluster_info["workers_wait_time"] and expected_workers > 0:
+            pipeline.add("workers", lambda results: self._wait_for_workers(
+                kubeconfig=results["kubeconfig"],
+                worker_nodes=expected_workers,
+                wait_time=cluster_info["workers_wait_time"],
                 cluster_name=cluster_name,
-                platform=platform,
-                issuer_url=issuer_url,
-                customer_rg_name=customer_rg_name
-            )
-            kubeconfig_end_time = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
-            cluster_info["kubeconfig"] = kubeconfig_path
-            cluster_info["kubeconfig_download_time"] = kubeconfig_end_time - kubeconfig_start_time
-            self.logging.info(f"[{cluster_name}] Kubeconfig downloaded successfully in {cluster_info['kubeconfig_download_time']} seconds")
-        except Exception as err:
-            self.logging.error(f"[{cluster_name}] Failed to download kubeconfig file: {err}")
+                machinepool_name="np-scale" if autoscale else "np-static"
+            ), requires=["kubeconfig"] + nodepool_stages)
+        if add_aro_hcp_infra:
+            pipeline.add("infra", lambda results: self._setup_infra_nodes(cluster_info, results["kubeconfig"], cluster_name), requires=["kubeconfig"] + nodepool_stages)
+
+        cluster_info["stages"] = pipeline.run()
+
+        if "nodepools" in pipeline.errors:
+            self.logging.warning(f"[{cluster_name}] Failed to create nodepools: {pipeline.errors['nodepools']}")
+
+        # Download kubeconfig
+        if not pipeline.succeeded("kubeconfig"):
+            self.logging.error(f"[{cluster_name}] Failed to download kubeconfig file: {pipeline.errors.get('kubeconfig')}")
             self.logging.error(f"[{cluster_name}] Disabling wait for workers and workload execution")
             cluster_info["kubeconfig"] = None
             cluster_info["workers_wait_time"] = None
             cluster_info["status"] = "Ready. Not Access"
             self.utils.increment_counter("clusters_created_failed")
             return 1
+        cluster_info["kubeconfig"] = pipeline.results["kubeconfig"]
+        cluster_info["kubeconfig_download_time"] = cluster_info["stages"]["kubeconfig"]["duration"]
+        self.logging.info(f"[{cluster_name}] Kubeconfig downloaded successfully in {cluster_info['kubeconfig_download_time']} seconds")
 
-        # Set cluster_end_time before waiting for workers (install_duration should not include worker ready time)
-        cluster_end_time = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
+        # cluster_end_time is the end of the kubeconfig download (install_duration should not include worker ready time)
+        cluster_end_time = cluster_info["stages"]["kubeconfig"]["end_time"]
         cluster_info["status"] = "installed"
         cluster_info['cluster_end_time'] = cluster_end_time
         if cluster_ready_time:
@@ -603,77 +789,25 @@ class Hypershift(Aro):
         cluster_info["key_vault_name"] = key_vault_name
         cluster_info["managed_resource_group"] = managed_resource_group
 
-        # Wait for workers if configured
-        if cluster_info["workers_wait_time"]:
-            self.logging.info(f"[{cluster_name}] Waiting for workers to be ready")
-            try:
-                # Get expected worker count from cluster_info
-                expected_workers = cluster_info.get("workers", 0)
-                autoscale = cluster_info.get("autoscale", False)
-                if expected_workers > 0:
-                    # Wait for default worker nodepool (usually "np-static" or "workers")
-                    result = self._wait_for_workers(
-                        kubeconfig=cluster_info["kubeconfig"],
-                        worker_nodes=expected_workers,
-                        wait_time=cluster_info["workers_wait_time"],
-                        cluster_name=cluster_name,
-                        machinepool_name="np-scale" if autoscale else "np-static"
-                    )
+        # Workers readiness
+        if "workers" in pipeline.stages:
+            result = pipeline.results.get("workers")
+            if result and len(result) >= 3:
+                ready_workers = int(result[1]) if result[1] else 0
+                ready_timestamp = result[2] if result[2] else None
 
-                    if result and len(result) >= 3:
-                        ready_workers = int(result[1]) if result[1] else 0
-                        ready_timestamp = result[2] if result[2] else None
-
-                        if ready_workers == expected_workers and ready_timestamp:
-                            cluster_info["workers_ready"] = ready_timestamp - cluster_start_time
-                            self.logging.info(f"[{cluster_name}] All {ready_workers} workers are ready")
-                        else:
-                            cluster_info["workers_ready"] = None
-                            cluster_info["status"] = "Ready, missing workers"
-                            self.logging.warning(f"[{cluster_name}] Only {ready_workers}/{expected_workers} workers are ready")
-                    else:
-                        cluster_info["workers_ready"] = None
-                        self.logging.warning(f"[{cluster_name}] Failed to get workers ready status")
+                if ready_workers == expected_workers and ready_timestamp:
+                    cluster_info["workers_ready"] = ready_timestamp - cluster_start_time
+                    self.logging.info(f"[{cluster_name}] All {ready_workers} workers are ready")
                 else:
-                    self.logging.info(f"[{cluster_name}] No workers specified, skipping worker wait")
-            except Exception as err:
-                self.logging.error(f"[{cluster_name}] Error waiting for workers: {err}")
+                    cluster_info["workers_ready"] = None
+                    cluster_info["status"] = "Ready, missing workers"
+                    self.logging.warning(f"[{cluster_name}] Only {ready_workers}/{expected_workers} workers are ready")
+            else:
                 cluster_info["workers_ready"] = None
-
-        # Handle infra node setup if infra nodepool was created
-        add_aro_hcp_infra = self.environment.get("add_aro_hcp_infra", False)
-        if add_aro_hcp_infra and cluster_info.get("kubeconfig"):
-            self.logging.info(f"[{cluster_name}] Infra nodepool was requested, waiting for infra nodes and configuring components")
-            try:
-                # Wait for infra nodes to be ready (default 2 nodes, 15 min timeout)
-                infra_nodes_ready = self._wait_for_infra_nodes(
-                    kubeconfig=cluster_info["kubeconfig"],
-                    cluster_name=cluster_name,
-                    expected_infra_nodes=2,
-                    wait_time=15
-                )
-                cluster_info["infra_nodes_ready"] = infra_nodes_ready
-
-                if infra_nodes_ready >= 2:
-                    # Move infrastructure components to infra nodes
-                    infra_move_start = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
-                    move_success = self._move_infra_components(
-                        kubeconfig=cluster_info["kubeconfig"],
-                        cluster_name=cluster_name
-                    )
-                    infra_move_end = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
-                    cluster_info["infra_components_moved"] = move_success
-                    cluster_info["infra_setup_duration"] = infra_move_end - infra_move_start
-                    if move_success:
-                        self.logging.info(f"[{cluster_name}] Infrastructure components configured to use infra nodes")
-                    else:
-                        self.logging.warning(f"[{cluster_name}] Some infrastructure components may not be configured correctly")
-                else:
-                    self.logging.warning(f"[{cluster_name}] Not enough infra nodes ready, skipping component migration")
-                    cluster_info["infra_components_moved"] = False
-            except Exception as err:
-                self.logging.error(f"[{cluster_name}] Error setting up infra components: {err}")
-                cluster_info["infra_components_moved"] = False
+                self.logging.warning(f"[{cluster_name}] Failed to get workers ready status")
+        if "infra" in pipeline.stages and not pipeline.succeeded("infra"):
+            cluster_info["infra_components_moved"] = False
 
         self.logging.info(f"[{cluster_name}] ARO HCP cluster installation completed successfully")
         self.logging.info(f"[{cluster_name}] Total installation duration: {cluster_info['install_duration']} seconds")
@@ -741,49 +875,97 @@ class Hypershift(Aro):
         cluster_info["delete_start_time"] = delete_start_time
         cluster_info["status"] = "Deleting"
 
-        # Step 1: Delete the cluster resource first
+        # Step 1: Delete the cluster resource first. The deletion tracker follows it and then deletes the resource group
         self.logging.info(f"[{cluster_name}] Step 1: Deleting ARO HCP cluster resource")
+        cluster_deleted = False
+        delete_failed = False
         try:
-            # Use ResourceManagementClient to delete the cluster resource
             # Resource ID format: /subscriptions/{subscription}/resourceGroups/{rg}/providers/Microsoft.RedHatOpenShift/hcpOpenShiftClusters/{name}
             resource_id = f"/subscriptions/{self.environment.get('subscription_id')}/resourceGroups/{customer_rg_name}/providers/Microsoft.RedHatOpenShift/hcpOpenShiftClusters/{cluster_name}"
 
-            # Use the generic resource deletion API
-            delete_operation = self.resource_client.resources.begin_delete_by_id(
+            # Send the DELETE request without polling its long running operation
+            self.resource_client.resources.begin_delete_by_id(
                 resource_id=resource_id,
-                api_version="2024-06-10-preview"
+                api_version="2024-06-10-preview",
+                polling=False
             )
-            # Wait for deletion to complete
-            delete_operation.wait()
-            cluster_delete_end_time = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
-            self.logging.info(f"[{cluster_name}] Cluster resource deleted successfully")
+            self.logging.info(f"[{cluster_name}] Cluster resource deletion initiated")
         except HttpResponseError as err:
             if err.status_code == 404:
                 self.logging.warning(f"[{cluster_name}] Cluster resource not found, may already be deleted")
+                cluster_deleted = True
             else:
-                self.logging.warning(f"[{cluster_name}] Failed to delete cluster resource: {err}")
-                self.logging.warning(f"[{cluster_name}] Continuing with resource group deletion")
+                self.logging.error(f"[{cluster_name}] Failed to delete cluster resource: {err}")
+                delete_failed = True
         except Exception as err:
-            self.logging.warning(f"[{cluster_name}] Unexpected error deleting cluster resource: {err}")
+            self.logging.error(f"[{cluster_name}] Unexpected error deleting cluster resource: {err}")
+            delete_failed = True
+
+        # The AD App of the external auth is only used by this cluster
+        if self.environment.get("issuer_url"):
+            try:
+                self.ad_apps.delete(f"{cluster_name}-auth")
+            except Exception as err:
+                self.logging.warning(f"[{cluster_name}] Failed to delete AD App {cluster_name}-auth: {err}")
+
+        if delete_failed:
+            # The resource group is deleted anyway, it deletes the cluster resource with it
             self.logging.warning(f"[{cluster_name}] Continuing with resource group deletion")
+            cluster_info["status"] = "Delete Failed"
+            self.utils.increment_counter("clusters_deleted_failed")
+            self.deletions.track(cluster_name, customer_rg_name, delete_start_time, self._resource_group_deleted, cluster_deleted=True)
+            return 1
+
+        # Step 2 (resource group deletion) and the metadata are handled by the deletion tracker when the cluster is gone
+        self.deletions.track(
+            cluster_name, customer_rg_name, delete_start_time,
+            lambda name, deletion: self._deletion_finished(platform, name, deletion),
+            cluster_deleted=cluster_deleted
+        )
+        return 0
+
+    def deletion_in_progress(self, cluster_name):
+        return self.deletions.is_tracking(cluster_name)
+
+    def _existing_clusters(self):
+        """Names of the clusters on the hcpOpenShiftClusters list, listed again if it is older than the poll interval"""
+        if not self.fleet.refresh(max_age=self.deletions.interval):
+            return None
+        return set(self.fleet.snapshot())
+
+    def _existing_resource_groups(self):
+        return set(resource_group.name for resource_group in self.resource_client.resource_groups.list())
 
-        # Step 2: Delete resource group (this will delete all remaining resources)
-        self.logging.info(f"[{cluster_name}] Step 2: Deleting resource group {customer_rg_name}")
+    def _delete_resource_group(self, resource_group):
         try:
-            # Use begin_delete for async operation (no-wait equivalent)
-            delete_operation = self.resource_client.resource_groups.begin_delete(
-                resource_group_name=customer_rg_name
-            )
-            # Don't wait for completion (equivalent to --no-wait)
-            self.logging.info(f"[{cluster_name}] Resource group {customer_rg_name} deletion initiated")
+            self.resource_client.resource_groups.begin_delete(resource_group_name=resource_group, polling=False)
+        except HttpResponseError as err:
+            if err.status_code != 404:
+                raise
 
-            # Calculate deletion time
-            delete_end_time = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
-            cluster_info["destroy_duration"] = cluster_delete_end_time - delete_start_time
-            cluster_info["destroy_all_duration"] = delete_end_time - delete_start_time
-            cluster_info["status"] = "Deleted"
+    def _resource_group_deleted(self, cluster_name, deletion):
+        """Called by the deletion tracker when the resource group of a cluster whose deletion failed is deleted"""
+        if deletion["error"] is not None:
+            self.logging.error(f"[{cluster_name}] {deletion['error']}")
+        else:
+            self.logging.info(f"[{cluster_name}] Resource group {deletion['resource_group']} deleted")
+        self.utils.journal_record(cluster_name, {"status": "Delete Failed", "delete_finished": True})
 
-            self.logging.info(f"[{cluster_name}] Cluster deletion completed in {cluster_info['destroy_duration']} seconds")
+    def _deletion_finished(self, platform, cluster_name, deletion):
+        """
+        Called by the deletion tracker when the resource group of a cluster is deleted or the deletion failed.
+        Records the deletion times, writes metadata_destroy.json and indexes it on Elasticsearch.
+        """
+        cluster_info = platform.environment["clusters"][cluster_name]
+        if deletion["error"] is not None:
+            self.logging.error(f"[{cluster_name}] {deletion['error']}")
+            cluster_info["status"] = "Delete Failed"
+            self.utils.increment_counter("clusters_deleted_failed")
+        else:
+            cluster_info["destroy_duration"] = deletion["cluster_end_time"] - deletion["start_time"]
+            cluster_info["destroy_all_duration"] = deletion["resource_group_end_time"] - deletion["start_time"]
+            cluster_info["status"] = "Deleted"
+            self.logging.info(f"[{cluster_name}] Cluster deleted in {cluster_info['destroy_duration']} seconds, resource group {deletion['resource_group']} in {cluster_info['destroy_all_duration']} seconds")
 
             # Ensure directory exists and write metadata_destroy.json
             try:
@@ -805,47 +987,31 @@ class Hypershift(Aro):
                     self.logging.warning(f"[{cluster_name}] Failed to index deletion metadata to ES: {es_err}")
 
             self.utils.increment_counter("clusters_deleted_success")
-            return 0
-        except HttpResponseError as err:
-            self.logging.error(f"[{cluster_name}] Failed to delete resource group {customer_rg_name}: {err}")
-            cluster_info["status"] = "Delete Failed"
-            self.utils.increment_counter("clusters_deleted_failed")
-            return 1
-        except Exception as err:
-            self.logging.error(f"[{cluster_name}] Unexpected error deleting resource group {customer_rg_name}: {err}")
-            cluster_info["status"] = "Delete Failed"
-            self.utils.increment_counter("clusters_deleted_failed")
-            return 1
+        self.utils.journal_record(cluster_name, {"status": cluster_info["status"], "delete_finished": True})
 
-    def get_metadata(self, platform, cluster_name):
-        metadata = super().get_metadata(platform, cluster_name)
-        cluster_info = platform.environment["clusters"].get(cluster_name, {})
-        customer_rg_name = cluster_info.get("resource_group") or self.environment.get("customer_rg_name") or f"{cluster_name}-rg"
-        subscription_id = self.environment.get("subscription_id")
+    def _get_hcp_cluster(self, cluster_name, cluster_url):
+        """
+        Get the hcpOpenShiftCluster resource of a cluster from the shared list, listing again when it is older than the poll interval.
+        The resource is requested individually, with retries, only when the list call fails.
 
-        self.logging.info(f"[{cluster_name}] Getting metadata for ARO HCP cluster")
+        Returns:
+            dict: Cluster resource, or None if it cannot be retrieved
+        """
+        if self.fleet.refresh(max_age=self.fleet.interval):
+            azure_cluster_data = self.fleet.get(cluster_name)
+            if azure_cluster_data is None:
+                self.logging.warning(f"[{cluster_name}] Cluster not found on the hcpOpenShiftClusters list")
+            return azure_cluster_data
 
-        # Get cluster information from Azure REST API with retry logic
-        api_version = "2024-06-10-preview"
-        cluster_resource_id = f"/subscriptions/{subscription_id}/resourceGroups/{customer_rg_name}/providers/Microsoft.RedHatOpenShift/hcpOpenShiftClusters/{cluster_name}"
-        cluster_url = f"https://management.azure.com{cluster_resource_id}?api-version={api_version}"
+        self.logging.warning(f"[{cluster_name}] hcpOpenShiftClusters list failed, getting the cluster resource")
 
         max_retries = 3
-        retry_delay = 5  # seconds
         azure_cluster_data = None
 
         for attempt in range(1, max_retries + 1):
             try:
-                # Get access token
-                token = self.credential.get_token("https://management.azure.com/.default").token
-
-                headers = {
-                    "Authorization": f"Bearer {token}",
-                    "Content-Type": "application/json"
-                }
-
                 self.logging.debug(f"[{cluster_name}] Attempting to get metadata (attempt {attempt}/{max_retries})")
-                response = requests.get(cluster_url, headers=headers)
+                response = self.arm.get(cluster_url)
                 response.raise_for_status()
                 azure_cluster_data = response.json()
                 self.logging.info(f"[{cluster_name}] Successfully retrieved metadata on attempt {attempt}")
@@ -854,6 +1020,7 @@ class Hypershift(Aro):
             except requests.exceptions.RequestException as err:
                 if attempt < max_retries:
                     self.logging.warning(f"[{cluster_name}] Error getting metadata (attempt {attempt}/{max_retries}): {err}")
+                    retry_delay = round(polling.backoff(attempt, initial=5), 1)
                     self.logging.info(f"[{cluster_name}] Retrying in {retry_delay} seconds...")
                     time.sleep(retry_delay)
                 else:
@@ -861,10 +1028,27 @@ class Hypershift(Aro):
             except Exception as err:
                 if attempt < max_retries:
                     self.logging.warning(f"[{cluster_name}] Unexpected error getting metadata (attempt {attempt}/{max_retries}): {err}")
+                    retry_delay = round(polling.backoff(attempt, initial=5), 1)
                     self.logging.info(f"[{cluster_name}] Retrying in {retry_delay} seconds...")
                     time.sleep(retry_delay)
                 else:
                     self.logging.error(f"[{cluster_name}] Unexpected error after {max_retries} attempts: {err}")
+        return azure_cluster_data
+
+    def get_metadata(self, platform, cluster_name):
+        metadata = super().get_metadata(platform, cluster_name)
+        cluster_info = platform.environment["clusters"].get(cluster_name, {})
+        customer_rg_name = cluster_info.get("resource_group") or self.environment.get("customer_rg_name") or f"{cluster_name}-rg"
+        subscription_id = self.environment.get("subscription_id")
+
+        self.logging.info(f"[{cluster_name}] Getting metadata for ARO HCP cluster")
+
+        # Get cluster information from the hcpOpenShiftClusters list, or from Azure REST API with retry logic
+        api_version = "2024-06-10-preview"
+        cluster_resource_id = f"/subscriptions/{subscription_id}/resourceGroups/{customer_rg_name}/providers/Microsoft.RedHatOpenShift/hcpOpenShiftClusters/{cluster_name}"
+        cluster_url = f"{cluster_resource_id}?api-version={api_version}"
+
+        azure_cluster_data = self._get_hcp_cluster(cluster_name, cluster_url)
 
         # Process metadata if successfully retrieved
         if azure_cluster_data:
@@ -933,7 +1117,8 @@ class Hypershift(Aro):
 
     def download_kubeconfig(self, cluster_name, platform, external_auth_name=None, issuer_url=None, customer_rg_name=None):
         """
-        Download kubeconfig for an ARO HCP cluster.
+        Download kubeconfig for an ARO HCP cluster, running all the sub-steps in sequence.
+        create_cluster runs the same sub-steps as stages of a StagePipeline instead.
 
         Args:
             cluster_name: Name of the cluster
@@ -954,232 +1139,26 @@ class Hypershift(Aro):
         if external_auth_name is None:
             external_auth_name = f"{cluster_name}-auth"
 
-        subscription_id = self.environment.get("subscription_id")
-        api_version = "2024-06-10-preview"
-
         # Ensure path exists
         os.makedirs(path, exist_ok=True)
 
         try:
-            # Step 1: Get cluster info to get OAUTH_CALLBACK_URL and API_URL
-            # Retry loop: console URL may take a few minutes to generate
-            self.logging.info(f"[{cluster_name}] Step 1: Getting cluster information")
-            cluster_resource_id = f"/subscriptions/{subscription_id}/resourceGroups/{customer_rg_name}/providers/Microsoft.RedHatOpenShift/hcpOpenShiftClusters/{cluster_name}"
-            cluster_url = f"https://management.azure.com{cluster_resource_id}?api-version={api_version}"
-
-            # Get access token
-            token = self.credential.get_token("https://management.azure.com/.default").token
-
-            headers = {
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json"
-            }
-
-            # Retry loop: wait up to 30 minutes for console URL to be available
-            max_wait_time = 30 * 60  # 30 minutes in seconds
-            check_interval = 60  # 1 minute in seconds
-            start_time = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
-            console_url = ""
-            api_url = ""
-            cluster_info = None
-
-            while int(datetime.datetime.now(datetime.timezone.utc).timestamp()) < start_time + max_wait_time:
-                try:
-                    response = requests.get(cluster_url, headers=headers)
-                    response.raise_for_status()
-                    cluster_info = response.json()
+            # Steps 1-3: Get cluster info to get OAUTH_CALLBACK_URL and create the AD App with its secret
+            console_url, api_url = self._wait_for_console_url(cluster_name)
+            client_id, client_secret = self._create_ad_app(cluster_name, external_auth_name, console_url)
 
-                    console_url = cluster_info.get("properties", {}).get("console", {}).get("url", "")
-                    api_url = cluster_info.get("properties", {}).get("api", {}).get("url", "")
-
-                    if console_url and console_url.startswith("http"):
-                        self.logging.info(f"[{cluster_name}] Console URL is now available: {console_url}")
-                        break
-                    else:
-                        elapsed = int(datetime.datetime.now(datetime.timezone.utc).timestamp()) - start_time
-                        self.logging.info(f"[{cluster_name}] Console URL not yet available (elapsed: {elapsed}s), waiting {check_interval}s before retry...")
-                        time.sleep(check_interval)
-                except requests.exceptions.RequestException as err:
-                    elapsed = int(datetime.datetime.now(datetime.timezone.utc).timestamp()) - start_time
-                    self.logging.warning(f"[{cluster_name}] Error getting cluster info (elapsed: {elapsed}s): {err}, retrying in {check_interval}s...")
-                    time.sleep(check_interval)
-
-            # Check if we got a valid console URL
-            if not console_url or not console_url.startswith("http"):
-                elapsed = int(datetime.datetime.now(datetime.timezone.utc).timestamp()) - start_time
-                raise Exception(f"Console URL not available after {elapsed}s (max wait: {max_wait_time}s). Cannot proceed with kubeconfig download.")
-
-            oauth_callback_url = console_url.rstrip("/") + "/auth/callback"
-
-            self.logging.info(f"[{cluster_name}] OAuth Callback URL: {oauth_callback_url}")
-            self.logging.info(f"[{cluster_name}] API URL: {api_url}")
-
-            # Step 2: Create AD App
-            self.logging.info(f"[{cluster_name}] Step 2: Creating AD App {external_auth_name}")
-            # Pass redirect URIs as separate arguments (Azure CLI accepts multiple values after the flag)
-            ad_app_cmd = [
-                "az", "ad", "app", "create",
-                "--display-name", external_auth_name,
-                "--web-redirect-uris", oauth_callback_url, "http://localhost:8000",
-                "--query", "appId",
-                "--output", "tsv"
-            ]
-            ad_app_result = subprocess.run(ad_app_cmd, capture_output=True, text=True, check=True)
-            client_id = ad_app_result.stdout.strip()
-            self.logging.info(f"[{cluster_name}] Created AD App with Client ID: {client_id}")
-
-            # Step 3: Create AD App Secret
-            self.logging.info(f"[{cluster_name}] Step 3: Creating AD App Secret")
-            ad_secret_cmd = [
-                "az", "ad", "app", "credential", "reset",
-                "--id", client_id,
-                "--query", "password",
-                "--output", "tsv"
-            ]
-            ad_secret_result = subprocess.run(ad_secret_cmd, capture_output=True, text=True, check=True)
-            client_secret = ad_secret_result.stdout.strip()
-            self.logging.info(f"[{cluster_name}] AD App Secret created")
-
-            # Step 4: Create External Auth Deployment
+            # Steps 4-5: Create External Auth Deployment
             if issuer_url:
-                self.logging.info(f"[{cluster_name}] Step 4: Creating external auth deployment")
-                external_auth_template_path = self._get_bicep_template_path("externalauth.bicep")
-
-                # Compile Bicep template
-                compiled_template_path = os.path.join(path, "externalauth.json")
-                compile_cmd = f"az bicep build --file {shlex.quote(external_auth_template_path)} --outfile {shlex.quote(compiled_template_path)}"
-                compile_result = subprocess.run(compile_cmd, shell=True, capture_output=True, text=True)
-
-                if compile_result.returncode != 0:
-                    self.logging.error(f"[{cluster_name}] Failed to compile externalauth.bicep: {compile_result.stderr}")
-                    raise Exception(f"Bicep compilation failed: {compile_result.stderr}")
-
-                with open(compiled_template_path, 'r') as f:
-                    template_json = json.load(f)
-
-                auth_parameters = {
-                    "externalAuthName": {"value": external_auth_name},
-                    "issuerURL": {"value": issuer_url},
-                    "clientID": {"value": client_id},
-                    "clusterName": {"value": cluster_name}
-                }
-
-                deployment_properties = DeploymentProperties(
-                    mode=DeploymentMode.INCREMENTAL,
-                    template=template_json,
-                    parameters=auth_parameters
-                )
-                deployment = Deployment(properties=deployment_properties)
-
-                auth_deployment_operation = self.resource_client.deployments.begin_create_or_update(
-                    resource_group_name=customer_rg_name,
-                    deployment_name="aro-hcp-auth",
-                    parameters=deployment
-                )
-                auth_deployment_result = auth_deployment_operation.result()
-                self.logging.info(f"[{cluster_name}] External auth deployment completed")
-
-                # Save auth deployment result JSON to file
-                auth_deployment_output_file = os.path.join(path, "auth-deployment-result.json")
-                try:
-                    with open(auth_deployment_output_file, 'w') as f:
-                        json.dump(auth_deployment_result.as_dict(), f, indent=2, default=str)
-                    self.logging.info(f"[{cluster_name}] Auth deployment result saved to {auth_deployment_output_file}")
-                except Exception as save_err:
-                    self.logging.warning(f"[{cluster_name}] Failed to save auth deployment result JSON: {save_err}")
-
-                # Step 5: Wait for auth to be ready
-                self.logging.info(f"[{cluster_name}] Step 5: Waiting 60 seconds for auth to be ready...")
-                time.sleep(60)
+                self._deploy_external_auth(cluster_name, customer_rg_name, path, external_auth_name, issuer_url, client_id)
             else:
                 self.logging.warning(f"[{cluster_name}] Issuer URL not provided, skipping external auth deployment")
 
-            # Step 6: Get Resource ID
-            self.logging.info(f"[{cluster_name}] Step 6: Getting cluster resource ID")
-            resource_id = cluster_resource_id
-            self.logging.info(f"[{cluster_name}] Resource ID: {resource_id}")
-
-            # Step 7: Request Admin Credential
-            self.logging.info(f"[{cluster_name}] Step 7: Requesting admin credential")
-            admin_cred_url = f"https://management.azure.com{resource_id}/requestadmincredential?api-version={api_version}"
-
-            # Use requests with debug to capture Location header
-            admin_response = requests.post(admin_cred_url, headers=headers, allow_redirects=False)
-            admin_response.raise_for_status()
-
-            # Extract Location header
-            kubeconfig_url = admin_response.headers.get("Location")
-            if not kubeconfig_url:
-                self.logging.error(f"[{cluster_name}] Location header not found in admin credential response")
-                raise Exception("Failed to get kubeconfig URL from admin credential response")
-
-            self.logging.info(f"[{cluster_name}] Kubeconfig URL obtained: {kubeconfig_url}...")
-
-            # Step 8: Download Kubeconfig with retry (5 minutes, 30 sec interval)
-            self.logging.info(f"[{cluster_name}] Step 8: Downloading kubeconfig (retry for up to 5 minutes)")
-            retry_timeout = 300  # 5 minutes
-            retry_interval = 30  # 30 seconds
-            retry_start = datetime.datetime.now(datetime.timezone.utc).timestamp()
-            kubeconfig_content = None
-
-            while datetime.datetime.now(datetime.timezone.utc).timestamp() < retry_start + retry_timeout:
-                elapsed = int(datetime.datetime.now(datetime.timezone.utc).timestamp() - retry_start)
-                self.logging.info(f"[{cluster_name}] Attempting kubeconfig download ({elapsed}s elapsed)...")
-
-                kubeconfig_response = requests.get(kubeconfig_url, headers=headers)
-
-                # Status 200 means success
-                if kubeconfig_response.status_code == 200:
-                    if kubeconfig_response.text:
-                        try:
-                            kubeconfig_data = kubeconfig_response.json()
-                            kubeconfig_content = kubeconfig_data.get("kubeconfig")
-                            if kubeconfig_content:
-                                self.logging.info(f"[{cluster_name}] Kubeconfig downloaded successfully")
-                                break
-                            else:
-                                self.logging.warning(f"[{cluster_name}] Response missing 'kubeconfig' key, retrying...")
-                        except json.JSONDecodeError as e:
-                            self.logging.warning(f"[{cluster_name}] Invalid JSON response: {e}, retrying...")
-                    else:
-                        self.logging.warning(f"[{cluster_name}] Empty response, retrying...")
-                # Status 202 means still processing
-                elif kubeconfig_response.status_code == 202:
-                    self.logging.info(f"[{cluster_name}] Kubeconfig not ready yet (status 202), retrying...")
-                else:
-                    self.logging.warning(f"[{cluster_name}] Kubeconfig download returned status {kubeconfig_response.status_code}, retrying...")
-
-                time.sleep(retry_interval)
-
-            if not kubeconfig_content:
-                self.logging.error(f"[{cluster_name}] Failed to download kubeconfig after 5 minutes")
-                self.logging.error(f"[{cluster_name}] Last response status: {kubeconfig_response.status_code}")
-                self.logging.error(f"[{cluster_name}] Last response: {kubeconfig_response.text[:500] if kubeconfig_response.text else 'Empty'}")
-                raise Exception("Failed to download kubeconfig after 5 minutes")
-
-            # Save kubeconfig to file
-            kubeconfig_path = os.path.join(path, "kubeconfig")
-            with open(kubeconfig_path, "w") as kubeconfig_file:
-                kubeconfig_file.write(kubeconfig_content)
-
-            self.logging.info(f"[{cluster_name}] Kubeconfig downloaded successfully to {kubeconfig_path}")
+            # Steps 6-8: Request Admin Credential and download kubeconfig
+            kubeconfig_path = self._download_admin_kubeconfig(cluster_name, customer_rg_name, path)
 
             # Step 10: Configure external auth if issuer_url was provided
             if issuer_url and client_secret:
-                try:
-                    self.logging.info(f"Step 10: Configuring external auth in cluster {cluster_name}")
-                    azure_ad_group_name = self.environment.get("azure_ad_group_name", "aro-hcp-perfscale")
-                    self._configure_external_auth(
-                        cluster_name=cluster_name,
-                        kubeconfig_path=kubeconfig_path,
-                        external_auth_name=external_auth_name,
-                        client_secret=client_secret,
-                        azure_ad_group_name=azure_ad_group_name
-                    )
-                    self.logging.info(f"External auth configuration completed for cluster {cluster_name}")
-                except Exception as auth_err:
-                    self.logging.warning(f"Failed to configure external auth for cluster {cluster_name}: {auth_err}")
-                    self.logging.warning(f"Continuing despite external auth configuration failure for cluster {cluster_name}")
+                self._configure_cluster_external_auth(cluster_name, kubeconfig_path, external_auth_name, client_secret)
 
             return kubeconfig_path
 
@@ -1197,6 +1176,191 @@ class Hypershift(Aro):
             self.logging.error(f"[{cluster_name}] Unexpected error downloading kubeconfig: {err}")
             raise
 
+    def _wait_for_console_url(self, cluster_name):
+        """
+        Step 1: Wait up to 30 minutes for the console URL of the cluster, it may take a few minutes to be generated.
+
+        Returns:
+            tuple: (console_url, api_url)
+        """
+        self.logging.info(f"[{cluster_name}] Step 1: Getting cluster information")
+        max_wait_time = 30 * 60  # 30 minutes in seconds
+        poll = polling.PollingPolicy("aro_console_url", initial=10, maximum=60, timeout=max_wait_time, measured=True)
+        console_url = ""
+        api_url = ""
+
+        while not poll.expired():
+            # Read from the shared hcpOpenShiftClusters list, listed again only when it is older than the fastest interval
+            cluster_info = self.fleet.get(cluster_name, max_age=poll.initial) or {}
+
+            console_url = cluster_info.get("properties", {}).get("console", {}).get("url", "")
+            api_url = cluster_info.get("properties", {}).get("api", {}).get("url", "")
+
+            if console_url and console_url.startswith("http"):
+                poll.done()
+                self.logging.info(f"[{cluster_name}] Console URL is now available: {console_url}")
+                self.logging.info(f"[{cluster_name}] API URL: {api_url}")
+                return console_url, api_url
+            check_interval = poll.next_interval()
+            self.logging.info(f"[{cluster_name}] Console URL not yet available (elapsed: {int(poll.elapsed())}s), waiting {int(check_interval)}s before retry...")
+            poll.sleep(check_interval)
+
+        raise Exception(f"Console URL not available after {int(poll.elapsed())}s (max wait: {max_wait_time}s). Cannot proceed with kubeconfig download.")
+
+    def _create_ad_app(self, cluster_name, external_auth_name, console_url):
+        """
+        Steps 2-3: Get the AD App used by the external auth and add the OAuth callback of the console as redirect URI.
+
+        Returns:
+            tuple: (client_id, client_secret)
+        """
+        oauth_callback_url = console_url.rstrip("/") + "/auth/callback"
+        self.logging.info(f"[{cluster_name}] OAuth Callback URL: {oauth_callback_url}")
+
+        # Steps 2-3: The AD App and its secret are usually created in background before the cluster needs them
+        self.logging.info(f"[{cluster_name}] Step 2: Getting AD App {external_auth_name}")
+        client_id, client_secret = self.ad_apps.get(external_auth_name, oauth_callback_url)
+        self.logging.info(f"[{cluster_name}] AD App with Client ID {client_id} ready with its secret")
+        return client_id, client_secret
+
+    def _deploy_external_auth(self, cluster_name, customer_rg_name, path, external_auth_name, issuer_url, client_id):
+        """Steps 4-5: Create the external auth deployment and wait for it to be ready"""
+        self.logging.info(f"[{cluster_name}] Step 4: Creating external auth deployment")
+        external_auth_template_path = self._get_bicep_template_path("externalauth.bicep")
+
+        # Compiled Bicep template, from the cache
+        template_json = self.bicep.get(external_auth_template_path, copy_to=os.path.join(path, "externalauth.json"))
+
+        auth_parameters = {
+            "externalAuthName": {"value": external_auth_name},
+            "issuerURL": {"value": issuer_url},
+            "clientID": {"value": client_id},
+            "clusterName": {"value": cluster_name}
+        }
+
+        deployment_properties = DeploymentProperties(
+            mode=DeploymentMode.INCREMENTAL,
+            template=template_json,
+            parameters=auth_parameters
+        )
+        deployment = Deployment(properties=deployment_properties)
+
+        auth_deployment_operation = self.resource_client.deployments.begin_create_or_update(
+            resource_group_name=customer_rg_name,
+            deployment_name="aro-hcp-auth",
+            parameters=deployment
+        )
+        auth_deployment_result = auth_deployment_operation.result()
+        self.logging.info(f"[{cluster_name}] External auth deployment completed")
+
+        # Save auth deployment result JSON to file
+        auth_deployment_output_file = os.path.join(path, "auth-deployment-result.json")
+        try:
+            with open(auth_deployment_output_file, 'w') as f:
+                json.dump(auth_deployment_result.as_dict(), f, indent=2, default=str)
+            self.logging.info(f"[{cluster_name}] Auth deployment result saved to {auth_deployment_output_file}")
+        except Exception as save_err:
+            self.logging.warning(f"[{cluster_name}] Failed to save auth deployment result JSON: {save_err}")
+
+        # Step 5: Wait for auth to be ready
+        self.logging.info(f"[{cluster_name}] Step 5: Waiting 60 seconds for auth to be ready...")
+        time.sleep(60)
+
+    def _download_admin_kubeconfig(self, cluster_name, customer_rg_name, path):
+        """
+        Steps 6-8: Request the admin credential of the cluster and download its kubeconfig. It only needs the cluster resource.
+
+        Returns:
+            Path to the downloaded kubeconfig file
+        """
+        api_version = "2024-06-10-preview"
+
+        # Step 6: Get Resource ID
+        self.logging.info(f"[{cluster_name}] Step 6: Getting cluster resource ID")
+        resource_id = f"/subscriptions/{self.environment.get('subscription_id')}/resourceGroups/{customer_rg_name}/providers/Microsoft.RedHatOpenShift/hcpOpenShiftClusters/{cluster_name}"
+        self.logging.info(f"[{cluster_name}] Resource ID: {resource_id}")
+
+        # Step 7: Request Admin Credential
+        self.logging.info(f"[{cluster_name}] Step 7: Requesting admin credential")
+        admin_cred_url = f"{resource_id}/requestadmincredential?api-version={api_version}"
+
+        # Do not follow the redirect to capture Location header
+        admin_response = self.arm.post(admin_cred_url, allow_redirects=False)
+        admin_response.raise_for_status()
+
+        # Extract Location header
+        kubeconfig_url = admin_response.headers.get("Location")
+        if not kubeconfig_url:
+            self.logging.error(f"[{cluster_name}] Location header not found in admin credential response")
+            raise Exception("Failed to get kubeconfig URL from admin credential response")
+
+        self.logging.info(f"[{cluster_name}] Kubeconfig URL obtained: {kubeconfig_url}...")
+
+        # Step 8: Download Kubeconfig with retry (5 minutes)
+        self.logging.info(f"[{cluster_name}] Step 8: Downloading kubeconfig (retry for up to 5 minutes)")
+        poll = polling.PollingPolicy("aro_kubeconfig_download", initial=5, maximum=30, timeout=300)
+        kubeconfig_content = None
+
+        while not poll.expired():
+            self.logging.info(f"[{cluster_name}] Attempting kubeconfig download ({int(poll.elapsed())}s elapsed)...")
+
+            kubeconfig_response = self.arm.get(kubeconfig_url)
+
+            # Status 200 means success
+            if kubeconfig_response.status_code == 200:
+                if kubeconfig_response.text:
+                    try:
+                        kubeconfig_data = kubeconfig_response.json()
+                        kubeconfig_content = kubeconfig_data.get("kubeconfig")
+                        if kubeconfig_content:
+                            poll.done()
+                            self.logging.info(f"[{cluster_name}] Kubeconfig downloaded successfully")
+                            break
+                        else:
+                            self.logging.warning(f"[{cluster_name}] Response missing 'kubeconfig' key, retrying...")
+                    except json.JSONDecodeError as e:
+                        self.logging.warning(f"[{cluster_name}] Invalid JSON response: {e}, retrying...")
+                else:
+                    self.logging.warning(f"[{cluster_name}] Empty response, retrying...")
+            # Status 202 means still processing
+            elif kubeconfig_response.status_code == 202:
+                self.logging.info(f"[{cluster_name}] Kubeconfig not ready yet (status 202), retrying...")
+            else:
+                self.logging.warning(f"[{cluster_name}] Kubeconfig download returned status {kubeconfig_response.status_code}, retrying...")
+
+            poll.sleep(throttled=kubeconfig_response.status_code == 429)
+
+        if not kubeconfig_content:
+            self.logging.error(f"[{cluster_name}] Failed to download kubeconfig after 5 minutes")
+            self.logging.error(f"[{cluster_name}] Last response status: {kubeconfig_response.status_code}")
+            self.logging.error(f"[{cluster_name}] Last response: {kubeconfig_response.text[:500] if kubeconfig_response.text else 'Empty'}")
+            raise Exception("Failed to download kubeconfig after 5 minutes")
+
+        # Save kubeconfig to file
+        kubeconfig_path = os.path.join(path, "kubeconfig")
+        with open(kubeconfig_path, "w") as kubeconfig_file:
+            kubeconfig_file.write(kubeconfig_content)
+
+        self.logging.info(f"[{cluster_name}] Kubeconfig downloaded successfully to {kubeconfig_path}")
+        return kubeconfig_path
+
+    def _configure_cluster_external_auth(self, cluster_name, kubeconfig_path, external_auth_name, client_secret):
+        """Step 10: Configure the external auth in the cluster. Failures are logged and not raised"""
+        try:
+            self.logging.info(f"Step 10: Configuring external auth in cluster {cluster_name}")
+            azure_ad_group_name = self.environment.get("azure_ad_group_name", "aro-hcp-perfscale")
+            self._configure_external_auth(
+                cluster_name=cluster_name,
+                kubeconfig_path=kubeconfig_path,
+                external_auth_name=external_auth_name,
+                client_secret=client_secret,
+                azure_ad_group_name=azure_ad_group_name
+            )
+            self.logging.info(f"External auth configuration completed for cluster {cluster_name}")
+        except Exception as auth_err:
+            self.logging.warning(f"Failed to configure external auth for cluster {cluster_name}: {auth_err}")
+            self.logging.warning(f"Continuing despite external auth configuration failure for cluster {cluster_name}")
+
     def _configure_external_auth(self, cluster_name, kubeconfig_path, external_auth_name, client_secret, azure_ad_group_name):
         """
         Configure external auth in the cluster by:
@@ -1211,8 +1375,8 @@ class Hypershift(Aro):
             client_secret: Client secret from Azure AD app
             azure_ad_group_name: Name of the Azure AD group to grant cluster-admin access
         """
-        # Load kubeconfig
-        k8s_config.load_kube_config(config_file=kubeconfig_path)
+        # API client of this cluster, the global kubernetes configuration is shared by all the install threads
+        api_client = self.api_clients.get(kubeconfig_path)
 
         # Step 1: Create Kubernetes secret with client secret
         secret_name = f"{external_auth_name}-console-openshift-console"
@@ -1220,7 +1384,7 @@ class Hypershift(Aro):
 
         self.logging.info(f"[{cluster_name}] Creating Kubernetes secret {secret_name} in {namespace} namespace")
 
-        v1 = k8s_client.CoreV1Api()
+        v1 = k8s_client.CoreV1Api(api_client)
 
         # Check if secret already exists, if so delete it first
         try:
@@ -1260,14 +1424,8 @@ class Hypershift(Aro):
 
         # Step 2: Get Azure AD group ID
         self.logging.info(f"[{cluster_name}] Getting Azure AD group ID for group: {azure_ad_group_name}")
-        group_cmd = [
-            "az", "ad", "group", "show",
-            "--group", azure_ad_group_name,
-            "--query", "id",
-            "--output", "tsv"
-        ]
-        group_result = subprocess.run(group_cmd, capture_output=True, text=True, check=True)
-        group_id = group_result.stdout.strip()
+        # Resolved once per execution
+        group_id = self.ad_apps.group_id(azure_ad_group_name)
 
         if not group_id:
             raise Exception(f"[{cluster_name}] Failed to get Azure AD group ID for group: {azure_ad_group_name}")
@@ -1276,7 +1434,7 @@ class Hypershift(Aro):
 
         # Step 3: Create ClusterRoleBinding using Kubernetes client
         self.logging.info(f"[{cluster_name}] Creating ClusterRoleBinding for Azure AD group")
-        rbac_v1 = k8s_client.RbacAuthorizationV1Api()
+        rbac_v1 = k8s_client.RbacAuthorizationV1Api(api_client)
 
         cluster_role_binding_name = "aro-admins"
 
@@ -1463,23 +1621,10 @@ class Hypershift(Aro):
 
     def _create_nodepool_deployment(self, cluster_name, resource_group_name, deployment_name, template_name, parameters, subscription_id, wait=False, output_path=None):
         """Helper function to create a nodepool deployment from a Bicep template"""
-        import subprocess
-
         bicep_template_path = self._get_bicep_template_path(template_name)
 
-        # Compile Bicep template to JSON
-        import tempfile
-        compiled_template_path = os.path.join(tempfile.gettempdir(), f"{deployment_name}-{int(time.time())}.json")
-        compile_cmd = f"az bicep build --file {shlex.quote(bicep_template_path)} --outfile {shlex.quote(compiled_template_path)}"
-        compile_result = subprocess.run(compile_cmd, shell=True, capture_output=True, text=True)
-
-        if compile_result.returncode != 0:
-            self.logging.error(f"[{cluster_name}] Failed to compile Bicep template {template_name}: {compile_result.stderr}")
-            raise Exception(f"Bicep compilation failed: {compile_result.stderr}")
-
-        # Read compiled template
-        with open(compiled_template_path, 'r') as f:
-            template_json = json.load(f)
+        # Compiled Bicep template, from the cache
+        template_json = self.bicep.get(bicep_template_path)
 
         # Create deployment
         deployment_properties = DeploymentProperties(
@@ -1520,14 +1665,45 @@ class Hypershift(Aro):
         except HttpResponseError as err:
             self.logging.error(f"[{cluster_name}] Failed to create deployment {deployment_name}: {err}")
             raise
-        finally:
-            # Clean up compiled template
-            if os.path.exists(compiled_template_path):
-                try:
-                    os.remove(compiled_template_path)
-                except OSError:
-                    pass
 
+    def _setup_infra_nodes(self, cluster_info, kubeconfig, cluster_name):
+        """
+        Wait for the infra nodes and move the infrastructure components to them.
+
+        Returns:
+            bool: True if the components were moved
+        """
+        self.logging.info(f"[{cluster_name}] Infra nodepool was requested, waiting for infra nodes and configuring components")
+        # Wait for infra nodes to be ready (default 2 nodes, 15 min timeout)
+        infra_nodes_ready = self._wait_for_infra_nodes(
+            kubeconfig=kubeconfig,
+            cluster_name=cluster_name,
+            expected_infra_nodes=2,
+            wait_time=15
+        )
+        cluster_info["infra_nodes_ready"] = infra_nodes_ready
+
+        if infra_nodes_ready < 2:
+            self.logging.warning(f"[{cluster_name}] Not enough infra nodes ready, skipping component migration")
+            cluster_info["infra_components_moved"] = False
+            return False
+
+        # Move infrastructure components to infra nodes
+        infra_move_start = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
+        move_success = self._move_infra_components(
+            kubeconfig=kubeconfig,
+            cluster_name=cluster_name
+        )
+        infra_move_end = int(datetime.datetime.now(datetime.timezone.utc).timestamp())
+        cluster_info["infra_components_moved"] = move_success
+        cluster_info["infra_setup_duration"] = infra_move_end - infra_move_start
+        if move_success:
+            self.logging.info(f"[{cluster_name}] Infrastructure components configured to use infra nodes")
+        else:
+            self.logging.warning(f"[{cluster_name}] Some infrastructure components may not be configured correctly")
+        return move_success
+
+    @instrumentation.timed("wait")
     def _wait_for_infra_nodes(self, kubeconfig, cluster_name, expected_infra_nodes=2, wait_time=15):
         """
         Wait for infra nodes to be ready.
@@ -1544,51 +1720,15 @@ class Hypershift(Aro):
         self.logging.info(
             f"[{cluster_name}] Waiting {wait_time} minutes for {expected_infra_nodes} infra nodes to be ready"
         )
-        myenv = os.environ.copy()
-        myenv["KUBECONFIG"] = kubeconfig
-        starting_time = datetime.datetime.now(datetime.timezone.utc).timestamp()
-
-        while datetime.datetime.now(datetime.timezone.utc).timestamp() < starting_time + wait_time * 60:
-            nodes_code, nodes_out, nodes_err = self.utils.subprocess_exec(
-                "oc get nodes -o json",
-                extra_params={"env": myenv, "universal_newlines": True},
-                log_output=False
+        # Infra nodes carry the node-role.kubernetes.io/infra label, the node informer wakes us up on every node change
+        ready_infra_nodes, reached = self.nodes.get(kubeconfig).wait_for_ready_nodes(
+            infra_selector, expected_infra_nodes, wait_time * 60, cancelled=lambda: self.utils.force_terminate, at_least=True
+        )
+        if reached:
+            self.logging.info(
+                f"[{cluster_name}] Found {ready_infra_nodes}/{expected_infra_nodes} ready infra nodes. Infra nodes are ready."
             )
-            if nodes_code != 0:
-                self.logging.warning(f"[{cluster_name}] Failed to get nodes, retrying in 15 seconds...")
-                time.sleep(15)
-                continue
-
-            try:
-                nodes_json = json.loads(nodes_out)
-            except Exception as err:
-                self.logging.error(f"[{cluster_name}] Cannot parse nodes JSON: {err}")
-                time.sleep(15)
-                continue
-
-            nodes = nodes_json.get("items", [])
-
-            # Count ready infra nodes (nodes with node-role.kubernetes.io/infra label and Ready condition)
-            ready_infra_nodes = 0
-            for node in nodes:
-                labels = node.get("metadata", {}).get("labels", {})
-                if "node-role.kubernetes.io/infra" in labels:
-                    conditions = node.get("status", {}).get("conditions", [])
-                    for condition in conditions:
-                        if condition.get("type") == "Ready" and condition.get("status") == "True":
-                            ready_infra_nodes += 1
-                            break
-
-            if ready_infra_nodes >= expected_infra_nodes:
-                self.logging.info(
-                    f"[{cluster_name}] Found {ready_infra_nodes}/{expected_infra_nodes} ready infra nodes. Infra nodes are ready."
-                )
-                return ready_infra_nodes
-            else:
-                self.logging.info(
-                    f"[{cluster_name}] Found {ready_infra_nodes}/{expected_infra_nodes} ready infra nodes. Waiting 15 seconds..."
-                )
-                time.sleep(15)
+            return ready_infra_nodes
 
         self.logging.error(
             f"[{cluster_name}] Timeout waiting for infra nodes. Only {ready_infra_nodes}/{expected_infra_nodes} ready."
@@ -1612,12 +1752,11 @@ class Hypershift(Aro):
             bool: True if successful, False otherwise
         """
         self.logging.info(f"[{cluster_name}] Moving infrastructure components to infra nodes")
-        myenv = os.environ.copy()
-        myenv["KUBECONFIG"] = kubeconfig
+        api_client = self.api_clients.get(kubeconfig)
 
         success = True
 
-        # 1. Patch IngressController to use infra nodes (using patch file to avoid shell quoting issues)
+        # 1. Patch IngressController to use infra nodes (merge patch read from the patch file)
         self.logging.info(f"[{cluster_name}] Patching IngressController to use infra nodes")
         ingress_patch_path = self._get_bicep_template_path("ingress-infra-patch.yaml")
 
@@ -1625,15 +1764,21 @@ class Hypershift(Aro):
             self.logging.error(f"[{cluster_name}] Ingress patch file not found: {ingress_patch_path}")
             success = False
         else:
-            patch_code, patch_out, patch_err = self.utils.subprocess_exec(
-                f"oc patch ingresscontroller/default -n openshift-ingress-operator --type=merge --patch-file={ingress_patch_path}",
-                extra_params={"env": myenv, "universal_newlines": True}
-            )
-            if patch_code != 0:
-                self.logging.error(f"[{cluster_name}] Failed to patch IngressController: {patch_err}")
-                success = False
-            else:
+            try:
+                with open(ingress_patch_path, "r") as patch_file:
+                    ingress_patch = yaml.safe_load(patch_file)
+                k8s_client.CustomObjectsApi(api_client).patch_namespaced_custom_object(
+                    group="operator.openshift.io",
+                    version="v1",
+                    namespace="openshift-ingress-operator",
+                    plural="ingresscontrollers",
+                    name="default",
+                    body=ingress_patch
+                )
                 self.logging.info(f"[{cluster_name}] IngressController patched successfully")
+            except Exception as err:
+                self.logging.error(f"[{cluster_name}] Failed to patch IngressController: {err}")
+                success = False
 
         # 2. Create/update cluster-monitoring-config ConfigMap from YAML file
         self.logging.info(f"[{cluster_name}] Configuring monitoring stack to use infra nodes")
@@ -1643,15 +1788,22 @@ class Hypershift(Aro):
             self.logging.error(f"[{cluster_name}] Monitoring config file not found: {monitoring_config_path}")
             success = False
         else:
-            apply_code, apply_out, apply_err = self.utils.subprocess_exec(
-                f"oc apply -f {monitoring_config_path}",
-                extra_params={"env": myenv, "universal_newlines": True}
-            )
-            if apply_code != 0:
-                self.logging.error(f"[{cluster_name}] Failed to apply monitoring config: {apply_err}")
-                success = False
-            else:
+            v1 = k8s_client.CoreV1Api(api_client)
+            try:
+                with open(monitoring_config_path, "r") as config_file:
+                    monitoring_config = yaml.safe_load(config_file)
+                namespace = monitoring_config["metadata"]["namespace"]
+                try:
+                    v1.create_namespaced_config_map(namespace=namespace, body=monitoring_config)
+                except ApiException as err:
+                    if err.status != 409:
+                        raise
+                    # Already exists, replace it like `oc apply` would
+                    v1.replace_namespaced_config_map(name=monitoring_config["metadata"]["name"], namespace=namespace, body=monitoring_config)
                 self.logging.info(f"[{cluster_name}] Monitoring config applied successfully")
+            except Exception as err:
+                self.logging.error(f"[{cluster_name}] Failed to apply monitoring config: {err}")
+                success = False
 
         if success:
             self.logging.info(f"[{cluster_name}] Infrastructure components successfully configured to use infra nodes")
@@ -1661,8 +1813,16 @@ class Hypershift(Aro):
         return success
 
     def platform_cleanup(self):
+        if self.deletions.in_flight():
+            self.logging.info(f"Waiting for {self.deletions.in_flight()} cluster deletions in progress")
+            self.deletions.wait(cancelled=lambda: self.utils.force_terminate)
         super().platform_cleanup()
+        self.fleet.stop()
+        self.ad_apps.delete_unused()
+        self.ad_apps.shutdown()
+        self.graph.close()
 
+    @instrumentation.timed("wait")
     def _wait_for_workers(
         self, kubeconfig, worker_nodes, wait_time, cluster_name, machinepool_name
     ):
@@ -1682,70 +1842,27 @@ class Hypershift(Aro):
         self.logging.info(
             f"[{cluster_name}] Waiting {wait_time} minutes for {worker_nodes} workers to be ready on {machinepool_name} machinepool"
         )
-        myenv = os.environ.copy()
-        myenv["KUBECONFIG"] = kubeconfig
         result = [machinepool_name]
         starting_time = datetime.datetime.now(datetime.timezone.utc).timestamp()
         self.logging.debug(
             f"[{cluster_name}] Waiting {wait_time} minutes for nodes to be Ready until {datetime.datetime.fromtimestamp(starting_time + wait_time * 60)}"
         )
-        while datetime.datetime.now(datetime.timezone.utc).timestamp() < starting_time + wait_time * 60:
-            if self.utils.force_terminate:
-                self.logging.error(f"[{cluster_name}] Exiting workers waiting after capturing Ctrl-C")
-                result.append(0)
-                result.append("")
-                return result
-            self.logging.info(f"[{cluster_name}] Getting node information")
-            nodes_code, nodes_out, nodes_err = self.utils.subprocess_exec(
-                "oc get nodes -o json",
-                extra_params={"env": myenv, "universal_newlines": True},
-            )
-            try:
-                nodes_json = json.loads(nodes_out)
-            except Exception as err:
-                self.logging.error(
-                    f"Cannot load command result for cluster {cluster_name}. Waiting 15 seconds for next check..."
-                )
-                self.logging.error(err)
-                time.sleep(15)
-                continue
-            nodes = nodes_json["items"] if "items" in nodes_json else []
-
-            # First we find nodes which label nodePool match the machinepool name and then we check if type:Ready is on the conditions
-            ready_nodes = (
-                sum(
-                    len(
-                        list(
-                            filter(
-                                lambda x: x.get("type") == "Ready"
-                                and x.get("status") == "True",
-                                node["status"]["conditions"],
-                            )
-                        )
-                    )
-                    for node in nodes
-                    if node.get("metadata", {})
-                    .get("labels", {})
-                    .get("hypershift.openshift.io/nodePool")
-                    and machinepool_name
-                    in node["metadata"]["labels"]["hypershift.openshift.io/nodePool"]
-                )
-                if nodes
-                else 0
+        # The node informer wakes us up on every node change, no need to poll `oc get nodes`
+        ready_nodes, reached = self.nodes.get(kubeconfig).wait_for_ready_nodes(
+            nodepool_selector(machinepool_name), worker_nodes, wait_time * 60, cancelled=lambda: self.utils.force_terminate
+        )
+        if self.utils.force_terminate:
+            self.logging.error(f"[{cluster_name}] Exiting workers waiting after capturing Ctrl-C")
+            result.append(0)
+            result.append("")
+            return result
+        if reached:
+            self.logging.info(
+                f"[{cluster_name}] Found {ready_nodes}/{worker_nodes} ready nodes on machinepool {machinepool_name}. Stopping wait."
             )
-
-            if ready_nodes == worker_nodes:
-                self.logging.info(
-                    f"[{cluster_name}] Found {ready_nodes}/{worker_nodes} ready nodes on machinepool {machinepool_name}. Stopping wait."
-                )
-                result.append(ready_nodes)
-                result.append(int(datetime.datetime.now(datetime.timezone.utc).timestamp()))
-                return result
-            else:
-                self.logging.info(
-                    f"[{cluster_name}] Found {ready_nodes}/{worker_nodes} ready nodes on machinepool {machinepool_name}. Waiting 15 seconds for next check..."
-                )
-                time.sleep(15)
+            result.append(ready_nodes)
+            result.append(int(datetime.datetime.now(datetime.timezone.utc).timestamp()))
+            return result
         self.logging.error(
             f"[{cluster_name}] Waiting time expired. After {wait_time} minutes there are {ready_nodes}/{worker_nodes} ready nodes on {machinepool_name} machinepool"
         )
@@ -1755,31 +1872,14 @@ class Hypershift(Aro):
 
     def get_workers_ready(self, kubeconfig, cluster_name):
         super().get_workers_ready(kubeconfig, cluster_name)
-        myenv = os.environ.copy()
-        myenv["KUBECONFIG"] = kubeconfig
         self.logging.info(f"[{cluster_name}] Getting node information for Hypershift cluster")
-        nodes_code, nodes_out, nodes_err = self.utils.subprocess_exec("oc get nodes -o json", extra_params={"env": myenv, "universal_newlines": True}, log_output=False)
-        try:
-            nodes_json = json.loads(nodes_out)
-        except Exception as err:
-            self.logging.debug(f"[{cluster_name}] Cannot load command result")
-            self.logging.debug(f"[{cluster_name}] {err}")
-            return 0
-        nodes = nodes_json["items"] if "items" in nodes_json else []
-        status = []
-        for node in nodes:
-            nodepool = node.get("metadata", {}).get("labels", {}).get("hypershift.openshift.io/nodePool", "")
-            if "workers" in nodepool:
-                conditions = node.get("status", {}).get("conditions", [])
-                for condition in conditions:
-                    if "type" in condition and condition["type"] == "Ready":
-                        status.append(condition["status"])
-        status_list = {i: status.count(i) for i in status}
-        ready_nodes = status_list["True"] if "True" in status_list else 0
-        return ready_nodes
+        return self.nodes.get(kubeconfig).ready_nodes(nodepool_selector("workers"))
 
     def watcher(self):
         super().watcher()
+        self.logging.info(f"Following cluster status changes from the hcpOpenShiftClusters poller, listing clusters every {self.fleet.interval} seconds")
+        self.fleet.start()
+        self.watch_clusters()
 
 
 class HypershiftArguments(AroArguments):
@@ -1801,6 +1901,10 @@ class HypershiftArguments(AroArguments):
         parser.add_argument("--add-aro-hcp-infra", action=EnvDefault, env=environment, envvar="HCP_BURNER_ADD_ARO_HCP_INFRA", type=str, default="False", help="Create infra nodepool for ARO HCP cluster (default: False). Accepts: true/false, 1/0, yes/no")
         parser.add_argument("--azure-ad-group-name", action=EnvDefault, env=environment, envvar="HCP_BURNER_AZURE_AD_GROUP_NAME", default="aro-hcp-perfscale", help="Azure AD group name to grant cluster-admin access (default: aro-hcp-perfscale)")
         parser.add_argument("--issuer-url", action=EnvDefault, env=environment, envvar="HCP_BURNER_ISSUER_URL", default=None, help="OIDC issuer URL for external auth (default: https://login.microsoftonline.com/{tenant_id}/v2.0)")
+        parser.add_argument("--ad-app-workers", action=EnvDefault, env=environment, envvar="HCP_BURNER_AD_APP_WORKERS", type=int, default=4, help="Number of AD Apps of the external auth created at the same time, ahead of the clusters (default: 4)")
+        parser.add_argument("--infra-batch-size", action=EnvDefault, env=environment, envvar="HCP_BURNER_INFRA_BATCH_SIZE", type=int, default=0, help="Create the resource groups and the infrastructure of this number of clusters with a single subscription scope deployment. 0 or 1 deploy them per cluster (default: 0)")
+        parser.add_argument("--infra-batch-linger", action=EnvDefault, env=environment, envvar="HCP_BURNER_INFRA_BATCH_LINGER", type=int, default=10, help="Seconds to wait for more clusters before deploying an infrastructure batch that is not full (default: 10)")
+        parser.add_argument("--fleet-poll-interval", action=EnvDefault, env=environment, envvar="HCP_BURNER_FLEET_POLL_INTERVAL", type=int, default=30, help="Seconds between two lists of the hcpOpenShiftClusters of the subscription used to follow the status and the deletion of all the clusters")
         parser.add_argument("--azure-prom-token-file", action=EnvDefault, env=environment, envvar="HCP_BURNER_AZURE_PROM_TOKEN_FILE", help="Path to AZURE_PROM_TOKEN file for scraping metrics from MC (Management Cluster)")
 
         if config_file:
@@ -0,0 +1,85 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Module to run the steps of an ARO cluster installation as a dependency graph instead of strictly in sequence
+"""
+import datetime
+import concurrent.futures
+from libs import instrumentation
+
+
+class StagePipeline:
+    """
+    Stages of the installation of a cluster. Every stage starts as soon as all the stages it requires succeeded,
+    stages whose requirements failed are skipped.
+
+    Stages are functions receiving the dict of results of the previous stages, keyed by stage name.
+    A stage fails when it raises an exception. Timings of every stage are kept on the timings dict.
+    """
+
+    def __init__(self, logging, cluster_name):
+        self.logging = logging
+        self.cluster_name = cluster_name
+        self.stages = {}
+        self.results = {}
+        self.errors = {}
+        self.timings = {}
+
+    def _now(self):
+        return int(datetime.datetime.now(datetime.timezone.utc).timestamp())
+
+    def add(self, name, function, requires=()):
+        """Add a stage. Required stages must have been added before, so the graph cannot have cycles"""
+        for requirement in requires:
+            if requirement not in self.stages:
+                raise ValueError(f"Stage {name} requires unknown stage {requirement}")
+        self.stages[name] = {"function": function, "requires": tuple(requires)}
+
+    def succeeded(self, name):
+        return name in self.results
+
+    def _run_stage(self, name):
+        start_time = self._now()
+        self.timings[name] = {"start_time": start_time}
+        self.logging.info(f"[{self.cluster_name}] Stage {name} started")
+        try:
+            return self.stages[name]["function"](self.results)
+        finally:
+            end_time = self._now()
+            self.timings[name]["end_time"] = end_time
+            self.timings[name]["duration"] = end_time - start_time
+            instrumentation.observe("stage", name, end_time - start_time)
+
+    def run(self):
+        """Run all the stages and return the timings. Errors are logged and kept on errors, they are not raised"""
+        pending = dict(self.stages)
+        statuses = {}
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, len(self.stages)), thread_name_prefix=f"{self.cluster_name}-stage") as executor:
+            running = {}
+            while pending or running:
+                for name, stage in list(pending.items()):
+                    if any(requirement not in statuses for requirement in stage["requires"]):
+                        continue
+                    del pending[name]
+                    failed = [requirement for requirement in stage["requires"] if statuses[requirement] != "success"]
+                    if failed:
+                        self.logging.warning(f"[{self.cluster_name}] Skipping stage {name} because stages {failed} did not succeed")
+                        statuses[name] = "skipped"
+                        self.timings[name] = {"status": "skipped"}
+                        continue
+                    running[executor.submit(self._run_stage, name)] = name
+                if not running:
+                    continue
+                done, not_done = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        self.results[name] = future.result()
+                        statuses[name] = "success"
+                        self.logging.info(f"[{self.cluster_name}] Stage {name} finished in {self.timings[name]['duration']} seconds")
+                    except Exception as err:
+                        self.errors[name] = err
+                        statuses[name] = "failed"
+                        self.logging.error(f"[{self.cluster_name}] Stage {name} failed after {self.timings[name]['duration']} seconds: {err}")
+                    self.timings[name]["status"] = statuses[name]
+        return self.timings
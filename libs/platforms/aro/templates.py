@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Module to compile the Bicep templates of the ARO platform once per execution instead of once per cluster
+"""
+import os
+import json
+import shlex
+import hashlib
+import threading
+import subprocess
+import concurrent.futures
+from copy import deepcopy
+
+
+class BicepTemplateCache:
+    """
+    Content-addressed cache of compiled Bicep templates.
+
+    Templates are keyed by the sha256 of the Bicep file and the version of the bicep CLI, compiled once with `az bicep build`
+    into cache_dir and handed out as already parsed JSON. Concurrent requests of the same template wait for a single compilation.
+    """
+
+    def __init__(self, logging, cache_dir):
+        self.logging = logging
+        self.cache_dir = cache_dir
+        self.templates = {}
+        self._bicep_version = None
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        os.makedirs(self.cache_dir, exist_ok=True)
+
+    def bicep_version(self):
+        with self._lock:
+            if self._bicep_version is None:
+                version_result = subprocess.run(["az", "bicep", "version"], capture_output=True, text=True)
+                self._bicep_version = version_result.stdout.strip() if version_result.returncode == 0 else "unknown"
+                self.logging.debug(f"Compiling Bicep templates with {self._bicep_version}")
+            return self._bicep_version
+
+    def _key(self, template_path):
+        digest = hashlib.sha256()
+        with open(template_path, "rb") as template_file:
+            digest.update(template_file.read())
+        digest.update(self.bicep_version().encode("utf-8"))
+        return digest.hexdigest()
+
+    def _key_lock(self, key):
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def get(self, template_path, copy_to=None):
+        """
+        Return the compiled template as a dict, compiling it only the first time.
+        With copy_to, the compiled JSON is also written to that file, like `az bicep build --outfile` did.
+        Raises an Exception starting with "Bicep compilation failed" when `az bicep build` fails
+        """
+        key = self._key(template_path)
+        with self._key_lock(key):
+            if key not in self.templates:
+                compiled_template_path = os.path.join(self.cache_dir, f"{key}.json")
+                if not os.path.exists(compiled_template_path):
+                    self.logging.info(f"Compiling Bicep template {os.path.basename(template_path)}")
+                    temporary_path = compiled_template_path + ".tmp"
+                    compile_cmd = f"az bicep build --file {shlex.quote(template_path)} --outfile {shlex.quote(temporary_path)}"
+                    compile_result = subprocess.run(compile_cmd, shell=True, capture_output=True, text=True)
+                    if compile_result.returncode != 0:
+                        self.logging.error(f"Failed to compile Bicep template {template_path}: {compile_result.stderr}")
+                        raise Exception(f"Bicep compilation failed: {compile_result.stderr}")
+                    os.replace(temporary_path, compiled_template_path)
+                with open(compiled_template_path, "r") as compiled_file:
+                    self.templates[key] = json.load(compiled_file)
+            template = self.templates[key]
+        if copy_to:
+            with open(copy_to, "w") as output_file:
+                json.dump(template, output_file, indent=2)
+        # Callers get their own copy, the cached one must not be modified
+        return deepcopy(template)
+
+    def warm(self, template_paths):
+        """Compile the templates in parallel, logging failures instead of raising them. They will be raised again by get()"""
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(1, len(template_paths))) as executor:
+            futures = {executor.submit(self.get, template_path): template_path for template_path in template_paths}
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    future.result()
+                except Exception as err:
+                    self.logging.warning(f"Failed to precompile Bicep template {futures[future]}: {err}")
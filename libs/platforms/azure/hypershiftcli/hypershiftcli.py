@@ -10,11 +10,16 @@ import configparser
 import base64
 import concurrent
 
+from libs import instrumentation
+from libs import polling
+from libs.informers import CustomObjectInformer, nodepool_selector
 from libs.platforms.azure.azure import Azure
 from libs.platforms.azure.azure import AzureArguments
 
 
 class Hypershiftcli(Azure):
+    ready_states = ("Completed",)
+
     def __init__(self, arguments, logging, utils, es):
         super().__init__(arguments, logging, utils, es)
 
@@ -34,6 +39,11 @@ class Hypershiftcli(Azure):
         self.environment["mc_resource_group"] = arguments["mc_az_resource_group"]
         self.environment['mgmt_cluster_name'] = arguments["mc_cluster_name"]
 
+        # Single watch of the hostedclusters and nodepools of the MC, shared by the install waits, get_metadata and the watcher
+        self.hostedclusters = CustomObjectInformer(logging, self.environment["mc_kubeconfig"], self.api_clients, "hypershift.openshift.io", "v1beta1", "hostedclusters", "clusters")
+        self.hostedclusters.subscribe(self._hostedcluster_changed)
+        self.nodepools = CustomObjectInformer(logging, self.environment["mc_kubeconfig"], self.api_clients, "hypershift.openshift.io", "v1beta1", "nodepools", "clusters")
+
     def initialize(self):
         super().initialize()
         # Verify access to the MC Cluster
@@ -46,93 +56,54 @@ class Hypershiftcli(Azure):
             sys.exit("Exiting...")
         else:
             self.logging.info(f"Access to MC cluster {self.environment['mgmt_cluster_name']} verified using {self.environment['mc_kubeconfig']} file")
+        self.hostedclusters.start()
+        self.nodepools.start()
 
     def platform_cleanup(self):
         super().platform_cleanup()
+        self.hostedclusters.stop()
+        self.nodepools.stop()
 
-    def watcher(self):
-        super().watcher()
-        myenv = os.environ.copy()
-        myenv["KUBECONFIG"] = self.environment['mc_kubeconfig']
-        self.logging.info(f"Watcher started on {self.environment['platform']}")
-        self.logging.info(f"Getting status every {self.environment['watcher_delay']}")
-        self.logging.info(f"Expected Clusters: {self.environment['cluster_count']}")
-        self.logging.info(f"Manually terminate watcher creating the file {self.environment['path']}/terminate_watcher")
-        file_path = os.path.join(self.environment["path"], "terminate_watcher")
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        while not self.utils.force_terminate:
-            self.logging.debug(self.environment['clusters'])
-            if os.path.isfile(os.path.join(self.environment["path"], "terminate_watcher")):
-                self.logging.warning("Watcher has been manually set to terminate")
-                break
-            cluster_list_code, cluster_list_out, cluster_list_err = self.utils.subprocess_exec("oc get hostedcluster -n clusters -o json", extra_params={"env": myenv, "universal_newlines": True})
-            current_cluster_count = 0
-            installed_clusters = 0
-#            clusters_with_all_workers = 0
-            state = {}
-            error = []
-            try:
-                oc_list_clusters = json.loads(cluster_list_out)
-            except ValueError as err:
-                self.logging.error("Failed to get clusters list: %s" % err)
-                self.logging.error(cluster_list_out)
-                self.logging.error(cluster_list_err)
-                oc_list_clusters = {}
-            for cluster in oc_list_clusters.get("items", {}):
-                cluster_name = cluster.get("metadata", {}).get("name", "")
-                cluster_state = cluster.get("status", {}).get("version", {}).get("history", [{}])[0].get("state", None)
-                if self.environment["cluster_name_seed"] in cluster_name:
-                    current_cluster_count += 1
-                    cluster_state = cluster.get("status", {}).get("version", {}).get("history", [{}])[0].get("state", None)
-                    if cluster_state == "error":
-                        error.append(cluster["name"])
-                    elif cluster_state == "Completed":
-                        state[cluster_state] = state.get(cluster_state, 0) + 1
-                        installed_clusters += 1
-#                        required_workers = cluster["nodes"]["compute"]
-#                        ready_workers = self.get_workers_ready(self.environment["path"] + "/" + cluster["name"] + "/kubeconfig", cluster["name"])
-#                        if ready_workers == required_workers:
-#                        clusters_with_all_workers += 1
-                    elif cluster_state != "":
-                        state[cluster_state] = state.get(cluster_state, 0) + 1
-            self.logging.info("Requested Clusters for test %s: %d of %d" % (self.environment["uuid"], current_cluster_count, self.environment["cluster_count"]))
-            state_output = ""
-            for i in state.items():
-                state_output += "(" + str(i[0]) + ": " + str(i[1]) + ") "
-                self.logging.info(state_output)
-            if error:
-                self.logging.warning("Clusters in error state: %s" % error)
-            if installed_clusters == self.environment["cluster_count"]:
-                # Disable watcher for workers because there is no workers information on the oc get hostedclusters command
-                # All clusters ready
-                #                if self.environment["wait_for_workers"]:
-                #                    if clusters_with_all_workers == self.environment["cluster_count"]:
-                #                        self.logging.info("All clusters on Completed status and all clusters with all workers ready. Exiting watcher")
-                #                        break
-                #                    else:
-                #                        self.logging.info(f"Waiting {self.environment['watcher_delay']} seconds for next watcher run")
-                #                        time.sleep(self.environment["watcher_delay"])
-                #                else:
-                self.logging.info("All clusters on Completed status. Exiting watcher")
-                break
-            else:
-                self.logging.info(f"Waiting {self.environment['watcher_delay']} seconds for next watcher run")
-                time.sleep(self.environment["watcher_delay"])
-        self.logging.debug(self.environment['clusters'])
-        self.logging.info("Watcher terminated")
+    def _hostedcluster_state(self, cluster):
+        return cluster.get("status", {}).get("version", {}).get("history", [{}])[0].get("state", None)
 
-    def get_metadata(self, platform, cluster_name):
-        metadata = super().get_metadata(platform, cluster_name)
-        self.logging.info(f"Getting information for cluster {cluster_name} from {self.environment['mgmt_cluster_name']}")
+    def _hostedcluster_changed(self, event_type, obj):
+        # Called by the informer holding its lock. The first list (event_type None) updates every cluster of the seed
+        if event_type is None:
+            hostedclusters = list(self.hostedclusters.objects.values())
+        else:
+            hostedclusters = [obj]
+        for hostedcluster in hostedclusters:
+            cluster_name = hostedcluster.get("metadata", {}).get("name", "")
+            if self.environment["cluster_name_seed"] in cluster_name:
+                self.tracker.update(cluster_name, None if event_type == "DELETED" else self._hostedcluster_state(hostedcluster))
+
+    def _get_hostedcluster(self, cluster_name):
+        """Hostedcluster object from the informer, or from `oc get hostedcluster` when the informer does not have it yet"""
+        hostedcluster = self.hostedclusters.get(cluster_name)
+        if hostedcluster is not None:
+            return hostedcluster
         myenv = os.environ.copy()
         myenv["KUBECONFIG"] = self.environment["mc_kubeconfig"]
         metadata_code, metadata_out, metadata_err = self.utils.subprocess_exec("oc get hostedcluster " + cluster_name + " -n clusters -o json", extra_params={"env": myenv, "universal_newlines": True}, log_output=False)
         try:
-            result = json.loads(metadata_out)
+            return json.loads(metadata_out)
         except Exception as err:
             self.logging.error(f"Cannot load metadata for cluster {cluster_name} from {self.environment['mgmt_cluster_name']}")
             self.logging.error(err)
+            return None
+
+    def watcher(self):
+        super().watcher()
+        self.logging.info(f"Following cluster status changes from the hostedcluster informer of {self.environment['mgmt_cluster_name']}")
+        self.hostedclusters.start()
+        self.watch_clusters()
+
+    def get_metadata(self, platform, cluster_name):
+        metadata = super().get_metadata(platform, cluster_name)
+        self.logging.info(f"Getting information for cluster {cluster_name} from {self.environment['mgmt_cluster_name']}")
+        result = self._get_hostedcluster(cluster_name)
+        if result is None:
             metadata['status'] = "not found"
             return metadata
         metadata["cluster_name"] = result.get("metadata", {}).get("name", None)
@@ -141,19 +112,16 @@ class Hypershiftcli(Azure):
         metadata["version"] = result.get("spec", {}).get("release", {}).get("image", None)
         metadata["status"] = result.get("status", {}).get("version", {}).get("history", [{}])[0].get("state", None)
         metadata["zones"] = None
+        metadata["nodepools"] = {
+            nodepool["metadata"]["name"]: {"replicas": nodepool.get("spec", {}).get("replicas"), "ready_replicas": nodepool.get("status", {}).get("replicas")}
+            for nodepool in self.nodepools.values() if nodepool.get("spec", {}).get("clusterName") == cluster_name
+        }
         return metadata
 
     def get_cluster_id(self, cluster_name):
         self.logging.info(f"Getting clusterID for cluster {cluster_name} from {self.environment['mgmt_cluster_name']}")
-        myenv = os.environ.copy()
-        myenv["KUBECONFIG"] = self.environment["mc_kubeconfig"]
-        metadata_code, metadata_out, metadata_err = self.utils.subprocess_exec("oc get hostedcluster " + cluster_name + " -n clusters -o json", extra_params={"env": myenv, "universal_newlines": True}, log_output=False)
-        try:
-            result = json.loads(metadata_out)
-        except Exception as err:
-            self.logging.error(f"Cannot load metadata for cluster {cluster_name} from {self.environment['mgmt_cluster_name']}")
-            self.logging.error(err)
-        return result.get("spec", {}).get("clusterID", None)
+        result = self._get_hostedcluster(cluster_name)
+        return result.get("spec", {}).get("clusterID", None) if result else None
 
     def get_mc(self, cluster_id):
         self.logging.debug(f"Get the mgmt cluster of cluster {cluster_id}")
@@ -163,8 +131,8 @@ class Hypershiftcli(Azure):
         myenv = os.environ.copy()
         myenv["KUBECONFIG"] = self.environment['mc_kubeconfig']
         self.logging.debug(f"Downloading kubeconfig file for Cluster {cluster_name} from {self.environment['mgmt_cluster_name']} on {path}/kubeconfig")
-        starting_time = datetime.datetime.utcnow().timestamp()
-        while datetime.datetime.utcnow().timestamp() < starting_time + 5 * 60:
+        poll = polling.PollingPolicy("azure_kubeconfig_download", initial=5, maximum=30, timeout=5 * 60)
+        while not poll.expired():
             if self.utils.force_terminate:
                 self.logging.error(f"Exiting kubeconfig downloading on {cluster_name} cluster after capturing Ctrl-C")
                 return None
@@ -173,19 +141,20 @@ class Hypershiftcli(Azure):
                 try:
                     kubeconfig = base64.b64decode(json.loads(kubeconfig_out).get("data", {}).get("kubeconfig", None)).decode("utf-8")
                 except Exception as err:
-                    self.logging.error(f"Cannot load kubeconfig for cluster {cluster_name} from {self.environment['mgmt_cluster_name']}. Waiting 5 seconds for the next try...")
+                    self.logging.error(f"Cannot load kubeconfig for cluster {cluster_name} from {self.environment['mgmt_cluster_name']}. Waiting for the next try...")
                     self.logging.error(err)
                     self.logging.debug(kubeconfig_out)
-                    time.sleep(5)
+                    poll.sleep()
                     continue
                 kubeconfig_path = path + "/kubeconfig"
                 with open(kubeconfig_path, "w") as kubeconfig_file:
                     kubeconfig_file.write(kubeconfig)
                 self.logging.debug(f"Downloaded kubeconfig file for Cluster {cluster_name} and stored at {path}/kubeconfig")
+                poll.done()
                 return kubeconfig_path
             else:
-                self.logging.warning(f"Failed to download kubeconfig file for cluster {cluster_name}. Waiting 5 seconds for the next try...")
-                time.sleep(5)
+                self.logging.warning(f"Failed to download kubeconfig file for cluster {cluster_name}. Waiting for the next try...")
+                poll.sleep()
         self.logging.error(f"Failed to download kubeconfig file for cluster {cluster_name} after 5 minutes.")
         return None
 
@@ -232,96 +201,70 @@ class Hypershiftcli(Azure):
             self.logging.error(f"Failed to write metadata_destroy.json file located at {cluster_info['path']}")
         self.es.index_metadata(cluster_info) if self.es is not None else None
 
+    def _transition_time(self, timestamp):
+        """Epoch of a Kubernetes timestamp like 2024-01-01T00:00:00Z, now when it is missing"""
+        try:
+            return datetime.datetime.strptime(timestamp, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=datetime.timezone.utc).timestamp()
+        except (TypeError, ValueError):
+            return time.time()
+
+    def _controlplane_available(self, hostedcluster):
+        """Epoch when the hosted control plane became available, None while it is not"""
+        for condition in (hostedcluster or {}).get("status", {}).get("conditions", []):
+            if condition.get("message") == "The hosted control plane is available" and condition.get("status") == "True":
+                return self._transition_time(condition.get("lastTransitionTime"))
+        return None
+
+    def _cluster_completed(self, hostedcluster):
+        """Epoch when the version of the cluster was completed, None while it is not"""
+        history = (hostedcluster or {}).get("status", {}).get("version", {}).get("history", [{}])
+        if history and history[0].get("state") == "Completed":
+            return self._transition_time(history[0].get("completionTime"))
+        return None
+
+    def _wait_for_hostedcluster(self, cluster_name, wait_time, ready_function, description):
+        """
+        Wait until ready_function returns the ready time of the hostedcluster, woken up by the hostedcluster informer
+        on every change. Returns the seconds from the start of the wait, 0 after Ctrl-C and None on timeout
+        """
+        starting_time = time.time()
+        self.logging.info(f"Waiting {wait_time} minutes for the {description} of cluster {cluster_name} on {self.environment['mgmt_cluster_name']}")
+        reached = self.hostedclusters.wait_for(lambda objects: ready_function(objects.get(cluster_name)) is not None, wait_time * 60, cancelled=lambda: self.utils.force_terminate)
+        if self.utils.force_terminate:
+            self.logging.error(f"Exiting install times capturing on {cluster_name} cluster after capturing Ctrl-C")
+            return 0
+        if not reached:
+            self.logging.error(f"The {description} of cluster {cluster_name} is not ready after {wait_time} minutes")
+            return None
+        time_to_completed = int(round(max(0, ready_function(self.hostedclusters.get(cluster_name)) - starting_time), 0))
+        self.logging.info(f"The {description} of cluster {cluster_name} is ready after {time_to_completed} seconds")
+        return time_to_completed
+
+    @instrumentation.timed("wait")
     def wait_for_controlplane_ready(self, cluster_name, wait_time):
-        myenv = os.environ.copy()
-        myenv["KUBECONFIG"] = self.environment['mc_kubeconfig']
-        starting_time = datetime.datetime.utcnow().timestamp()
-        while datetime.datetime.utcnow().timestamp() < starting_time + wait_time * 60:
-            if self.utils.force_terminate:
-                self.logging.error(f"Exiting install times capturing on {cluster_name} cluster after capturing Ctrl-C")
-                return 0
-            self.logging.info(f"Getting cluster information for cluster {cluster_name} on {self.environment['mgmt_cluster_name']}")
-            cluster_status_code, cluster_status_out, cluster_status_err = self.utils.subprocess_exec("oc get hostedcluster -n clusters " + cluster_name + " -o json", extra_params={"env": myenv, "universal_newlines": True})
-            current_time = int(datetime.datetime.utcnow().timestamp())
-            try:
-                cluster_status = json.loads(cluster_status_out).get("status", {}).get("conditions", [])
-            except Exception as err:
-                self.logging.error(f"Cannot load command result for cluster {cluster_name}. Waiting 1 seconds for next check...")
-                self.logging.error(err)
-                time.sleep(1)
-                continue
-            if any(item["message"] == "The hosted control plane is available" and item["status"] == "True" for item in cluster_status):
-                time_to_completed = int(round(current_time - starting_time, 0))
-                self.logging.info(f"Control Plane for cluster {cluster_name} is ready after {time_to_completed} seconds")
-                return time_to_completed
-            else:
-                self.logging.info(f"Control Plane for cluster {cluster_name} not ready after {int(round(current_time - starting_time, 0))} seconds, waiting 1 second for the next check")
-                time.sleep(1)
+        return self._wait_for_hostedcluster(cluster_name, wait_time, self._controlplane_available, "control plane")
 
+    @instrumentation.timed("wait")
     def wait_for_cluster_ready(self, cluster_name, wait_time):
-        myenv = os.environ.copy()
-        myenv["KUBECONFIG"] = self.environment['mc_kubeconfig']
-        starting_time = datetime.datetime.utcnow().timestamp()
-        while datetime.datetime.utcnow().timestamp() < starting_time + wait_time * 60:
-            if self.utils.force_terminate:
-                self.logging.error(f"Exiting install times capturing on {cluster_name} cluster after capturing Ctrl-C")
-                return 0
-            self.logging.info(f"Getting cluster information for cluster {cluster_name} on {self.environment['mgmt_cluster_name']}")
-            cluster_status_code, cluster_status_out, cluster_status_err = self.utils.subprocess_exec("oc get hostedcluster -n clusters " + cluster_name + " -o json", extra_params={"env": myenv, "universal_newlines": True})
-            current_time = int(datetime.datetime.utcnow().timestamp())
-            try:
-                cluster_status = json.loads(cluster_status_out).get("status", {}).get("version", {}).get("history", [{}])[0].get("state", None)
-            except Exception as err:
-                self.logging.error(f"Cannot load command result for cluster {cluster_name}. Waiting 5 seconds for next check...")
-                self.logging.error(err)
-                time.sleep(5)
-                continue
-            if cluster_status == "Completed":
-                time_to_completed = int(round(current_time - starting_time, 0))
-                self.logging.info(f"Cluster {cluster_name} status is \"Completed\" after {time_to_completed} seconds")
-                return time_to_completed
-            else:
-                self.logging.info(f"Cluster {cluster_name} status is {cluster_status} after {int(round(current_time - starting_time, 0))} seconds, waiting 15 seconds for the next check")
-                time.sleep(15)
+        return self._wait_for_hostedcluster(cluster_name, wait_time, self._cluster_completed, "\"Completed\" status")
 
+    @instrumentation.timed("wait")
     def _wait_for_workers(self, kubeconfig, worker_nodes, wait_time, cluster_name, machinepool_name):
         self.logging.info(f"Waiting {wait_time} minutes for {worker_nodes} workers to be ready on {machinepool_name} machinepool on {cluster_name}")
-        myenv = os.environ.copy()
-        myenv["KUBECONFIG"] = kubeconfig
         result = [machinepool_name]
 
         starting_time = int(datetime.datetime.utcnow().timestamp())
         self.logging.debug(f"Waiting {wait_time} minutes for nodes to be Ready on cluster {cluster_name} until {datetime.datetime.fromtimestamp(starting_time + wait_time * 60)}")
-        while datetime.datetime.utcnow().timestamp() < starting_time + wait_time * 60:
-            if self.utils.force_terminate:
-                self.logging.error("Exiting workers waiting on the cluster %s after capturing Ctrl-C" % cluster_name)
-                return []
-            self.logging.info("Getting node information for cluster %s" % cluster_name)
-            nodes_code, nodes_out, nodes_err = self.utils.subprocess_exec("oc get nodes -o json", extra_params={"env": myenv, "universal_newlines": True})
-            try:
-                nodes_json = json.loads(nodes_out)
-            except Exception as err:
-                self.logging.error(f"Cannot load command result for cluster {cluster_name}. Waiting 15 seconds for next check...")
-                self.logging.error(err)
-                time.sleep(15)
-                continue
-            nodes = nodes_json["items"] if "items" in nodes_json else []
-
-            # First we find nodes which label nodePool match the machinepool name and then we check if type:Ready is on the conditions
-            ready_nodes = (sum(len(list(filter(lambda x: x.get("type") == "Ready" and x.get("status") == "True", node["status"]["conditions"]))) for node in nodes
-                               if node.get("metadata", {}).get("labels", {}).get("hypershift.openshift.io/nodePool") and machinepool_name in node["metadata"]["labels"]["hypershift.openshift.io/nodePool"])
-                           if nodes
-                           else 0
-                           )
-
-            if ready_nodes == worker_nodes:
-                self.logging.info(f"Found {ready_nodes}/{worker_nodes} ready nodes on machinepool {machinepool_name} for cluster {cluster_name}. Stopping wait.")
-                result.append(ready_nodes)
-                result.append(int(datetime.datetime.utcnow().timestamp()) - starting_time)
-                return result
-            else:
-                self.logging.info(f"Found {ready_nodes}/{worker_nodes} ready nodes on machinepool {machinepool_name} for cluster {cluster_name}. Waiting 15 seconds for next check...")
-                time.sleep(15)
+        # The node informer wakes us up on every node change, no need to poll `oc get nodes`
+        ready_nodes, reached = self.nodes.get(kubeconfig).wait_for_ready_nodes(nodepool_selector(machinepool_name), worker_nodes, wait_time * 60, cancelled=lambda: self.utils.force_terminate)
+        if self.utils.force_terminate:
+            self.logging.error("Exiting workers waiting on the cluster %s after capturing Ctrl-C" % cluster_name)
+            return []
+        if reached:
+            self.logging.info(f"Found {ready_nodes}/{worker_nodes} ready nodes on machinepool {machinepool_name} for cluster {cluster_name}. Stopping wait.")
+            result.append(ready_nodes)
+            result.append(int(datetime.datetime.utcnow().timestamp()) - starting_time)
+            return result
         self.logging.error(f"Waiting time expired. After {wait_time} minutes there are {ready_nodes}/{worker_nodes} ready nodes on {machinepool_name} machinepool for cluster {cluster_name}")
         result.append(ready_nodes)
         result.append("")
@@ -456,69 +399,27 @@ class Hypershiftcli(Azure):
             time.sleep(120)
             self.utils.cluster_load(platform, cluster_name, load="index")
 
+    @instrumentation.timed("wait")
     def _namespace_wait(self, kubeconfig, cluster_id, cluster_name, type):
         start_time = int(datetime.datetime.utcnow().timestamp())
-        self.logging.info(f"Capturing namespace creation time on {type} Cluster for {cluster_name}. Waiting 30 minutes until datetime.datetime.fromtimestamp(start_time + 30 * 60)")
-        myenv = os.environ.copy()
-        myenv["KUBECONFIG"] = kubeconfig
-        # Waiting 30 minutes for preflight checks to end
-        while datetime.datetime.utcnow().timestamp() < start_time + 30 * 60:
+        self.logging.info(f"Capturing namespace creation time on {type} Cluster for {cluster_name}. Waiting 30 minutes until {datetime.datetime.fromtimestamp(start_time + 30 * 60)}")
+        # Waiting 30 minutes for preflight checks to end, on the namespace informer of the cluster shared with the other waiters
+        created = self.namespaces.get(kubeconfig).wait_for_namespaces(cluster_id, 2 if type == "Service" else 3, 30 * 60, cancelled=lambda: self.utils.force_terminate)
+        if created is None:
             if self.utils.force_terminate:
                 self.logging.error(f"Exiting namespace creation waiting for {cluster_name} on the {type} cluster after capturing Ctrl-C")
-                return 0
-            (oc_project_code, oc_project_out, oc_project_err) = self.utils.subprocess_exec("oc get projects --output json", extra_params={"env": myenv})
-            if oc_project_code != 0:
-                self.logging.warning(f"Failed to get the project list on the {type} Cluster. Retrying in 5 seconds. Waiting until {datetime.datetime.fromtimestamp(start_time + 30 * 60)}")
-                time.sleep(5)
             else:
-                try:
-                    projects_json = json.loads(oc_project_out)
-                except Exception as err:
-                    self.logging.warning(oc_project_out)
-                    self.logging.warning(oc_project_err)
-                    self.logging.warning(err)
-                    self.logging.warning(f"Failed to get the project list on the {type} Cluster. Retrying in 5 seconds until {datetime.datetime.fromtimestamp(start_time + 30 * 60)}")
-                    time.sleep(5)
-                    continue
-                namespace_count = 0
-                projects = projects_json.get("items", [])
-                for project in projects:
-                    if cluster_id in project.get("metadata", {}).get("name", ""):
-                        namespace_count += 1
-                if (type == "Service" and namespace_count == 2) or (type == "Management" and namespace_count == 3):
-                    end_time = int(datetime.datetime.utcnow().timestamp())
-                    self.logging.info(f"Namespace for {cluster_name} created in {type} Cluster at {datetime.datetime.fromtimestamp(end_time)}")
-                    return end_time
-                else:
-                    self.logging.warning(f"Namespace for {cluster_name} not found in {type} Cluster. Retrying in 5 seconds until {datetime.datetime.fromtimestamp(start_time + 30 * 60)}")
-                    time.sleep(5)
-        self.logging.error(f"Failed to get namespace for {cluster_name} on the {type} cluster after 15 minutes" % (cluster_name, type))
-        return 0
+                self.logging.error(f"Failed to get namespace for {cluster_name} on the {type} cluster after 30 minutes")
+            return 0
+        # creationTimestamp of the last namespace, on the same clock as the utcnow() start times of the cluster
+        end_time = int(datetime.datetime.utcfromtimestamp(created).timestamp())
+        self.logging.info(f"Namespace for {cluster_name} created in {type} Cluster at {datetime.datetime.fromtimestamp(end_time)}")
+        return end_time
 
     def get_workers_ready(self, kubeconfig, cluster_name):
         super().get_workers_ready(kubeconfig, cluster_name)
-        myenv = os.environ.copy()
-        myenv["KUBECONFIG"] = kubeconfig
         self.logging.info(f"Getting node information for Hypershift cluster {cluster_name}")
-        nodes_code, nodes_out, nodes_err = self.utils.subprocess_exec("oc get nodes -o json", extra_params={"env": myenv, "universal_newlines": True}, log_output=False)
-        try:
-            nodes_json = json.loads(nodes_out)
-        except Exception as err:
-            self.logging.debug(f"Cannot load command result for cluster {cluster_name}")
-            self.logging.debug(err)
-            return 0
-        nodes = nodes_json["items"] if "items" in nodes_json else []
-        status = []
-        for node in nodes:
-            nodepool = node.get("metadata", {}).get("labels", {}).get("hypershift.openshift.io/nodePool", "")
-            if cluster_name in nodepool:
-                conditions = node.get("status", {}).get("conditions", [])
-                for condition in conditions:
-                    if "type" in condition and condition["type"] == "Ready":
-                        status.append(condition["status"])
-        status_list = {i: status.count(i) for i in status}
-        ready_nodes = status_list["True"] if "True" in status_list else 0
-        return ready_nodes
+        return self.nodes.get(kubeconfig).ready_nodes(nodepool_selector(cluster_name))
 
 
 class HypershiftcliArguments(AzureArguments):
@@ -1,19 +1,34 @@
 #!/usr/bin/env python
 # -*- coding: utf-8 -*-
+import os
 import uuid
 import sys
 import yaml
 import json
 import argparse
 import configparser
+from libs.informers import ApiClientRegistry, InformerRegistry, NamespaceInformer, NodeInformer
+from libs.ocm import OcmMetadataCache
+from libs.session import OcmSession
+from libs.tracker import ClusterTracker
 
 
 class Platform:
+    # Cluster states considered as installed and as failed by the tracker
+    ready_states = ("ready",)
+    error_states = ("error",)
+
     def __init__(self, arguments, logging, utils, es):
         self.utils = utils
         self.logging = logging
         self.es = es
         self.environment = {}
+        # One API client per kubeconfig, shared by the informers and every in-cluster operation
+        self.api_clients = ApiClientRegistry(logging)
+        # One node informer per kubeconfig, shared by the workers waiters and the watcher
+        self.nodes = InformerRegistry(logging, lambda kubeconfig: NodeInformer(logging, kubeconfig, self.api_clients))
+        # One namespace informer per Service or Management cluster kubeconfig, shared by the namespace waiters of every cluster
+        self.namespaces = InformerRegistry(logging, lambda kubeconfig: NamespaceInformer(logging, kubeconfig, self.api_clients))
 
         self.environment["commands"] = []
         self.environment["commands"].append("ocm")
@@ -23,24 +38,52 @@ class Platform:
 
         self.environment["ocm_url"] = arguments["ocm_url"]
         self.environment["ocm_token"] = arguments["ocm_token"]
+        self.environment["shared_cli_session"] = arguments["shared_cli_session"]
+        self.ocm_session = None
+
+        self.environment["resume"] = arguments["resume"]
+        resume_uuid = resume_seed = None
+        if self.environment["resume"]:
+            resume_path = arguments["path"] if arguments["path"] else ("/tmp/" + arguments["uuid"] if arguments["uuid"] else None)
+            if not resume_path:
+                self.logging.error("--resume requires the --path or --uuid of the execution to resume")
+                sys.exit("Exiting...")
+            try:
+                with open(resume_path + "/uuid", "r") as uuid_file:
+                    resume_uuid = uuid_file.read().strip()
+                with open(resume_path + "/cluster_name_seed", "r") as seed_file:
+                    resume_seed = seed_file.read().strip()
+            except Exception as err:
+                self.logging.error(f"Cannot read the uuid and cluster_name_seed files of the execution to resume from {resume_path}")
+                self.logging.error(err)
+                sys.exit("Exiting...")
+            self.logging.info(f"Resuming execution from {resume_path}")
 
         self.environment["uuid"] = (
-            arguments["uuid"] if arguments["uuid"] else str(uuid.uuid4())
+            resume_uuid if resume_uuid else (arguments["uuid"] if arguments["uuid"] else str(uuid.uuid4()))
         )
         self.logging.info("Test running with UUID: %s" % self.environment["uuid"])
 
         self.environment["path"] = (
-            arguments["path"]
-            if arguments["path"]
-            else "/tmp/" + self.environment["uuid"]
+            resume_path
+            if self.environment["resume"]
+            else (arguments["path"] if arguments["path"] else "/tmp/" + self.environment["uuid"])
         )
         utils.create_path(self.environment["path"])
         self.logging.info("Using %s as working directory" % self.environment["path"])
 
         self.environment["clusters"] = {}
         self.environment["cluster_count"] = arguments["cluster_count"]
+        # Incremental cluster state counters, fed by the install threads and the fleet pollers and consumed by the watcher
+        self.tracker = ClusterTracker(logging, self.environment["cluster_count"], self.ready_states, self.error_states)
         self.environment["batch_size"] = arguments["batch_size"]
         self.environment["delay_between_batch"] = arguments["delay_between_batch"]
+        self.environment["max_concurrency"] = arguments["max_concurrency"]
+        self.environment["install_rate"] = arguments["install_rate"]
+        self.environment["install_burst"] = arguments["install_burst"]
+
+        self.environment["rehydrate_workers"] = arguments["rehydrate_workers"]
+        self.environment["rehydrate_rate"] = arguments["rehydrate_rate"]
 
         self.environment["watcher_delay"] = arguments["watcher_delay"]
 
@@ -69,13 +112,18 @@ class Platform:
         self.environment['load']['duration'] = arguments['workload_duration']
         self.environment['load']['jobs'] = arguments['workload_jobs']
 
-        if arguments["static_cluster_name"]:
+        if resume_seed:
+            self.environment["cluster_name_seed"] = resume_seed
+        elif arguments["static_cluster_name"]:
             self.environment["cluster_name_seed"] = arguments["static_cluster_name"]
         else:
             self.environment["cluster_name_seed"] = utils.generate_cluster_name_seed(arguments["cluster_name_seed"])
 
         self.environment["wildcard_options"] = arguments["wildcard_options"]
 
+        # OCM records of all the clusters of the seed, listed in bulk instead of one `ocm` call per cluster
+        self.ocm_cache = OcmMetadataCache(logging, utils, self.environment["cluster_name_seed"], ttl=arguments["ocm_cache_ttl"], page_size=arguments["ocm_page_size"])
+
         if str(arguments["cleanup_clusters"]).lower() == "true":
             self.environment["cleanup_clusters"] = True
             self.environment["wait_before_cleanup"] = arguments["wait_before_cleanup"]
@@ -116,13 +164,23 @@ class Platform:
                 "`ocm login` execution OK"
             )
 
+    def start_cli_session(self):
+        """After all the logins of the platform, refresh the OCM token from the driver for every forked `ocm` and `rosa`"""
+        if self.environment["shared_cli_session"] and self.environment["ocm_token"]:
+            session = OcmSession(self.logging, self.environment["path"])
+            self.ocm_session = session if session.start() else None
+
     def download_kubeconfig(self, cluster_name, path):
         self.logging.debug(
             f"Downloading kubeconfig file for Cluster {cluster_name} on {path}/kubeconfig_{cluster_name}"
         )
+        cluster_id = self.get_cluster_id(cluster_name)
+        if cluster_id is None:
+            self.logging.error(f"Cluster ID not found for cluster {cluster_name}, cannot download its kubeconfig file")
+            return None
         kubeconfig_code, kubeconfig_out, kubeconfig_err = self.utils.subprocess_exec(
             "ocm get /api/clusters_mgmt/v1/clusters/"
-            + self.get_cluster_id(cluster_name)
+            + cluster_id
             + "/credentials",
             extra_params={"cwd": path, "universal_newlines": True},
         )
@@ -143,28 +201,15 @@ class Platform:
 
     def get_cluster_id(self, cluster_name):
         self.logging.debug(f"Obtaining Cluster ID for cluster name {cluster_name}")
-        list_cmd = [
-            'ocm', 'list', 'clusters',
-            f'-p=search=name=\'{cluster_name}\'',
-            '--columns', 'id', '--no-headers'
-        ]
-        list_code, list_out, list_err = self.utils.subprocess_exec(
-            list_cmd,
-            extra_params={"universal_newlines": True},
-        )
-        return list_out.strip() if list_code == 0 else None
+        cluster = self.ocm_cache.get(cluster_name)
+        return cluster.get("id", None) if cluster else None
 
     def get_ocm_cluster_info(self, cluster_name):
         self.logging.info(f"Get Cluster metadata of {cluster_name}")
-        resp_code, resp_out, resp_err = self.utils.subprocess_exec(
-                "ocm get cluster " + self.get_cluster_id(cluster_name),
-                extra_params={"universal_newlines": True},
-        )
-        try:
-            cluster = json.loads(resp_out)
-        except Exception as err:
+        cluster = self.ocm_cache.get(cluster_name)
+        if cluster is None:
             self.logging.error(f"Cannot load metadata for cluster {cluster_name}")
-            self.logging.error(err)
+            cluster = {}
         metadata = {}
         metadata['cluster_name'] = cluster.get("name", None)
         metadata['infra_id'] = cluster.get("infra_id", None)
@@ -189,17 +234,71 @@ class Platform:
         pass
 
     def delete_cluster(self, platform, cluster_name):
-        pass
+        # Waits and watcher are done with the cluster, its API server is about to disappear
+        self.release_cluster(platform.environment["clusters"].get(cluster_name, {}).get("kubeconfig"))
+
+    def release_cluster(self, kubeconfig):
+        """Stop the node informer and close the API client of a cluster kubeconfig. Service and Management cluster ones are kept"""
+        if not kubeconfig or kubeconfig in (self.environment.get("sc_kubeconfig"), self.environment.get("mc_kubeconfig")):
+            return
+        self.nodes.release(kubeconfig)
+        self.api_clients.release(kubeconfig)
+
+    def resume_cluster(self, platform, cluster_name):
+        # Called instead of create_cluster for clusters still installing when a resumed execution stopped
+        cluster_info = platform.environment["clusters"][cluster_name]
+        cluster_info["metadata"] = self.get_metadata(platform, cluster_name) or {}
+        cluster_info["status"] = cluster_info["metadata"].get("status", cluster_info["status"])
+        self.logging.info(f"Cluster {cluster_name} resumed on status: {cluster_info['status']}")
 
     def get_metadata(self, platform, cluster_name):
-        pass
+        return {}
+
+    def deletion_in_progress(self, cluster_name):
+        # True for platforms following the deletion in background after delete_cluster returned
+        return False
 
     def platform_cleanup(self):
-        pass
+        if self.ocm_session is not None:
+            self.ocm_session.stop()
+        self.nodes.stop_all()
+        self.namespaces.stop_all()
+        self.api_clients.close_all()
 
     def watcher(self):
         pass
 
+    def watch_clusters(self):
+        """
+        Event driven watcher: log the tracker counters on every change and exit as soon as
+        every cluster is ready, every install thread finished, Ctrl-C is captured or the terminate_watcher file is created
+        """
+        self.logging.info(f"Watcher started on {self.environment['platform']}")
+        self.logging.info(f"Expected Clusters: {self.environment['cluster_count']}")
+        self.logging.info(f"Manually terminate watcher creating the file {self.environment['path']}/terminate_watcher")
+        file_path = os.path.join(self.environment["path"], "terminate_watcher")
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        version = None
+        while not self.utils.force_terminate:
+            if os.path.isfile(file_path):
+                self.logging.warning("Watcher has been manually set to terminate")
+                break
+            current_version = self.tracker.wait_for_change(version, timeout=self.environment["watcher_delay"])
+            if current_version != version:
+                version = current_version
+                current_cluster_count, state, finished = self.tracker.summary()
+                self.logging.info("Requested Clusters for test %s: %d of %d" % (self.environment["uuid"], current_cluster_count, self.environment["cluster_count"]))
+                self.logging.info("".join("(" + str(key) + ": " + str(value) + ") " for key, value in state.items()))
+                errors = self.tracker.errors()
+                if errors:
+                    self.logging.warning("Clusters in error state: %s" % errors)
+            if self.tracker.is_done(wait_for_finished=bool(self.environment["wait_for_workers"])):
+                self.logging.info("All clusters installed or finished. Exiting watcher")
+                break
+        self.logging.debug(self.environment['clusters'])
+        self.logging.info("Watcher terminated")
+
 
 class PlatformArguments:
     def __init__(self, parser, config_file, environment):
@@ -207,6 +306,9 @@ class PlatformArguments:
 
         parser.add_argument("--ocm-token", action=EnvDefault, env=environment, envvar="HCP_BURNER_OCM_TOKEN", help="Token to access OCM API")
         parser.add_argument("--ocm-url", action=EnvDefault, env=environment, envvar="HCP_BURNER_OCM_URL", help="OCM URL", default="https://api.stage.openshift.com")
+        parser.add_argument("--ocm-cache-ttl", action=EnvDefault, env=environment, envvar="HCP_BURNER_OCM_CACHE_TTL", type=int, default=60, help="Seconds the OCM metadata of a cluster is cached before listing the clusters again")
+        parser.add_argument("--ocm-page-size", action=EnvDefault, env=environment, envvar="HCP_BURNER_OCM_PAGE_SIZE", type=int, default=100, help="Number of clusters requested per page when listing OCM clusters")
+        parser.add_argument("--shared-cli-session", action="store_true", help="Refresh the OCM access token from the driver and share it with every `ocm` and `rosa` command through OCM_CONFIG, instead of letting every command refresh it. Only OCM is covered, `az` commands keep refreshing the Azure CLI tokens on their own")
 
         if config_file:
             config = configparser.ConfigParser()
@@ -6,12 +6,16 @@ import re
 import os
 import time
 import datetime
+import glob
 import math
 import shutil
+import threading
 import concurrent.futures
 import configparser
 from copy import deepcopy
 
+from libs import instrumentation
+from libs.informers import nodepool_selector
 from libs.platforms.rosa.rosa import Rosa
 from libs.platforms.rosa.rosa import RosaArguments
 
@@ -39,6 +43,7 @@ class Hypershift(Rosa):
             self.environment["commands"].append("terraform")
             self.environment["clusters_per_vpc"] = arguments["clusters_per_vpc"]
             self.environment["terraform_retry"] = arguments["terraform_retry"]
+            self.environment["vpc_batch_size"] = arguments["vpc_batch_size"]
         else:
             if (arguments["install_clusters"]) and (arguments["wildcard_options"] and "--subnets-ids" not in arguments["wildcard_options"] or not arguments["wildcard_options"]):
                 self.logging.error("Cluster creation will fail. No subnets are provided and no --create-vpcs command is selected")
@@ -46,6 +51,13 @@ class Hypershift(Rosa):
             else:
                 self.logging.info(f"No VPC will be created, using {arguments['wildcard_options']}")
 
+        # VPCs created so far, published by the VPC batches to the clusters waiting for them
+        self.vpcs_available = threading.Condition()
+        self.vpcs_done = True
+        self.vpcs_stop = threading.Event()
+        self.vpc_batches = None
+        self.vpc_terraform_paths = []
+
     def initialize(self):
         super().initialize()
 
@@ -74,17 +86,30 @@ class Hypershift(Rosa):
             vpcs_to_create = math.ceil(self.environment["cluster_count"] / self.environment["clusters_per_vpc"])
             self.logging.info(f"Clusters Requested: {self.environment['cluster_count']}. Clusters Per VPC: {self.environment['clusters_per_vpc']}. VPCs to create: {vpcs_to_create}")
             os.mkdir(self.environment["path"] + "/terraform")
-            shutil.copyfile(
-                sys.path[0] + "/libs/platforms/rosa/hypershift/terraform/setup-vpcs.tf",
-                self.environment["path"] + "/terraform/setup-vpcs.tf",
-            )
-            self.environment["vpcs"] = self._create_vpcs(vpcs_to_create)
-            if len(self.environment["vpcs"]) == 0:
-                self.logging.error("Failed to create AWS VPCs, jumping to cleanup and exiting...")
-                self.platform_cleanup()
-                sys.exit("Exiting")
+            if self.environment["vpc_batch_size"] and self.environment["vpc_batch_size"] < vpcs_to_create:
+                # Clusters start as soon as the first batch of VPCs is created, the next batches are created meanwhile
+                self.environment["vpcs"] = []
+                self.vpcs_done = False
+                self.vpc_batches = threading.Thread(target=self._create_vpc_batches, args=(vpcs_to_create,), name="vpc-batches")
+                self.vpc_batches.daemon = True
+                self.vpc_batches.start()
+                if self._wait_for_vpc(0) is None:
+                    self.logging.error("Failed to create the first batch of AWS VPCs, jumping to cleanup and exiting...")
+                    self.platform_cleanup()
+                    sys.exit("Exiting")
             else:
-                self.logging.info(f"Created {len(self.environment['vpcs'])} AWS VPCs")
+                self.vpc_terraform_paths.append(self.environment["path"] + "/terraform")
+                shutil.copyfile(
+                    sys.path[0] + "/libs/platforms/rosa/hypershift/terraform/setup-vpcs.tf",
+                    self.environment["path"] + "/terraform/setup-vpcs.tf",
+                )
+                self.environment["vpcs"] = self._create_vpcs(vpcs_to_create, self.environment["path"] + "/terraform")
+                if len(self.environment["vpcs"]) == 0:
+                    self.logging.error("Failed to create AWS VPCs, jumping to cleanup and exiting...")
+                    self.platform_cleanup()
+                    sys.exit("Exiting")
+                else:
+                    self.logging.info(f"Created {len(self.environment['vpcs'])} AWS VPCs")
 
     def _verify_provision_shard(self):
         self.logging.debug(self.environment['aws'])
@@ -102,6 +127,10 @@ class Hypershift(Rosa):
         return None
 
     def _get_mc(self, cluster_id):
+        # The management cluster of a cluster does not change, ask OCM only once per cluster
+        return self.ocm_cache.memoize(("management_cluster", cluster_id), lambda: self._query_mc(cluster_id))
+
+    def _query_mc(self, cluster_id):
         self.logging.debug(f"Get the mgmt cluster of cluster {cluster_id}")
         resp_code, resp_out, resp_err = self.utils.subprocess_exec(
             "ocm get /api/clusters_mgmt/v1/clusters/" + cluster_id + "/hypershift",
@@ -112,19 +141,8 @@ class Hypershift(Rosa):
     # Get Hypershift cluster metadata and set required platform environment variables
     def get_metadata(self, platform, cluster_name):
         metadata = super().get_metadata(platform, cluster_name)
-        self.logging.info(f"Getting information for cluster {cluster_name}")
-        metadata_code, metadata_out, metadata_err = self.utils.subprocess_exec(
-            "rosa describe cluster -c " + cluster_name + " -o json",
-            extra_params={"universal_newlines": True}
-        )
-        try:
-            status = json.loads(metadata_out)["state"]
-        except Exception as err:
-            self.logging.error(f"Cannot load metadata for cluster {cluster_name}")
-            self.logging.error(err)
-
-        if status == "ready":
-            cluster_mc = self._get_mc(self.get_cluster_id(cluster_name))
+        if metadata["status"] == "ready":
+            cluster_mc = self._get_mc(metadata["cluster_id"] if metadata["cluster_id"] else self.get_cluster_id(cluster_name))
             metadata["mgmt_cluster_name"] = cluster_mc
             platform.environment["mc_kubeconfig"] = platform.environment["path"] + "/kubeconfig_" + cluster_mc
 
@@ -140,12 +158,48 @@ class Hypershift(Rosa):
         # Delete VPCs
         self._destroy_vpcs() if (self.environment["create_vpcs"] or self.environment["delete_vpcs"]) else None
 
-    def _create_vpcs(self, vpcs_to_create):
+    def _create_vpc_batches(self, vpcs_to_create):
+        """Create the VPCs in batches of vpc_batch_size on their own terraform directory, publishing every batch once it is created"""
+        batch_size = self.environment["vpc_batch_size"]
+        try:
+            for offset in range(0, vpcs_to_create, batch_size):
+                if self.vpcs_stop.is_set() or self.utils.force_terminate:
+                    self.logging.warning(f"Stopping VPC creation after {offset} of {vpcs_to_create} VPCs")
+                    return
+                terraform_path = self.environment["path"] + "/terraform/batch-%04d" % (offset // batch_size + 1)
+                os.mkdir(terraform_path)
+                shutil.copyfile(sys.path[0] + "/libs/platforms/rosa/hypershift/terraform/setup-vpcs.tf", terraform_path + "/setup-vpcs.tf")
+                with self.vpcs_available:
+                    self.vpc_terraform_paths.append(terraform_path)
+                vpcs = self._create_vpcs(min(batch_size, vpcs_to_create - offset), terraform_path, offset)
+                if len(vpcs) == 0:
+                    self.logging.error(f"Failed to create the AWS VPCs of {terraform_path}, clusters without VPC will not be installed")
+                    return
+                with self.vpcs_available:
+                    self.environment["vpcs"].extend(vpcs)
+                    self.vpcs_available.notify_all()
+                self.logging.info(f"Created {offset + len(vpcs) // self.environment['clusters_per_vpc']}/{vpcs_to_create} AWS VPCs")
+        finally:
+            with self.vpcs_available:
+                self.vpcs_done = True
+                self.vpcs_available.notify_all()
+
+    def _wait_for_vpc(self, index):
+        """Return the (vpc_id, subnets) of the cluster index, waiting for its VPC batch. None if it will not be created"""
+        with self.vpcs_available:
+            while index >= len(self.environment["vpcs"]) and not self.vpcs_done and not self.utils.force_terminate:
+                self.vpcs_available.wait(timeout=5)
+            return self.environment["vpcs"][index] if index < len(self.environment["vpcs"]) else None
+
+    def _create_vpcs(self, vpcs_to_create, terraform_path, offset=0):
+        myenv = os.environ.copy()
+        myenv["TF_PLUGIN_CACHE_DIR"] = self.environment["path"] + "/terraform-plugin-cache"
+        os.makedirs(myenv["TF_PLUGIN_CACHE_DIR"], exist_ok=True)
         self.logging.info("Initializing Terraform with: terraform init")
         terraform_code, terraform_out, terraform_err = self.utils.subprocess_exec(
             "terraform init",
-            self.environment["path"] + "/terraform/terraform-version.log",
-            {"cwd": self.environment["path"] + "/terraform"},
+            terraform_path + "/terraform-version.log",
+            {"cwd": terraform_path, "env": myenv},
         )
         if terraform_code == 0:
             self.logging.info(
@@ -158,11 +212,12 @@ class Hypershift(Rosa):
                     "cluster_name_seed"
                 ]
                 myenv["TF_VAR_cluster_count"] = str(vpcs_to_create)
+                myenv["TF_VAR_vpc_offset"] = str(offset)
                 myenv["TF_VAR_aws_region"] = self.environment["aws"]["region"]
                 apply_code, apply_out, apply_err = self.utils.subprocess_exec(
                     "terraform apply --auto-approve",
-                    self.environment["path"] + "/terraform/terraform-apply.log",
-                    {"cwd": self.environment["path"] + "/terraform", "env": myenv},
+                    terraform_path + "/terraform-apply.log",
+                    {"cwd": terraform_path, "env": myenv},
                 )
                 if apply_code == 0:
                     self.logging.info(
@@ -170,7 +225,7 @@ class Hypershift(Rosa):
                     )
                     try:
                         with open(
-                            self.environment["path"] + "/terraform/terraform.tfstate",
+                            terraform_path + "/terraform.tfstate",
                             "r",
                         ) as terraform_file:
                             json_output = json.load(terraform_file)
@@ -180,8 +235,7 @@ class Hypershift(Rosa):
                             "Try: %d. Failed to read terraform output file %s"
                             % (
                                 trying,
-                                self.environment["path"]
-                                + "/terraform/terraform.tfstate",
+                                terraform_path + "/terraform.tfstate",
                             )
                         )
                         return []
@@ -263,12 +317,21 @@ class Hypershift(Rosa):
                 % self.environment["terraform_retry"]
             )
         self.logging.error(
-            "Failed to initialize terraform on %s" % self.environment["path"]
-            + "/terraform"
+            "Failed to initialize terraform on %s" % terraform_path
         )
         return []
 
     def _destroy_vpcs(self):
+        # Stop the VPC batches not started yet, the running one has to finish before being destroyed
+        self.vpcs_stop.set()
+        if self.vpc_batches is not None:
+            self.vpc_batches.join()
+        # Batches of a previous execution on the same directory are found by their names
+        terraform_paths = self.vpc_terraform_paths or sorted(glob.glob(self.environment["path"] + "/terraform/batch-*")) or [self.environment["path"] + "/terraform"]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=len(terraform_paths)) as executor:
+            return max(executor.map(self._destroy_vpc_batch, terraform_paths))
+
+    def _destroy_vpc_batch(self, terraform_path):
         for trying in range(1, self.environment["terraform_retry"] + 1):
             # if args.manually_cleanup_secgroups:
             #     for cluster in vpcs:
@@ -277,11 +340,11 @@ class Hypershift(Rosa):
             self.logging.info("Try: %d. Starting terraform destroy process" % trying)
             destroy_code, destroy_out, destroy_err = self.utils.subprocess_exec(
                 "terraform destroy --auto-approve",
-                self.environment["path"] + "/terraform/terraform-destroy.log",
-                {"cwd": self.environment["path"] + "/terraform"},
+                terraform_path + "/terraform-destroy.log",
+                {"cwd": terraform_path},
             )
             if destroy_code == 0:
-                self.logging.info("Try: %d. All VPCs destroyed" % trying)
+                self.logging.info("Try: %d. All VPCs of %s destroyed" % (trying, terraform_path))
                 return 0
             else:
                 self.logging.error(
@@ -354,74 +417,27 @@ class Hypershift(Rosa):
         self.logging.error(f"No Role named kube-controller-manager found on Cluster {cluster_name}")
         return None
 
+    @instrumentation.timed("wait")
     def _wait_for_workers(
         self, kubeconfig, worker_nodes, wait_time, cluster_name, machinepool_name
     ):
         self.logging.info(
             f"Waiting {wait_time} minutes for {worker_nodes} workers to be ready on {machinepool_name} machinepool on {cluster_name}"
         )
-        myenv = os.environ.copy()
-        myenv["KUBECONFIG"] = kubeconfig
         result = [machinepool_name]
         starting_time = datetime.datetime.utcnow().timestamp()
         self.logging.debug(
             f"Waiting {wait_time} minutes for nodes to be Ready on cluster {cluster_name} until {datetime.datetime.fromtimestamp(starting_time + wait_time * 60)}"
         )
-        while datetime.datetime.utcnow().timestamp() < starting_time + wait_time * 60:
-            # if force_terminate:
-            #     logging.error("Exiting workers waiting on the cluster %s after capturing Ctrl-C" % cluster_name)
-            #     return []
-            self.logging.info("Getting node information for cluster %s" % cluster_name)
-            nodes_code, nodes_out, nodes_err = self.utils.subprocess_exec(
-                "oc get nodes -o json",
-                extra_params={"env": myenv, "universal_newlines": True},
-            )
-            try:
-                nodes_json = json.loads(nodes_out)
-            except Exception as err:
-                self.logging.error(
-                    f"Cannot load command result for cluster {cluster_name}. Waiting 15 seconds for next check..."
-                )
-                self.logging.error(err)
-                time.sleep(15)
-                continue
-            nodes = nodes_json["items"] if "items" in nodes_json else []
-
-            # First we find nodes which label nodePool match the machinepool name and then we check if type:Ready is on the conditions
-            ready_nodes = (
-                sum(
-                    len(
-                        list(
-                            filter(
-                                lambda x: x.get("type") == "Ready"
-                                and x.get("status") == "True",
-                                node["status"]["conditions"],
-                            )
-                        )
-                    )
-                    for node in nodes
-                    if node.get("metadata", {})
-                    .get("labels", {})
-                    .get("hypershift.openshift.io/nodePool")
-                    and machinepool_name
-                    in node["metadata"]["labels"]["hypershift.openshift.io/nodePool"]
-                )
-                if nodes
-                else 0
+        # The node informer wakes us up on every node change, no need to poll `oc get nodes`
+        ready_nodes, reached = self.nodes.get(kubeconfig).wait_for_ready_nodes(nodepool_selector(machinepool_name), worker_nodes, wait_time * 60)
+        if reached:
+            self.logging.info(
+                f"Found {ready_nodes}/{worker_nodes} ready nodes on machinepool {machinepool_name} for cluster {cluster_name}. Stopping wait."
             )
-
-            if ready_nodes == worker_nodes:
-                self.logging.info(
-                    f"Found {ready_nodes}/{worker_nodes} ready nodes on machinepool {machinepool_name} for cluster {cluster_name}. Stopping wait."
-                )
-                result.append(ready_nodes)
-                result.append(int(datetime.datetime.utcnow().timestamp()))
-                return result
-            else:
-                self.logging.info(
-                    f"Found {ready_nodes}/{worker_nodes} ready nodes on machinepool {machinepool_name} for cluster {cluster_name}. Waiting 15 seconds for next check..."
-                )
-                time.sleep(15)
+            result.append(ready_nodes)
+            result.append(int(datetime.datetime.utcnow().timestamp()))
+            return result
         self.logging.error(
             f"Waiting time expired. After {wait_time} minutes there are {ready_nodes}/{worker_nodes} ready nodes on {machinepool_name} machinepool for cluster {cluster_name}"
         )
@@ -453,8 +469,12 @@ class Hypershift(Rosa):
         self.logging.debug("Output directory set to %s" % cluster_info["path"])
         cluster_cmd = ["rosa", "create", "cluster", "--cluster-name", cluster_name, "--replicas", str(cluster_info["workers"]), "--hosted-cp", "--sts", "--mode", "auto", "-y", "--output", "json", "--oidc-config-id", platform.environment["oidc_config_id"], "--region", platform.environment["aws"]["region"]]
         if platform.environment["create_vpcs"]:
-            self.logging.debug(platform.environment["vpcs"][(cluster_info["index"])])
-            cluster_info["vpc"] = platform.environment["vpcs"][(cluster_info["index"])]
+            cluster_info["vpc"] = self._wait_for_vpc(cluster_info["index"])
+            if cluster_info["vpc"] is None:
+                self.logging.error(f"No VPC created for cluster {cluster_name}")
+                cluster_info["status"] = "Not Installed"
+                return 1
+            self.logging.debug(cluster_info["vpc"])
             cluster_cmd.append("--subnet-ids")
             cluster_cmd.append(cluster_info["vpc"][1])
         if "shard_id" in platform.environment:
@@ -600,87 +620,33 @@ class Hypershift(Rosa):
                 #     _get_must_gather(cluster_path, cluster_name)
                 #     _get_mgmt_cluster_must_gather(mgmt_kubeconfig_path, path)
 
+    @instrumentation.timed("wait")
     def _namespace_wait(self, kubeconfig, cluster_id, cluster_name, type):
         start_time = int(datetime.datetime.utcnow().timestamp())
         self.logging.info(
-            f"Capturing namespace creation time on {type} Cluster for {cluster_name}. Waiting 60 minutes until datetime.datetime.fromtimestamp(start_time + 60 * 60)"
+            f"Capturing namespace creation time on {type} Cluster for {cluster_name}. Waiting 60 minutes until {datetime.datetime.fromtimestamp(start_time + 60 * 60)}"
         )
-        myenv = os.environ.copy()
-        myenv["KUBECONFIG"] = kubeconfig
-        # Waiting 60 minutes for preflight checks to end
-        while datetime.datetime.utcnow().timestamp() < start_time + 60 * 60:
+        # Waiting 60 minutes for preflight checks to end, on the namespace informer of the cluster shared with the other waiters
+        created = self.namespaces.get(kubeconfig).wait_for_namespaces(
+            cluster_id, 2 if type == "Service" else 3, 60 * 60, cancelled=lambda: self.utils.force_terminate
+        )
+        if created is None:
             if self.utils.force_terminate:
                 self.logging.error(f"Exiting namespace creation waiting for {cluster_name} on the {type} cluster after capturing Ctrl-C")
-                return 0
-            (
-                oc_project_code,
-                oc_project_out,
-                oc_project_err,
-            ) = self.utils.subprocess_exec(
-                "oc get projects --output json", extra_params={"env": myenv}
-            )
-            if oc_project_code != 0:
-                self.logging.warning(
-                    f"Failed to get the project list on the {type} Cluster. Retrying in 5 seconds. Waiting until {datetime.datetime.fromtimestamp(start_time + 60 * 60)}"
-                )
-                time.sleep(5)
             else:
-                try:
-                    projects_json = json.loads(oc_project_out)
-                except Exception as err:
-                    self.logging.warning(oc_project_out)
-                    self.logging.warning(oc_project_err)
-                    self.logging.warning(err)
-                    self.logging.warning(
-                        f"Failed to get the project list on the {type} Cluster. Retrying in 5 seconds until {datetime.datetime.fromtimestamp(start_time + 60 * 60)}"
-                    )
-                    time.sleep(5)
-                    continue
-                namespace_count = 0
-                projects = projects_json.get("items", [])
-                for project in projects:
-                    if cluster_id in project.get("metadata", {}).get("name", ""):
-                        namespace_count += 1
-                if (type == "Service" and namespace_count == 2) or (
-                    type == "Management" and namespace_count == 3
-                ):
-                    end_time = int(datetime.datetime.utcnow().timestamp())
-                    self.logging.info(
-                        f"Namespace for {cluster_name} created in {type} Cluster at {datetime.datetime.fromtimestamp(end_time)}"
-                    )
-                    return end_time
-                else:
-                    self.logging.warning(
-                        f"Namespace for {cluster_name} not found in {type} Cluster. Retrying in 5 seconds until {datetime.datetime.fromtimestamp(start_time + 60 * 60)}"
-                    )
-                    time.sleep(5)
-        self.logging.error(f"Failed to get namespace for {cluster_name} on the {type} cluster after 60 minutes")
-        return 0
+                self.logging.error(f"Failed to get namespace for {cluster_name} on the {type} cluster after 60 minutes")
+            return 0
+        # creationTimestamp of the last namespace, on the same clock as the utcnow() start times of the cluster
+        end_time = int(datetime.datetime.utcfromtimestamp(created).timestamp())
+        self.logging.info(
+            f"Namespace for {cluster_name} created in {type} Cluster at {datetime.datetime.fromtimestamp(end_time)}"
+        )
+        return end_time
 
     def get_workers_ready(self, kubeconfig, cluster_name):
         super().get_workers_ready(kubeconfig, cluster_name)
-        myenv = os.environ.copy()
-        myenv["KUBECONFIG"] = kubeconfig
         self.logging.info(f"Getting node information for Hypershift cluster {cluster_name}")
-        nodes_code, nodes_out, nodes_err = self.utils.subprocess_exec("oc get nodes -o json", extra_params={"env": myenv, "universal_newlines": True}, log_output=False)
-        try:
-            nodes_json = json.loads(nodes_out)
-        except Exception as err:
-            self.logging.debug(f"Cannot load command result for cluster {cluster_name}")
-            self.logging.debug(err)
-            return 0
-        nodes = nodes_json["items"] if "items" in nodes_json else []
-        status = []
-        for node in nodes:
-            nodepool = node.get("metadata", {}).get("labels", {}).get("hypershift.openshift.io/nodePool", "")
-            if "workers" in nodepool:
-                conditions = node.get("status", {}).get("conditions", [])
-                for condition in conditions:
-                    if "type" in condition and condition["type"] == "Ready":
-                        status.append(condition["status"])
-        status_list = {i: status.count(i) for i in status}
-        ready_nodes = status_list["True"] if "True" in status_list else 0
-        return ready_nodes
+        return self.nodes.get(kubeconfig).ready_nodes(nodepool_selector("workers"))
 
 
 class HypershiftArguments(RosaArguments):
@@ -693,6 +659,7 @@ class HypershiftArguments(RosaArguments):
         parser.add_argument("--terraform-retry", type=int, default=5, help="Number of retries when executing terraform commands")
         parser.add_argument("--service-cluster", action=EnvDefault, env=environment, envvar="HCP_BURNER_HYPERSHIFT_SERVICE_CLUSTER", help="Service Cluster Used to create the Hosted Clusters")
         parser.add_argument("--delete-vpcs", action="store_true", help="Delete all VPC after cleanup")
+        parser.add_argument("--vpc-batch-size", action=EnvDefault, env=environment, envvar="HCP_BURNER_VPC_BATCH_SIZE", help="VPCs created on each terraform apply, clusters start as soon as the VPCs of their batch exist. Default: 0 (all on a single apply)", type=int, default=0)
 
         if config_file:
             config = configparser.ConfigParser()
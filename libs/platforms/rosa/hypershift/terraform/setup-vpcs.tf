@@ -4,6 +4,12 @@ variable "cluster_count" {
   default     = 1
 }
 
+variable "vpc_offset" {
+  type        = number
+  description = "Number of VPCs created by the previous batches, to keep the names unique"
+  default     = 0
+}
+
 variable "cluster_name_seed" {
   type        = string
   description = "The name used to create the VPCs"
@@ -33,7 +39,7 @@ module "vpc" {
   source  = "terraform-aws-modules/vpc/aws"
   version = "5.0.0"
   azs     = local.selected_azs
-  name    = "vpc-${var.cluster_name_seed}-${format("%04d", count.index + 1)}"
+  name    = "vpc-${var.cluster_name_seed}-${format("%04d", count.index + var.vpc_offset + 1)}"
   cidr    = "10.0.0.0/16"
 
   private_subnets = ["10.0.1.0/24", "10.0.2.0/24", "10.0.3.0/24"]
@@ -3,18 +3,23 @@
 import os
 import sys
 import json
-import time
 import datetime
 import subprocess
 import configparser
 import argparse
 from packaging import version as ver
+from libs import instrumentation
+from libs import polling
 from libs.aws import AWS
+from libs.fleet import FleetPoller
 from libs.platforms.platform import Platform
 from libs.platforms.platform import PlatformArguments
 
 
 class Rosa(Platform):
+    # Seconds given to a cluster to leave the preflight checks and to finish its installation
+    install_timeout = 120 * 60
+
     def __init__(self, arguments, logging, utils, es):
         super().__init__(arguments, logging, utils, es)
 
@@ -47,6 +52,11 @@ class Rosa(Platform):
                 "extra_machinepool_taints"
             ]
 
+        # Single `rosa list clusters` poller shared by the watcher, the preflight waiters and get_metadata
+        self.fleet = FleetPoller(logging, utils, "rosa", self._list_clusters, interval=arguments["fleet_poll_interval"])
+        self.fleet.subscribe(lambda event: self.utils.journal_record(event["cluster_name"], {"fleet_state": event["state"]}))
+        self.fleet.subscribe(lambda event: self.tracker.update(event["cluster_name"], event["state"]))
+
     def initialize(self):
         super().initialize()
 
@@ -201,6 +211,7 @@ class Rosa(Platform):
 
     def platform_cleanup(self):
         super().platform_cleanup()
+        self.fleet.stop()
 
     def create_cluster(self, platform, cluster_name):
         super().create_cluster(platform, cluster_name)
@@ -208,20 +219,79 @@ class Rosa(Platform):
     def delete_cluster(self, platform, cluster_name):
         super().delete_cluster(platform, cluster_name)
 
+    def resume_cluster(self, platform, cluster_name):
+        cluster_info = platform.environment["clusters"][cluster_name]
+        cluster_info["path"] = cluster_info.get("path", platform.environment["path"] + "/" + cluster_name)
+        self.utils.create_path(cluster_info["path"])
+        self.fleet.start()
+        self.fleet.refresh(max_age=self.fleet.interval)
+        if self.fleet.get(cluster_name) is None:
+            self.logging.error(f"Cluster {cluster_name} not found on the fleet, it will not be resumed")
+            cluster_info["status"] = "Not Installed"
+            return 1
+        start_time = int(datetime.datetime.utcnow().timestamp())
+        self.logging.info(f"Waiting for cluster {cluster_name} to finish its installation until {datetime.datetime.fromtimestamp(start_time + self.install_timeout)}")
+        state = self.fleet.states.get(cluster_name)
+        while not self.utils.force_terminate and state not in ("ready", "error"):
+            if datetime.datetime.utcnow().timestamp() > start_time + self.install_timeout:
+                self.logging.error(f"Cluster {cluster_name} on {state} status after {self.install_timeout // 60} minutes, it will not be resumed")
+                break
+            state = self.fleet.wait_for_state(cluster_name, ("ready", "error"), timeout=self.environment["watcher_delay"])
+            if state is None:
+                self.logging.error(f"Cluster {cluster_name} no longer listed on the fleet, it will not be resumed")
+                break
+        cluster_info["metadata"] = self.get_metadata(platform, cluster_name)
+        if state != "ready":
+            cluster_info["status"] = "not ready"
+            return 1
+        cluster_info["status"] = "installed"
+        cluster_info["cluster_end_time"] = int(datetime.datetime.utcnow().timestamp())
+        access_timers = self.get_cluster_admin_access(cluster_name, cluster_info["path"])
+        cluster_info["kubeconfig"] = access_timers.get("kubeconfig", None)
+        if not cluster_info["kubeconfig"]:
+            self.logging.error(f"Failed to download kubeconfig file for cluster {cluster_name}. Disabling workload execution")
+            cluster_info["status"] = "Ready. Not Access"
+            return 1
+        cluster_info["status"] = "ready"
+        self.logging.info(f"Cluster {cluster_name} resumed on status: {cluster_info['status']}")
+        return 0
+
     def get_workers_ready(self, kubeconfig, cluster_name):
         super().get_workers_ready(kubeconfig, cluster_name)
         return Platform.get_workers_ready(self, kubeconfig, cluster_name)
 
+    def _list_clusters(self):
+        list_code, list_out, list_err = self.utils.subprocess_exec("rosa list clusters -o json", extra_params={"universal_newlines": True}, log_output=False)
+        if list_code != 0:
+            self.logging.error("Failed to get clusters list")
+            self.logging.error(list_out)
+            self.logging.error(list_err)
+            return None
+        try:
+            rosa_list_clusters = json.loads(list_out)
+        except ValueError as err:
+            self.logging.error("Failed to get clusters list: %s" % err)
+            self.logging.error(list_out)
+            return None
+        clusters = {cluster["name"]: cluster for cluster in rosa_list_clusters if "name" in cluster and self.environment["cluster_name_seed"] in cluster["name"]}
+        # Same records as the OCM API, keep the OCM metadata cache warm while the poller runs
+        self.ocm_cache.prime(clusters.values())
+        return clusters
+
     def get_metadata(self, platform, cluster_name):
         super().get_metadata(platform, cluster_name)
         metadata = {}
         self.logging.info(f"Getting information for cluster {cluster_name}")
-        metadata_code, metadata_out, metadata_err = self.utils.subprocess_exec("rosa describe cluster -c " + cluster_name + " -o json", extra_params={"universal_newlines": True})
-        try:
-            result = json.loads(metadata_out)
-        except Exception as err:
-            self.logging.error(f"Cannot load metadata for cluster {cluster_name}")
-            self.logging.error(err)
+        result = self.fleet.get(cluster_name, max_age=self.fleet.interval)
+        if result is None:
+            self.logging.debug(f"Cluster {cluster_name} not found on the fleet snapshot, using `rosa describe cluster`")
+            metadata_code, metadata_out, metadata_err = self.utils.subprocess_exec("rosa describe cluster -c " + cluster_name + " -o json", extra_params={"universal_newlines": True})
+            try:
+                result = json.loads(metadata_out)
+            except Exception as err:
+                self.logging.error(f"Cannot load metadata for cluster {cluster_name}")
+                self.logging.error(err)
+                result = {}
         metadata["cluster_name"] = result.get("name", None)
         metadata["cluster_id"] = result.get("id", None)
         metadata["network_type"] = result.get("network", {}).get("type", None)
@@ -231,37 +301,38 @@ class Rosa(Platform):
         metadata["operator_role_prefix"] = result.get("aws", {}).get("sts", {}).get("operator_role_prefix", None)
         return metadata
 
+    @instrumentation.timed("wait")
     def _preflight_wait(self, cluster_id, cluster_name):
         return_data = {}
         start_time = int(datetime.datetime.utcnow().timestamp())
-        previous_status = ""
-        self.logging.info(f"Collecting preflight times for cluster {cluster_name} during 120 minutes until {datetime.datetime.fromtimestamp(start_time + 120 * 60)}")
-        # Waiting 2 hours for preflight checks to end
-        while datetime.datetime.utcnow().timestamp() < start_time + 120 * 60:
+        self.logging.info(f"Collecting preflight times for cluster {cluster_name} during {self.install_timeout // 60} minutes until {datetime.datetime.fromtimestamp(start_time + self.install_timeout)}")
+        self.fleet.start()
+        current_status = self.fleet.states.get(cluster_name)
+        # Waiting 2 hours for preflight checks to end, woken up by the fleet poller on every state transition
+        while datetime.datetime.utcnow().timestamp() < start_time + self.install_timeout:
             if self.utils.force_terminate:
                 self.logging.error(f"Exiting preflight times capturing on {cluster_name} cluster after capturing Ctrl-C")
                 return 0
-            self.logging.info(f"Getting status for cluster {cluster_name}")
-            status_code, status_out, status_err = self.utils.subprocess_exec("rosa describe cluster -c " + cluster_id + " -o json", extra_params={"universal_newlines": True})
-            current_time = int(datetime.datetime.utcnow().timestamp())
-            try:
-                current_status = json.loads(status_out)["state"]
-            except Exception as err:
-                self.logging.error(f"Cannot load metadata for cluster {cluster_name}")
-                self.logging.error(err)
-                continue
-            if current_status != previous_status and previous_status != "":
-                return_data[previous_status] = current_time - start_time
-                start_time = current_time
-                self.logging.info(f"Cluster {cluster_name} moved from {previous_status} status to {current_status} status after {return_data[previous_status]} seconds")
-                if current_status == "installing" or current_status == "ready":
-                    self.logging.info(f"Cluster {cluster_name} is on {current_status} status. Exiting preflights waiting...")
-                    return return_data
-            else:
-                self.logging.debug(f"Cluster {cluster_name} on {current_status} status. Waiting 2 seconds until {datetime.datetime.fromtimestamp(start_time + 120 * 60)} for next check")
-                time.sleep(1)
-            previous_status = current_status
-        self.logging.error(f"Cluster {cluster_name} on {current_status} status (not installing) after 120 minutes. Exiting preflight waiting...")
+            current_status = self.fleet.wait_for_state(cluster_name, ("installing", "ready", "error"), timeout=self.fleet.interval)
+            if current_status in ("installing", "ready", "error"):
+                break
+            self.logging.debug(f"Cluster {cluster_name} on {current_status} status. Waiting until {datetime.datetime.fromtimestamp(start_time + self.install_timeout)} for the next transition")
+        previous_status = None
+        previous_time = start_time
+        for status, timestamp in self.fleet.get_history(cluster_name):
+            if timestamp > start_time and previous_status is not None:
+                return_data[previous_status] = timestamp - previous_time
+                self.logging.info(f"Cluster {cluster_name} moved from {previous_status} status to {status} status after {return_data[previous_status]} seconds")
+                previous_time = timestamp
+            previous_status = status
+            if status in ("installing", "ready", "error"):
+                break
+        if current_status in ("installing", "ready"):
+            self.logging.info(f"Cluster {cluster_name} is on {current_status} status. Exiting preflights waiting...")
+        elif current_status == "error":
+            self.logging.error(f"Cluster {cluster_name} moved to error status. Exiting preflight waiting...")
+        else:
+            self.logging.error(f"Cluster {cluster_name} on {current_status} status (not installing) after {self.install_timeout // 60} minutes. Exiting preflight waiting...")
         return return_data
 
     def get_cluster_admin_access(self, cluster_name, path):
@@ -272,7 +343,8 @@ class Rosa(Platform):
         rosa_create_admin_cmd = ["rosa", "create", "admin", "-c", cluster_name, "-o", "json", "--debug"]
         self.logging.debug(rosa_create_admin_cmd)
         # Waiting 30 minutes for cluster-admin user to be created
-        while (datetime.datetime.utcnow().timestamp() < cluster_admin_create_time + 30 * 60):
+        poll = polling.PollingPolicy("rosa_cluster_admin_create", initial=5, maximum=30, timeout=30 * 60, measured=True)
+        while not poll.expired():
             if self.utils.force_terminate:
                 self.logging.error(f"Exiting cluster access process for {cluster_name} cluster after capturing Ctrl-C")
                 return return_data
@@ -283,15 +355,18 @@ class Rosa(Platform):
                 self.logging.warning(f"Failed to create cluster-admin user on {cluster_name} with this stdout/stderr:")
                 self.logging.warning(stdout)
                 self.logging.warning(stderr)
-                self.logging.warning(f"Waiting 5 seconds for the next try on {cluster_name} until {datetime.datetime.fromtimestamp(cluster_admin_create_time + 30 * 60)}")
-                time.sleep(5)
+                check_interval = poll.next_interval()
+                self.logging.warning(f"Waiting {int(check_interval)} seconds for the next try on {cluster_name} until {datetime.datetime.fromtimestamp(cluster_admin_create_time + 30 * 60)}")
+                poll.sleep(check_interval)
             else:
+                poll.done()
                 oc_login_time = int(datetime.datetime.utcnow().timestamp())
                 self.logging.info(f"cluster-admin user creation succesfull on cluster {cluster_name}")
                 return_data["cluster_admin_create"] = (int(datetime.datetime.utcnow().timestamp()) - cluster_admin_create_time)
                 self.logging.info(f"Trying to login on cluster {cluster_name} (30 minutes timeout until {datetime.datetime.fromtimestamp(oc_login_time + 30 * 60)}, 5s timeout on oc command)")
                 start_json = stdout.find("{")
-                while datetime.datetime.utcnow().timestamp() < oc_login_time + 30 * 60:
+                login_poll = polling.PollingPolicy("rosa_cluster_admin_login", initial=5, maximum=30, timeout=30 * 60, measured=True)
+                while not login_poll.expired():
                     if self.utils.force_terminate:
                         self.logging.error(f"Exiting cluster access process for {cluster_name} cluster after capturing Ctrl-C")
                         return return_data
@@ -300,9 +375,11 @@ class Rosa(Platform):
                         extra_params={"cwd": path, "universal_newlines": True},
                         log_output=False)
                     if oc_login_code != 0:
-                        self.logging.debug(f"Waiting 5 seconds until {datetime.datetime.fromtimestamp(oc_login_time + 30 * 60)} for the next try on {cluster_name}")
-                        time.sleep(5)
+                        check_interval = login_poll.next_interval()
+                        self.logging.debug(f"Waiting {int(check_interval)} seconds until {datetime.datetime.fromtimestamp(oc_login_time + 30 * 60)} for the next try on {cluster_name}")
+                        login_poll.sleep(check_interval)
                     else:
+                        login_poll.done()
                         oc_adm_time_start = int(datetime.datetime.utcnow().timestamp())
                         self.logging.info("Login succesfull on cluster %s" % cluster_name)
                         return_data["cluster_admin_login"] = (int(datetime.datetime.utcnow().timestamp()) - oc_login_time)
@@ -310,7 +387,8 @@ class Rosa(Platform):
                         myenv = os.environ.copy()
                         myenv["KUBECONFIG"] = return_data["kubeconfig"]
                         self.logging.info("Trying to perform oc adm command on cluster %s until %s" % (cluster_name, datetime.datetime.fromtimestamp(oc_adm_time_start + 30 * 60)))
-                        while (datetime.datetime.utcnow().timestamp() < oc_adm_time_start + 30 * 60):
+                        oc_adm_poll = polling.PollingPolicy("rosa_cluster_oc_adm", initial=5, maximum=30, timeout=30 * 60, measured=True)
+                        while not oc_adm_poll.expired():
                             if self.utils.force_terminate:
                                 self.logging.error(f"Exiting cluster access process for {cluster_name} cluster after capturing Ctrl-C")
                                 return return_data
@@ -326,11 +404,12 @@ class Rosa(Platform):
                             )
                             if oc_adm_code != 0:
                                 self.logging.debug(
-                                    "Waiting 5 seconds for the next try on %s"
+                                    "Waiting for the next try on %s"
                                     % cluster_name
                                 )
-                                time.sleep(5)
+                                oc_adm_poll.sleep()
                             else:
+                                oc_adm_poll.done()
                                 self.logging.info(
                                     "Verified admin access to %s, using %s kubeconfig file."
                                     % (cluster_name, path + "/kubeconfig")
@@ -401,100 +480,9 @@ class Rosa(Platform):
 
     def watcher(self):
         super().watcher()
-        self.logging.info(f"Watcher started on {self.environment['platform']}")
-        self.logging.info(f"Getting status every {self.environment['watcher_delay']}")
-        self.logging.info(f"Expected Clusters: {self.environment['cluster_count']}")
-        self.logging.info(f"Manually terminate watcher creating the file {self.environment['path']}/terminate_watcher")
-        file_path = os.path.join(self.environment["path"], "terminate_watcher")
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        while not self.utils.force_terminate:
-            self.logging.debug(self.environment['clusters'])
-            if os.path.isfile(
-                os.path.join(self.environment["path"], "terminate_watcher")
-            ):
-                self.logging.warning("Watcher has been manually set to terminate")
-                break
-
-            (
-                cluster_list_code,
-                cluster_list_out,
-                cluster_list_err,
-            ) = self.utils.subprocess_exec(
-                "rosa list clusters -o json", extra_params={"universal_newlines": True}
-            )
-            current_cluster_count = 0
-            installed_clusters = 0
-            clusters_with_all_workers = 0
-            state = {}
-            error = []
-            try:
-                rosa_list_clusters = json.loads(cluster_list_out)
-            except ValueError as err:
-                self.logging.error("Failed to get clusters list: %s" % err)
-                self.logging.error(cluster_list_out)
-                self.logging.error(cluster_list_err)
-                rosa_list_clusters = {}
-            for cluster in rosa_list_clusters:
-                if (
-                    "name" in cluster
-                    and self.environment["cluster_name_seed"] in cluster["name"]
-                ):
-                    current_cluster_count += 1
-                    state_key = cluster["state"] if "state" in cluster else ""
-                    if state_key == "error":
-                        error.append(cluster["name"])
-                    elif state_key == "ready":
-                        state[state_key] = state.get(state_key, 0) + 1
-                        installed_clusters += 1
-                        required_workers = cluster["nodes"]["compute"]
-                        ready_workers = self.get_workers_ready(self.environment["path"]
-                                                               + "/"
-                                                               + cluster["name"]
-                                                               + "/kubeconfig",
-                                                               cluster["name"],
-                                                               )
-                        if ready_workers == required_workers:
-                            clusters_with_all_workers += 1
-                    elif state_key != "":
-                        state[state_key] = state.get(state_key, 0) + 1
-            self.logging.info(
-                "Requested Clusters for test %s: %d of %d"
-                % (
-                    self.environment["uuid"],
-                    current_cluster_count,
-                    self.environment["cluster_count"],
-                )
-            )
-            state_output = ""
-            for i in state.items():
-                state_output += "(" + str(i[0]) + ": " + str(i[1]) + ") "
-                self.logging.info(state_output)
-            if error:
-                self.logging.warning("Clusters in error state: %s" % error)
-            if installed_clusters == self.environment["cluster_count"]:
-                # All clusters ready
-                if self.environment["wait_for_workers"]:
-                    if clusters_with_all_workers == self.environment["cluster_count"]:
-                        self.logging.info(
-                            "All clusters on ready status and all clusters with all workers ready. Exiting watcher"
-                        )
-                        break
-                    else:
-                        self.logging.info(
-                            f"Waiting {self.environment['watcher_delay']} seconds for next watcher run"
-                        )
-                        time.sleep(self.environment["watcher_delay"])
-                else:
-                    self.logging.info("All clusters on ready status. Exiting watcher")
-                    break
-            else:
-                self.logging.info(
-                    f"Waiting {self.environment['watcher_delay']} seconds for next watcher run"
-                )
-                time.sleep(self.environment["watcher_delay"])
-        self.logging.debug(self.environment['clusters'])
-        self.logging.info("Watcher terminated")
+        self.logging.info(f"Following cluster status changes from the fleet poller, listing clusters every {self.fleet.interval} seconds")
+        self.fleet.start()
+        self.watch_clusters()
 
 
 class RosaArguments(PlatformArguments):
@@ -513,6 +501,7 @@ class RosaArguments(PlatformArguments):
         parser.add_argument("--extra-machinepool-replicas", action=EnvDefault, env=environment, envvar="HCP_BURNER_MACHINE_POOL_REPLICAS", help="Number of replicas of the extra machinepool", type=int, default=3)
         parser.add_argument("--extra-machinepool-labels", action=EnvDefault, env=environment, envvar="HCP_BURNER_MACHINEPOOL_LABELS", type=str, help="Labels to add on the extra machinepool", default=None)
         parser.add_argument("--extra-machinepool-taints", action=EnvDefault, env=environment, envvar="HCP_BURNER_MACHINEPOOL_TAINTS", type=str, help="Taints to add on the extra machinepool", default=None)
+        parser.add_argument("--fleet-poll-interval", action=EnvDefault, env=environment, envvar="HCP_BURNER_FLEET_POLL_INTERVAL", type=int, default=1, help="Seconds between each `rosa list clusters` call used to follow the state of all the clusters. It is also the resolution of the preflight timings")
 
         if config_file:
             config = configparser.ConfigParser()
@@ -9,6 +9,8 @@ import datetime
 import shutil
 import configparser
 
+from libs import instrumentation
+from libs.informers import worker_selector
 from libs.platforms.rosa.rosa import Rosa
 from libs.platforms.rosa.rosa import RosaArguments
 
@@ -22,6 +24,9 @@ class Terraform(Rosa):
         self.logging.info("Parameter --workers will be ignored on terraform subplatform. OCM Terraform module is fixed to 2 workers")
         self.environment["workers"] = "2"
 
+        self.environment["terraform_workspaces"] = arguments["terraform_workspaces"]
+        self.environment["terraform_plugin_cache"] = arguments["terraform_plugin_cache"]
+
         # if self.environment['cluster_count'] % arguments['clusters_per_apply'] == 0:
         #     self.logging.debug(str(self.environment['cluster_count'] % arguments['clusters_per_apply']))
         #     self.logging.info(str(arguments['clusters_per_apply']) + " clusters will be installed on each Terraform Apply")
@@ -37,8 +42,15 @@ class Terraform(Rosa):
 
         shutil.copytree(sys.path[0] + "/libs/platforms/rosa/terraform/files", self.environment['path'] + "/terraform")
 
-        self.logging.info("Initializing Terraform with: terraform init")
-        terraform_code, terraform_out, terraform_err = self.utils.subprocess_exec("terraform init", self.environment["path"] + "/terraform/terraform-init.log", {"cwd": self.environment["path"] + "/terraform"})
+        # Providers are downloaded once to the plugin cache and linked from there by every init
+        if not self.environment["terraform_plugin_cache"]:
+            self.environment["terraform_plugin_cache"] = self.environment["path"] + "/terraform-plugin-cache"
+        os.makedirs(self.environment["terraform_plugin_cache"], exist_ok=True)
+        myenv = os.environ.copy()
+        myenv["TF_PLUGIN_CACHE_DIR"] = self.environment["terraform_plugin_cache"]
+
+        self.logging.info(f"Initializing Terraform with: terraform init, using {self.environment['terraform_plugin_cache']} as plugin cache")
+        terraform_code, terraform_out, terraform_err = self.utils.subprocess_exec("terraform init -input=false", self.environment["path"] + "/terraform/terraform-init.log", {"cwd": self.environment["path"] + "/terraform", "env": myenv})
         if terraform_code != 0:
             self.logging.error(f"Failed to initialize terraform. Check {self.environment['path']}/terraform/init.log for more information")
             sys.exit("Exiting...")
@@ -46,9 +58,7 @@ class Terraform(Rosa):
     def platform_cleanup(self):
         super().platform_cleanup()
 
-    def delete_cluster(self, platform, cluster_name):
-        super().delete_cluster(platform, cluster_name)
-
+    def _terraform_env(self, cluster_name):
         myenv = os.environ.copy()
         myenv["TF_VAR_token"] = self.environment["ocm_token"]
         myenv["TF_VAR_cloud_region"] = self.environment['aws']['region']
@@ -57,6 +67,37 @@ class Terraform(Rosa):
         myenv["TF_VAR_cluster_name"] = cluster_name
         myenv["TF_VAR_operator_role_prefix"] = cluster_name
 #        myenv["TF_VAR_clusters_per_apply"] = str(self.environment['clusters_per_apply'])
+        myenv["TF_PLUGIN_CACHE_DIR"] = self.environment["terraform_plugin_cache"]
+        myenv["TF_IN_AUTOMATION"] = "1"
+        return myenv
+
+    def _terraform_workspace(self, cluster_path):
+        """
+        Working directory of the terraform commands of a cluster.
+
+        Without --terraform-workspaces every cluster runs on the directory initialized by initialize(). With it, every
+        cluster gets its own directory of symlinks to the terraform files and to the providers and modules of that
+        directory, so the clusters do not share their .terraform directory and none of them has to run terraform init
+        """
+        template = self.environment["path"] + "/terraform"
+        if not self.environment["terraform_workspaces"]:
+            return template
+        workspace = cluster_path + "/terraform"
+        os.makedirs(workspace + "/.terraform", exist_ok=True)
+        for directory in ("", "/.terraform"):
+            for entry in os.listdir(template + directory):
+                if entry in (".terraform", "terraform.tfstate") or entry.endswith(".log") or os.path.lexists(workspace + directory + "/" + entry):
+                    continue
+                if entry == ".terraform.lock.hcl":
+                    shutil.copy(template + directory + "/" + entry, workspace + directory + "/" + entry)
+                else:
+                    os.symlink(template + directory + "/" + entry, workspace + directory + "/" + entry)
+        return workspace
+
+    def delete_cluster(self, platform, cluster_name):
+        super().delete_cluster(platform, cluster_name)
+
+        myenv = self._terraform_env(cluster_name)
 
         cluster_info = platform.environment["clusters"][cluster_name]
         cluster_start_time = int(datetime.datetime.utcnow().timestamp())
@@ -64,7 +105,7 @@ class Terraform(Rosa):
         cluster_info["timestamp"] = datetime.datetime.utcnow().isoformat()
         cluster_info["install_method"] = "terraform"
         self.logging.info(f"Deleting cluster {cluster_name} on Rosa Platform using terraform")
-        cleanup_code, cleanup_out, cleanup_err = self.utils.subprocess_exec("terraform apply -destroy -state=" + cluster_info['path'] + "/terraform.tfstate --auto-approve", cluster_info["path"] + "/cleanup.log", {"cwd": self.environment['path'] + "/terraform", 'preexec_fn': self.utils.disable_signals, "env": myenv})
+        cleanup_code, cleanup_out, cleanup_err = self.utils.subprocess_exec("terraform apply -destroy -input=false -state=" + cluster_info['path'] + "/terraform.tfstate --auto-approve", cluster_info["path"] + "/cleanup.log", {"cwd": self._terraform_workspace(cluster_info["path"]), 'preexec_fn': self.utils.disable_signals, "env": myenv})
         cluster_delete_end_time = int(datetime.datetime.utcnow().timestamp())
         if cleanup_code == 0:
             self.logging.debug(
@@ -93,28 +134,8 @@ class Terraform(Rosa):
 
     def get_workers_ready(self, kubeconfig, cluster_name):
         super().get_workers_ready(kubeconfig, cluster_name)
-        myenv = os.environ.copy()
-        myenv["KUBECONFIG"] = kubeconfig
         self.logging.info(f"Getting node information for Terraform installed cluster {cluster_name}")
-        nodes_code, nodes_out, nodes_err = self.utils.subprocess_exec("oc get nodes -o json", extra_params={"env": myenv, "universal_newlines": True}, log_output=False)
-        try:
-            nodes_json = json.loads(nodes_out)
-        except Exception as err:
-            self.logging.debug(f"Cannot load command result for cluster {cluster_name}")
-            self.logging.debug(err)
-            return 0
-        nodes = nodes_json["items"] if "items" in nodes_json else []
-        status = []
-        for node in nodes:
-            labels = node.get("metadata", {}).get("labels", {})
-            if "node-role.kubernetes.io/worker" in labels and "node-role.kubernetes.io/control-plane" not in labels and "node-role.kubernetes.io/infra" not in labels:
-                conditions = node.get("status", {}).get("conditions", [])
-                for condition in conditions:
-                    if "type" in condition and condition["type"] == "Ready":
-                        status.append(condition["status"])
-        status_list = {i: status.count(i) for i in status}
-        ready_nodes = status_list["True"] if "True" in status_list else 0
-        return ready_nodes
+        return self.nodes.get(kubeconfig).ready_nodes(worker_selector)
 
     def create_cluster(self, platform, cluster_name):
         super().create_cluster(platform, cluster_name)
@@ -128,49 +149,36 @@ class Terraform(Rosa):
         self.logging.debug("Attempting cluster installation")
         self.logging.debug("Output directory set to %s" % cluster_info["path"])
 
-        myenv = os.environ.copy()
-        myenv["TF_VAR_token"] = self.environment["ocm_token"]
-        myenv["TF_VAR_cloud_region"] = self.environment['aws']['region']
-        myenv["TF_VAR_url"] = self.environment["ocm_url"]
-        myenv["TF_VAR_account_role_prefix"] = 'ManagedOpenShift'
-        myenv["TF_VAR_cluster_name"] = cluster_name
-        myenv["TF_VAR_operator_role_prefix"] = cluster_name
-#        myenv["TF_VAR_clusters_per_apply"] = str(self.environment['clusters_per_apply'])
-
-        terraform_plan_code, terraform_plan_out, terraform_plan_err = self.utils.subprocess_exec("terraform plan -out " + cluster_info['path'] + "/" + cluster_name + ".tfplan", cluster_info["path"] + "/terraform_plan.log", {"cwd": self.environment['path'] + "/terraform", "env": myenv})
-        if terraform_plan_code != 0:
-            cluster_end_time = int(datetime.datetime.utcnow().timestamp())
-            cluster_info["status"] = "Not Installed"
-            self.logging.error(f"Cluster {cluster_name} terraform plan failed")
-            self.logging.debug(terraform_plan_out)
-            return 1
-        else:
-            self.logging.info(f"Trying to install cluster {cluster_name} with {cluster_info['workers']} workers up to 5 times using terraform provider")
-            trying = 0
-            while trying <= 5:
-                cluster_start_time = int(datetime.datetime.utcnow().timestamp())
-                if self.utils.force_terminate:
-                    self.logging.error(f"Exiting cluster creation for {cluster_name} after capturing Ctrl-C")
-                    return 0
-                trying += 1
-                terraform_apply_code, terraform_apply_out, terraform_apply_err = self.utils.subprocess_exec("terraform apply -state=" + cluster_info['path'] + "/terraform.tfstate " + cluster_info['path'] + "/" + cluster_name + ".tfplan", cluster_info["path"] + "/terraform_apply.log", {"cwd": self.environment['path'] + "/terraform", 'preexec_fn': self.utils.disable_signals, "env": myenv})
-                if terraform_apply_code != 0:
-                    cluster_info["install_try"] = trying
-                    self.logging.debug(terraform_apply_out)
-                    self.logging.debug(terraform_apply_err)
-                    if trying <= 5:
-                        self.logging.warning(f"Try: {trying}/5. Cluster {cluster_name} installation failed, retrying in 15 seconds")
-                        time.sleep(15)
-                    else:
-                        cluster_end_time = int(datetime.datetime.utcnow().timestamp())
-                        cluster_info["status"] = "Not Installed"
-                        self.logging.error(f"Cluster {cluster_name} installation failed after 5 retries")
-                        self.logging.debug(terraform_apply_out)
-                        self.logging.debug(terraform_apply_err)
-                        return 1
+        myenv = self._terraform_env(cluster_name)
+        workspace = self._terraform_workspace(cluster_info["path"])
+
+        # A single apply instead of plan and apply: a saved plan cannot be applied again after a failed apply anyway
+        self.logging.info(f"Trying to install cluster {cluster_name} with {cluster_info['workers']} workers up to 5 times using terraform provider")
+        trying = 0
+        while trying <= 5:
+            cluster_start_time = int(datetime.datetime.utcnow().timestamp())
+            if self.utils.force_terminate:
+                self.logging.error(f"Exiting cluster creation for {cluster_name} after capturing Ctrl-C")
+                return 0
+            trying += 1
+            terraform_apply_code, terraform_apply_out, terraform_apply_err = self.utils.subprocess_exec("terraform apply -input=false -auto-approve -state=" + cluster_info['path'] + "/terraform.tfstate", cluster_info["path"] + "/terraform_apply.log", {"cwd": workspace, 'preexec_fn': self.utils.disable_signals, "env": myenv})
+            if terraform_apply_code != 0:
+                cluster_info["install_try"] = trying
+                self.logging.debug(terraform_apply_out)
+                self.logging.debug(terraform_apply_err)
+                if trying <= 5:
+                    self.logging.warning(f"Try: {trying}/5. Cluster {cluster_name} installation failed, retrying in 15 seconds")
+                    time.sleep(15)
                 else:
                     cluster_end_time = int(datetime.datetime.utcnow().timestamp())
-                    break
+                    cluster_info["status"] = "Not Installed"
+                    self.logging.error(f"Cluster {cluster_name} installation failed after 5 retries")
+                    self.logging.debug(terraform_apply_out)
+                    self.logging.debug(terraform_apply_err)
+                    return 1
+            else:
+                cluster_end_time = int(datetime.datetime.utcnow().timestamp())
+                break
 
         cluster_info['status'] = "installed"
         self.logging.info(f"Cluster {cluster_name} installation finished on the {trying} try")
@@ -205,50 +213,21 @@ class Terraform(Rosa):
         if self.es is not None:
             self.es.index_metadata(cluster_info)
 
+    @instrumentation.timed("wait")
     def _wait_for_workers(self, kubeconfig, worker_nodes, wait_time, cluster_name, machinepool_name):
         self.logging.info(f"Waiting {wait_time} minutes for {worker_nodes} workers to be ready on {machinepool_name} machinepool on {cluster_name}")
-        myenv = os.environ.copy()
-        myenv["KUBECONFIG"] = kubeconfig
         result = [machinepool_name]
         starting_time = datetime.datetime.utcnow().timestamp()
         self.logging.debug(f"Waiting {wait_time} minutes for nodes to be Ready on cluster {cluster_name} until {datetime.datetime.fromtimestamp(starting_time + wait_time * 60)}")
-        while datetime.datetime.utcnow().timestamp() < starting_time + wait_time * 60:
-            # if force_terminate:
-            #     logging.error("Exiting workers waiting on the cluster %s after capturing Ctrl-C" % cluster_name)
-            #     return []
-            self.logging.info("Getting node information for cluster %s" % cluster_name)
-            nodes_code, nodes_out, nodes_err = self.utils.subprocess_exec("oc get nodes -o json", extra_params={"env": myenv, "universal_newlines": True})
-            try:
-                nodes_json = json.loads(nodes_out)
-            except Exception as err:
-                self.logging.error(
-                    f"Cannot load command result for cluster {cluster_name}. Waiting 15 seconds for next check..."
-                )
-                self.logging.error(err)
-                time.sleep(15)
-                continue
-            nodes = nodes_json["items"] if "items" in nodes_json else []
-
-            ready_nodes = 0
-            for node in nodes:
-                labels = node.get("metadata", {}).get("labels", {})
-                if "node-role.kubernetes.io/worker" in labels and "node-role.kubernetes.io/control-plane" not in labels and "node-role.kubernetes.io/infra" not in labels:
-                    conditions = node.get("status", {}).get("conditions", [])
-                    for condition in conditions:
-                        if "type" in condition and condition["type"] == "Ready":
-                            ready_nodes += 1
-            if ready_nodes == worker_nodes:
-                self.logging.info(
-                    f"Found {ready_nodes}/{worker_nodes} ready nodes on machinepool {machinepool_name} for cluster {cluster_name}. Stopping wait."
-                )
-                result.append(ready_nodes)
-                result.append(int(datetime.datetime.utcnow().timestamp()))
-                return result
-            else:
-                self.logging.info(
-                    f"Found {ready_nodes}/{worker_nodes} ready nodes on machinepool {machinepool_name} for cluster {cluster_name}. Waiting 15 seconds for next check..."
-                )
-                time.sleep(15)
+        # The node informer wakes us up on every node change, no need to poll `oc get nodes`
+        ready_nodes, reached = self.nodes.get(kubeconfig).wait_for_ready_nodes(worker_selector, worker_nodes, wait_time * 60)
+        if reached:
+            self.logging.info(
+                f"Found {ready_nodes}/{worker_nodes} ready nodes on machinepool {machinepool_name} for cluster {cluster_name}. Stopping wait."
+            )
+            result.append(ready_nodes)
+            result.append(int(datetime.datetime.utcnow().timestamp()))
+            return result
         self.logging.error(
             f"Waiting time expired. After {wait_time} minutes there are {ready_nodes}/{worker_nodes} ready nodes on {machinepool_name} machinepool for cluster {cluster_name}"
         )
@@ -263,6 +242,8 @@ class TerraformArguments(RosaArguments):
 #        EnvDefault = self.EnvDefault
 
         parser.add_argument("--terraform-retry", type=int, default=5, help="Number of retries when executing terraform commands")
+        parser.add_argument("--terraform-workspaces", action="store_true", help="Run the terraform commands of every cluster on its own directory linked to the providers initialized once")
+        parser.add_argument("--terraform-plugin-cache", type=str, default="", help="Terraform plugin cache directory shared by the executions. Default: terraform-plugin-cache on the working directory")
 #        parser.add_argument("--clusters-per-apply", type=int, default=1, help="Number of clusters to install on each terraform apply")
 #        parser.add_argument("--service-cluster", action=EnvDefault, env=environment, envvar="HCP_BURNER_HYPERSHIFT_SERVICE_CLUSTER", help="Service Cluster Used to create the Hosted Clusters")
 
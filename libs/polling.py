@@ -0,0 +1,154 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Module to decide how long the wait loops sleep between two checks, instead of a fixed interval per loop.
+Durations of the finished waits are kept per wait name, so the following waits of the same execution, and of the next
+executions when a history file is configured, poll slowly while the operation is not expected to end and fast around
+its usual duration
+"""
+import os
+import json
+import time
+import random
+import threading
+from libs import instrumentation
+
+HISTORY_SIZE = 100
+
+_history = None
+
+
+class PollingHistory:
+    """Last HISTORY_SIZE durations of the successful waits, keyed by wait name. Stored as JSON on file_path when it is set"""
+
+    def __init__(self, logging, file_path=None):
+        self.logging = logging
+        self.file_path = file_path
+        self.durations = {}
+        self._lock = threading.Lock()
+        if file_path and os.path.exists(file_path):
+            try:
+                with open(file_path, "r") as history_file:
+                    self.durations = json.load(history_file)
+                self.logging.info(f"Loaded polling history of {len(self.durations)} waits from {file_path}")
+            except (OSError, ValueError) as err:
+                self.logging.warning(f"Ignoring polling history {file_path}: {err}")
+
+    def record(self, name, seconds):
+        with self._lock:
+            durations = self.durations.setdefault(name, [])
+            durations.append(round(seconds, 1))
+            del durations[:-HISTORY_SIZE]
+
+    def percentiles(self, name):
+        """Return (p50, p90) of the durations of the wait, or None with less than 3 durations"""
+        with self._lock:
+            durations = sorted(self.durations.get(name, []))
+        if len(durations) < 3:
+            return None
+        return durations[len(durations) // 2], durations[min(len(durations) - 1, int(len(durations) * 0.9))]
+
+    def save(self):
+        if not self.file_path:
+            return
+        with self._lock:
+            durations = dict(self.durations)
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(self.file_path)), exist_ok=True)
+            temporary_path = self.file_path + ".tmp"
+            with open(temporary_path, "w") as history_file:
+                json.dump(durations, history_file, indent=2)
+            os.replace(temporary_path, self.file_path)
+            self.logging.info(f"Polling history written on {self.file_path}")
+        except OSError as err:
+            self.logging.warning(f"Failed to write polling history on {self.file_path}: {err}")
+
+
+def load(logging, file_path=None):
+    global _history
+    _history = PollingHistory(logging, file_path)
+    return _history
+
+
+def save():
+    if _history is not None:
+        _history.save()
+
+
+def jitter(seconds, fraction=0.1):
+    """Spread seconds randomly by +/- fraction, so the threads started together do not poll together"""
+    return max(0, seconds * random.uniform(1 - fraction, 1 + fraction))
+
+
+def backoff(attempt, initial=1, maximum=60, fraction=0.1):
+    """Jittered exponential backoff, seconds to wait before the retry number attempt (starting at 1)"""
+    return jitter(min(maximum, initial * 2 ** (attempt - 1)), fraction)
+
+
+class PollingPolicy:
+    """
+    Intervals of a wait loop.
+
+    Without history, the interval starts at initial and grows exponentially up to maximum. With the p50/p90 of the
+    previous waits of the same name, it sleeps up to maximum until 80% of the p50, polls every initial seconds until
+    the p90, and then grows exponentially again. Throttled checks double the interval. Intervals never go beyond the deadline.
+
+    name: key of the wait on the history, like `aro_console_url`
+    timeout: seconds after which the wait is expired
+    measured: the end of the wait is reported as a duration, so it is never detected later than initial seconds after
+    it happens. Only the time before 80% of the p50 is slept with longer intervals
+    """
+
+    def __init__(self, name, initial=5, maximum=60, timeout=3600, factor=2, fraction=0.1, measured=False):
+        self.name = name
+        self.initial = initial
+        self.maximum = maximum
+        self.timeout = timeout
+        self.factor = factor
+        self.fraction = fraction
+        self.measured = measured
+        self.checks = 0
+        self.start_time = time.monotonic()
+        self.expected = _history.percentiles(name) if _history is not None else None
+        self._interval = initial
+
+    def elapsed(self):
+        return time.monotonic() - self.start_time
+
+    def remaining(self):
+        return max(0, self.timeout - self.elapsed())
+
+    def expired(self):
+        return self.elapsed() >= self.timeout
+
+    def next_interval(self, throttled=False):
+        """Seconds to sleep before the next check"""
+        elapsed = self.elapsed()
+        if throttled:
+            self._interval = min(self.maximum, self._interval * self.factor)
+            interval = self._interval
+        elif self.expected is not None and elapsed < self.expected[0] * 0.8:
+            interval = min(self.maximum, max(self.initial, self.expected[0] * 0.8 - elapsed))
+        elif self.expected is not None and elapsed < self.expected[1]:
+            self._interval = self.initial
+            interval = self.initial
+        elif self.measured:
+            interval = self.initial
+        else:
+            interval = self._interval
+            self._interval = min(self.maximum, self._interval * self.factor)
+        return min(self.remaining(), jitter(interval, self.fraction))
+
+    def sleep(self, seconds=None, throttled=False):
+        """Sleep seconds, or the next interval when not given. Return False when the wait expired"""
+        self.checks += 1
+        instrumentation.increment("polls", self.name)
+        if self.expired():
+            return False
+        time.sleep(self.next_interval(throttled) if seconds is None else min(seconds, self.remaining()))
+        return not self.expired()
+
+    def done(self):
+        """Record the duration of a successful wait on the history"""
+        if _history is not None:
+            _history.record(self.name, self.elapsed())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Module with the building blocks used by the schedulers: a token bucket rate limiter and a bounded worker pool
+"""
+import itertools
+import queue
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Token bucket rate limiter.
+
+    rate: tokens added per minute
+    burst: maximum number of tokens stored in the bucket
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self.tokens = float(self.burst)
+        self.last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate / 60)
+        self.last = now
+
+    def acquire(self, cancelled=None):
+        """Block until a token is available. Return False if cancelled() became True while waiting"""
+        while True:
+            with self._lock:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = (1 - self.tokens) * 60 / self.rate
+            if cancelled is not None and cancelled():
+                return False
+            time.sleep(min(wait, 1))
+
+
+class WorkerPool:
+    """
+    Pool of worker threads consuming a priority queue of requests. Requests with the same priority run in FIFO order.
+
+    concurrency: maximum number of requests running at the same time. If 0, every request gets its own worker
+    rate_limiter: optional TokenBucket to acquire before starting every request
+    gauge_callback: optional callable receiving (gauge_name, value) every time the queue depth or the in-flight requests change
+    """
+
+    def __init__(self, logging, name, concurrency=0, rate_limiter=None, gauge_callback=None):
+        self.logging = logging
+        self.name = name
+        self.concurrency = concurrency
+        self.rate_limiter = rate_limiter
+        self.gauge_callback = gauge_callback
+        self.threads = []
+        self.pending = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._queue = queue.PriorityQueue()
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def submit(self, function, args=(), priority=0):
+        """Queue a request. Lower priority values run first"""
+        if self._closed:
+            raise RuntimeError(f"Worker pool {self.name} is closed")
+        with self._lock:
+            self.pending += 1
+        self._queue.put((priority, next(self._sequence), function, args))
+        self._emit_gauges()
+        if self.concurrency == 0 or len(self.threads) < self.concurrency:
+            thread = threading.Thread(target=self._worker, name=f"{self.name}-worker-{len(self.threads)}")
+            self.threads.append(thread)
+            thread.start()
+
+    def close(self):
+        """No more requests will be submitted, workers exit once the queue is drained"""
+        self._closed = True
+        for thread in self.threads:
+            self._queue.put((float("inf"), next(self._sequence), None, None))
+
+    def _emit_gauges(self):
+        if self.gauge_callback is not None:
+            self.gauge_callback(f"{self.name}_queue_depth", self.pending)
+            self.gauge_callback(f"{self.name}_in_flight", self.in_flight)
+
+    def _worker(self):
+        while True:
+            priority, sequence, function, args = self._queue.get()
+            if function is None:
+                return
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            with self._lock:
+                self.pending -= 1
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self._emit_gauges()
+            self.logging.debug(f"Worker pool {self.name}: queue depth {self.pending}, in-flight {self.in_flight}")
+            try:
+                function(*args)
+            except Exception as err:
+                self.logging.error(f"Worker pool {self.name}: request failed")
+                self.logging.error(err)
+            finally:
+                with self._lock:
+                    self.in_flight -= 1
+                self._emit_gauges()
@@ -0,0 +1,131 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Module to refresh the OCM access token once for the whole driver instead of once per forked `ocm` or `rosa` command.
+The Azure CLI token cache is not handled, `az` commands refresh their own tokens
+"""
+import os
+import json
+import time
+import base64
+import threading
+import urllib.parse
+import urllib.request
+from libs import polling
+
+
+class OcmSession:
+    """
+    OCM access token owned by the driver.
+
+    The configuration written by `ocm login` and `rosa login` is copied to a snapshot on the working directory, and
+    OCM_CONFIG points every child process to it. A background thread refreshes the access token with the refresh token
+    refresh_margin seconds before it expires and replaces the snapshot atomically, so the children always read a valid
+    token and never refresh it, or lock the configuration file, on their own.
+
+    source_path: configuration written by the logins, $OCM_CONFIG or ~/.config/ocm/ocm.json by default
+    """
+
+    file_name = "ocm-session.json"
+
+    def __init__(self, logging, path, refresh_margin=300, source_path=None):
+        self.logging = logging
+        self.refresh_margin = refresh_margin
+        self.source_path = source_path or os.environ.get("OCM_CONFIG") or os.path.expanduser("~/.config/ocm/ocm.json")
+        self.snapshot_path = os.path.join(path, self.file_name)
+        self.previous_config = os.environ.get("OCM_CONFIG")
+        self.config = None
+        self.refreshes = 0
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def _expires_at(self, token):
+        """Expiration timestamp of a JWT, 0 when it cannot be decoded"""
+        try:
+            payload = token.split(".")[1]
+            payload += "=" * (-len(payload) % 4)
+            return int(json.loads(base64.urlsafe_b64decode(payload)).get("exp", 0))
+        except (IndexError, ValueError, AttributeError):
+            return 0
+
+    def expires_in(self):
+        return self._expires_at(self.config.get("access_token", "")) - time.time()
+
+    def refresh(self):
+        """Request a new access token to the token URL of the configuration using its refresh token"""
+        data = urllib.parse.urlencode({
+            "grant_type": "refresh_token",
+            "client_id": self.config.get("client_id") or "cloud-services",
+            "refresh_token": self.config["refresh_token"],
+        }).encode("utf-8")
+        request = urllib.request.Request(self.config["token_url"], data=data, headers={"Content-Type": "application/x-www-form-urlencoded"})
+        with urllib.request.urlopen(request, timeout=30) as response:
+            tokens = json.loads(response.read())
+        self.config["access_token"] = tokens["access_token"]
+        if tokens.get("refresh_token"):
+            self.config["refresh_token"] = tokens["refresh_token"]
+        self.refreshes += 1
+        self._write_snapshot()
+        self.logging.debug(f"OCM access token refreshed, expiring in {int(self.expires_in())} seconds")
+
+    def _write_snapshot(self, path=None):
+        path = path or self.snapshot_path
+        temporary_path = path + ".tmp"
+        with open(os.open(temporary_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "w") as snapshot_file:
+            json.dump(self.config, snapshot_file, indent=2)
+        os.replace(temporary_path, path)
+
+    def start(self):
+        """Take over the configuration of the logins and point OCM_CONFIG to the snapshot. Return False if it cannot be read"""
+        try:
+            with open(self.source_path, "r") as config_file:
+                self.config = json.load(config_file)
+        except (OSError, ValueError) as err:
+            self.logging.warning(f"Cannot read OCM configuration {self.source_path}, child processes will refresh their own tokens: {err}")
+            return False
+        if not self.config.get("refresh_token") or not self.config.get("token_url"):
+            self.logging.warning(f"OCM configuration {self.source_path} has no refresh token, child processes will refresh their own tokens")
+            return False
+        if self.expires_in() < self.refresh_margin:
+            self.refresh()
+        else:
+            self._write_snapshot()
+        os.environ["OCM_CONFIG"] = self.snapshot_path
+        self._thread = threading.Thread(target=self._run, name="ocm-session")
+        self._thread.daemon = True
+        self._thread.start()
+        self.logging.info(f"Sharing the OCM session of the driver through {self.snapshot_path}, access token refreshed {self.refresh_margin} seconds before it expires")
+        return True
+
+    def _run(self):
+        attempt = 0
+        while not self._stopped.wait(max(0, self.expires_in() - self.refresh_margin) if attempt == 0 else polling.backoff(attempt, initial=5, maximum=60)):
+            try:
+                self.refresh()
+                attempt = 0
+            except Exception as err:
+                attempt += 1
+                self.logging.warning(f"Failed to refresh the OCM access token (try {attempt}), it expires in {int(self.expires_in())} seconds: {err}")
+
+    def stop(self):
+        """
+        Stop the refresh thread and remove the snapshot, it holds the refresh token. The configuration of the logins gets
+        the last tokens, the refresh token may have been rotated, and the commands run after stop() use it again
+        """
+        self._stopped.set()
+        if self._thread is None:
+            return
+        self._thread.join()
+        self._thread = None
+        if self.refreshes:
+            try:
+                self._write_snapshot(self.source_path)
+            except OSError as err:
+                self.logging.warning(f"Failed to write the last OCM tokens on {self.source_path}: {err}")
+        if self.previous_config is None:
+            os.environ.pop("OCM_CONFIG", None)
+        else:
+            os.environ["OCM_CONFIG"] = self.previous_config
+        for path in (self.snapshot_path, self.snapshot_path + ".tmp"):
+            if os.path.exists(path):
+                os.remove(path)
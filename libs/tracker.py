@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Module to follow the progress of the clusters of a test from state change events instead of recounting them periodically
+"""
+import threading
+
+
+class ClusterTracker:
+    """
+    Incremental counters of cluster states, fed by the fleet pollers/informers (state changes) and by the install threads (finished installations).
+
+    expected: number of clusters of the test
+    ready_states: states considered as installed
+    error_states: states considered as failed
+    """
+
+    def __init__(self, logging, expected, ready_states=("ready",), error_states=("error",)):
+        self.logging = logging
+        self.expected = expected
+        self.ready_states = ready_states
+        self.error_states = error_states
+        self.states = {}
+        self.counters = {}
+        self.finished = {}
+        self.version = 0
+        self._condition = threading.Condition()
+
+    def update(self, cluster_name, state):
+        """Record the new state of a cluster. None means the cluster does not exist anymore"""
+        with self._condition:
+            previous = self.states.get(cluster_name)
+            if previous == state:
+                return
+            if previous is not None:
+                self.counters[previous] -= 1
+                if self.counters[previous] == 0:
+                    del self.counters[previous]
+            if state is None:
+                self.states.pop(cluster_name, None)
+            else:
+                self.states[cluster_name] = state
+                self.counters[state] = self.counters.get(state, 0) + 1
+            self._changed()
+
+    def finish(self, cluster_name, status):
+        """Record that the install thread of a cluster finished, with its final status"""
+        with self._condition:
+            self.finished[cluster_name] = status
+            self._changed()
+
+    def _changed(self):
+        # Called holding the condition lock
+        self.version += 1
+        self._condition.notify_all()
+
+    def ready(self):
+        with self._condition:
+            return sum(self.counters.get(state, 0) for state in self.ready_states)
+
+    def errors(self):
+        with self._condition:
+            return [cluster_name for cluster_name, state in self.states.items() if state in self.error_states]
+
+    def summary(self):
+        with self._condition:
+            return len(self.states), dict(self.counters), len(self.finished)
+
+    def is_done(self, wait_for_finished=False):
+        """
+        True when every cluster is ready (and its install thread finished when wait_for_finished),
+        or when every install thread finished, as no more progress can be expected then
+        """
+        with self._condition:
+            if len(self.finished) >= self.expected:
+                return True
+            ready = sum(self.counters.get(state, 0) for state in self.ready_states)
+            return ready >= self.expected and not wait_for_finished
+
+    def wait_for_change(self, version, timeout):
+        """Block until there is a change after version or the timeout expires. Returns the current version"""
+        with self._condition:
+            self._condition.wait_for(lambda: self.version != version, timeout=timeout)
+            return self.version
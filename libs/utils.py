@@ -9,8 +9,12 @@ import random
 import time
 import subprocess
 import threading
+import concurrent.futures
 from datetime import datetime, timedelta
 from git import Repo
+from libs import instrumentation
+from libs.journal import Journal
+from libs.scheduler import TokenBucket, WorkerPool
 
 
 class Utils:
@@ -29,6 +33,12 @@ class Utils:
             "clusters_deleted_failed": 0,
         }
         self._counter_lock = threading.Lock()
+        # Optional AsyncExecutor used by subprocess_exec instead of blocking Popen calls
+        self.executor = None
+        # Optional Journal recording the cluster state transitions
+        self.journal = None
+        # Gauges reported by the schedulers, keeping the last and the max observed value
+        self.gauges = {}
         # Pre-validated AZURE_PROM_TOKEN for ARO workloads
         self.azure_prom_token = None
 
@@ -42,6 +52,19 @@ class Utils:
             if counter_name in self.counters:
                 self.counters[counter_name] += value
 
+    def set_gauge(self, gauge_name, value):
+        """Thread-safe gauge update"""
+        with self._counter_lock:
+            gauge = self.gauges.setdefault(gauge_name, {"value": 0, "max": 0})
+            gauge["value"] = value
+            gauge["max"] = max(gauge["max"], value)
+        instrumentation.set_gauge(gauge_name, value)
+
+    def journal_record(self, cluster_name, fields):
+        """Record the state of a cluster on the journal, if enabled"""
+        if self.journal is not None:
+            self.journal.record(cluster_name, fields)
+
     def print_execution_summary(self, platform):
         """Print execution summary at the end of the run"""
         self.logging.info("=" * 60)
@@ -61,6 +84,10 @@ class Utils:
             success_rate = (created_success / requested) * 100
             self.logging.info(f"  * Success Rate:                  {success_rate:.1f}%")
 
+        if "install_in_flight" in self.gauges:
+            self.logging.info(f"  * Max Concurrent Installations:  {self.gauges['install_in_flight']['max']}")
+            self.logging.info(f"  * Max Install Queue Depth:       {self.gauges['install_queue_depth']['max']}")
+
         # Workload summary
         workload_success = self.counters["workloads_executed_success"]
         workload_failed = self.counters["workloads_executed_failed"]
@@ -104,6 +131,8 @@ class Utils:
 
         self.logging.info("=" * 60)
 
+        instrumentation.report(self.logging, platform.environment["path"])
+
     def disable_signals(self):
         signal.signal(signal.SIGINT, signal.SIG_IGN)
 
@@ -149,18 +178,24 @@ class Utils:
         extra_params: if defined, any extra param to be passed to Popen function in a mapping format. For example: extra_params={'cwd': '/tmp', 'universal_newlines': False}
 
         Function call example: exit_code, out, err = common._subprocess_exec("ls -l", extra_params={'cwd': '/tmp', 'universal_newlines': False})
+        When an executor is configured, the command runs on its event loop with its concurrency limits and timeouts
         """
         self.logging.debug(command)
         stdout = None
         stderr = None
+        start = time.monotonic()
         try:
-            log_file = open(output_file, "w") if output_file else subprocess.PIPE
-            if isinstance(command, list):
-                process = subprocess.Popen(command, stdout=log_file, stderr=log_file, **extra_params)
+            if self.executor is not None:
+                returncode, stdout, stderr = self.executor.execute(command, output_file, extra_params)
             else:
-                process = subprocess.Popen(command.split(), stdout=log_file, stderr=log_file, **extra_params)
-            stdout, stderr = process.communicate()
-            if process.returncode != 0 and log_output:
+                log_file = open(output_file, "w") if output_file else subprocess.PIPE
+                if isinstance(command, list):
+                    process = subprocess.Popen(command, stdout=log_file, stderr=log_file, **extra_params)
+                else:
+                    process = subprocess.Popen(command.split(), stdout=log_file, stderr=log_file, **extra_params)
+                stdout, stderr = process.communicate()
+                returncode = process.returncode
+            if returncode != 0 and log_output:
                 self.logging.error(f"Failed to execute command: {command}")
                 self.logging.error(stdout if stdout else "")
                 self.logging.error(stderr if stderr else "")
@@ -168,25 +203,37 @@ class Utils:
                     with open(output_file, "r") as log_read:
                         content = log_read.read()
                         self.logging.error(content)
-            return process.returncode, stdout, stderr
+            return returncode, stdout, stderr
         except Exception as err:
             self.logging.error(f"Error executing command: {command}")
             self.logging.error(str(err))
             self.logging.error(stdout if stdout else "")
             self.logging.error(stderr if stderr else "")
             return -1, None, None
-
-    def cleanup_scheduler(self, platform):
+        finally:
+            if instrumentation.enabled():
+                label = instrumentation.command_label(command)
+                instrumentation.observe("command", label, time.monotonic() - start)
+                instrumentation.increment("forks", label)
+                instrumentation.increment("output_bytes", label, len(stdout) if stdout else 0)
+
+    @instrumentation.timed("scheduler")
+    def cleanup_scheduler(self, platform, cluster_names=None):
         if platform.environment["wait_before_cleanup"] != 0:
             self.logging.info(f"Waiting {platform.environment['wait_before_cleanup']} minutes before starting the cluster deletion")
             time.sleep(platform.environment["wait_before_cleanup"] * 60)
+        cluster_names = cluster_names if cluster_names is not None else list(platform.environment["clusters"])
         self.logging.info(f"Attempting to start cleanup process of {len(platform.environment['clusters'])} clusters waiting {platform.environment['delay_between_cleanup']} seconds between each deletion")
         delete_cluster_thread_list = []
-        for cluster_name, cluster_info in platform.environment["clusters"].items():
+        for cluster_name in cluster_names:
+            cluster_info = platform.environment["clusters"][cluster_name]
             self.logging.info(f"Attempting to start cleanup process of {cluster_name} on status: {cluster_info['status']}")
+            if cluster_info.get("delete_finished"):
+                self.logging.info(f"Skipping cleanup of {cluster_name}, already finished on the resumed execution with status: {cluster_info['status']}")
+                continue
             try:
                 thread = threading.Thread(
-                    target=platform.delete_cluster, args=(platform, cluster_name)
+                    target=self._delete_cluster, args=(platform, cluster_name)
                 )
             except Exception as err:
                 self.logging.error("Thread creation failed")
@@ -194,6 +241,7 @@ class Utils:
             delete_cluster_thread_list.append(thread)
             thread.start()
             cluster_info["status"] = "deleting"
+            self.journal_record(cluster_name, {"status": "deleting"})
             self.logging.debug(
                 f"Number of alive threads {threading.active_count()}"
             )
@@ -204,29 +252,73 @@ class Utils:
                 time.sleep(platform.environment["delay_between_cleanup"])
         return delete_cluster_thread_list
 
+    @instrumentation.timed("cluster_operation")
+    def _delete_cluster(self, platform, cluster_name):
+        try:
+            platform.delete_cluster(platform, cluster_name)
+        finally:
+            # Deletions followed in background are recorded by the platform when they finish
+            if not platform.deletion_in_progress(cluster_name):
+                self.journal_record(cluster_name, {"status": platform.environment["clusters"][cluster_name]["status"], "delete_finished": True})
+
     # To form the cluster_info dict for cleanup funtions
     # It will be called only when --cleanup-clusters without --install-clusters
     def get_cluster_info(self, platform):
-        loop_counter = 0
-        while loop_counter < platform.environment["cluster_count"]:
-            loop_counter += 1
-            cluster_name = platform.environment["cluster_name_seed"] + "-" + str(loop_counter)
-            platform.environment["clusters"][cluster_name] = {}
-            platform.environment["clusters"][cluster_name]["metadata"] = platform.get_metadata(platform, cluster_name)
-
-            # Check if metadata retrieval failed (status not found or metadata_not_found)
-            metadata_status = platform.environment["clusters"][cluster_name]["metadata"].get("status")
-            if metadata_status is None or metadata_status == "metadata_not_found":
-                self.logging.warning(f"[{cluster_name}] Metadata not found after all retries, skipping this cluster")
-                platform.environment["clusters"][cluster_name]["status"] = "metadata_not_found"
-                continue
-
-            platform.environment["clusters"][cluster_name]["status"] = metadata_status
-            platform.environment["clusters"][cluster_name]["path"] = platform.environment["path"] + "/" + cluster_name
-            platform.environment["clusters"][cluster_name]["kubeconfig"] = platform.environment["clusters"][cluster_name]["path"] + "/kubeconfig"
-            platform.environment['clusters'][cluster_name]['workers'] = int(platform.environment["workers"].split(",")[(loop_counter - 1) % len(platform.environment["workers"].split(","))])
+        list(self.rehydrate_clusters(platform))
         return platform
 
+    def rehydrate_clusters(self, platform):
+        """
+        Obtain the metadata of every cluster of the seed in parallel, limited by --rehydrate-workers and --rehydrate-rate.
+        Requests start right away, the returned iterator yields the cluster names in the order their metadata arrives.
+        Closing the iterator before the end cancels the requests not started yet
+        """
+        names = [platform.environment["cluster_name_seed"] + "-" + str(loop_counter) for loop_counter in range(1, platform.environment["cluster_count"] + 1)]
+        journal_states = Journal.replay(self.logging, platform.environment["path"]) if platform.environment["resume"] else {}
+        for cluster_name in names:
+            # Entries are created in index order so the summary keeps listing the clusters in order
+            platform.environment["clusters"][cluster_name] = {"status": "rehydrating"}
+            if journal_states.get(cluster_name, {}).get("delete_finished"):
+                # Deleted on the resumed execution, it is neither rehydrated nor scheduled again
+                platform.environment["clusters"][cluster_name] = self._restore_cluster_info(journal_states[cluster_name])
+        names = [name for name in names if not journal_states.get(name, {}).get("delete_finished")]
+        rate_limiter = TokenBucket(platform.environment["rehydrate_rate"]) if platform.environment["rehydrate_rate"] else None
+        self.logging.info(f"Obtaining metadata of {len(names)} clusters with {platform.environment['rehydrate_workers']} workers")
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(1, platform.environment["rehydrate_workers"]), thread_name_prefix="rehydrate")
+        futures = [executor.submit(self._rehydrate_cluster, platform, cluster_name, index, rate_limiter) for index, cluster_name in enumerate(names)]
+        return self._completed_clusters(executor, futures)
+
+    def _completed_clusters(self, executor, futures):
+        try:
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    yield future.result()
+                except Exception as err:
+                    self.logging.error("Failed to obtain cluster metadata")
+                    self.logging.error(err)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @instrumentation.timed("cluster_operation")
+    def _rehydrate_cluster(self, platform, cluster_name, index, rate_limiter):
+        if rate_limiter is not None:
+            rate_limiter.acquire()
+        cluster_info = platform.environment["clusters"][cluster_name]
+        cluster_info["metadata"] = platform.get_metadata(platform, cluster_name)
+
+        # Check if metadata retrieval failed (status not found or metadata_not_found)
+        metadata_status = cluster_info["metadata"].get("status")
+        if metadata_status is None or metadata_status == "metadata_not_found":
+            self.logging.warning(f"[{cluster_name}] Metadata not found after all retries, skipping this cluster")
+            cluster_info["status"] = "metadata_not_found"
+            return cluster_name
+
+        cluster_info["path"] = platform.environment["path"] + "/" + cluster_name
+        cluster_info["kubeconfig"] = cluster_info["path"] + "/kubeconfig"
+        cluster_info['workers'] = int(platform.environment["workers"].split(",")[index % len(platform.environment["workers"].split(","))])
+        cluster_info["status"] = metadata_status
+        return cluster_name
+
     def validate_azure_prom_token(self, platform, phase="workload"):
         """Validate and load AZURE_PROM_TOKEN from file or environment variable."""
         if platform.environment.get("platform") != "aro":
@@ -266,15 +358,18 @@ class Utils:
         self.azure_prom_token = None
         return False
 
-    def load_scheduler(self, platform):
+    @instrumentation.timed("scheduler")
+    def load_scheduler(self, platform, cluster_names=None):
         load_thread_list = []
+        cluster_names = cluster_names if cluster_names is not None else list(platform.environment["clusters"])
         self.logging.info(f"Attempting to start {platform.environment['load']['executor']} {platform.environment['load']['workload']} load process on {len(platform.environment['clusters'])} clusters")
 
         # Validate AZURE_PROM_TOKEN for workload phase
         if platform.environment.get("platform") == "aro":
             self.validate_azure_prom_token(platform, phase="workload")
 
-        for cluster_name, cluster_info in platform.environment["clusters"].items():
+        for cluster_name in cluster_names:
+            cluster_info = platform.environment["clusters"][cluster_name]
             self.logging.debug(cluster_info)
             if cluster_info['status'] in ("ready", "installed", "Completed", "Succeeded"):
                 self.logging.info(f"Attempting to start load process on {cluster_name}")
@@ -292,6 +387,7 @@ class Utils:
                 self.increment_counter("workloads_skipped")
         return load_thread_list
 
+    @instrumentation.timed("scheduler")
     def install_scheduler(self, platform):
         self.logging.info(
             f"Attempting to start {platform.environment['cluster_count']} clusters with {platform.environment['batch_size']} batch size"
@@ -301,7 +397,19 @@ class Utils:
         if platform.environment.get("platform") == "aro":
             self.validate_azure_prom_token(platform, phase="install")
 
-        cluster_thread_list = []
+        concurrency = platform.environment["max_concurrency"]
+        if platform.environment["batch_size"] != 0 and platform.environment["delay_between_batch"] is None and concurrency == 0:
+            concurrency = platform.environment["batch_size"]
+        rate_limiter = None
+        if platform.environment["install_rate"]:
+            self.logging.info(f"Limiting cluster creation to {platform.environment['install_rate']} clusters per minute with a burst of {platform.environment['install_burst']}")
+            rate_limiter = TokenBucket(platform.environment["install_rate"], platform.environment["install_burst"])
+        if concurrency != 0:
+            self.logging.info(f"Limiting cluster creation to {concurrency} concurrent installations")
+        pool = WorkerPool(self.logging, "install", concurrency, rate_limiter, self.set_gauge)
+
+        journal_states = Journal.replay(self.logging, platform.environment["path"]) if platform.environment["resume"] else {}
+
         batch_count = 0
         loop_counter = 0
         try:
@@ -309,53 +417,87 @@ class Utils:
                 self.logging.debug(platform.environment["clusters"])
                 if self.force_terminate:
                     loop_counter += 1
+                    continue
+                if platform.environment["batch_size"] != 0 and platform.environment["delay_between_batch"] is not None and batch_count >= platform.environment["batch_size"]:
+                    time.sleep(platform.environment["delay_between_batch"])
+                    batch_count = 0
+                    continue
+                cluster_name = platform.environment["cluster_name_seed"] + "-" + str(loop_counter + 1)
+                journal_state = journal_states.get(cluster_name, {})
+                if journal_state.get("status") not in (None, "queued", "not started"):
+                    loop_counter += 1
+                    platform.environment["clusters"][cluster_name] = self._restore_cluster_info(journal_state)
+                    if journal_state.get("install_finished"):
+                        self.logging.info(f"Skipping installation of {cluster_name}, already finished on the resumed execution with status: {journal_state['status']}")
+                        platform.tracker.finish(cluster_name, journal_state["status"])
+                        continue
+                    batch_count += 1
+                    self.logging.info(f"Resuming installation of {cluster_name} on status: {journal_state['status']}")
+                    pool.submit(self._resume_cluster, (platform, cluster_name))
+                    continue
+                batch_count += 1
+                loop_counter += 1
+                self.increment_counter("clusters_requested")
+                if platform.environment["workers"].isdigit():
+                    cluster_workers = int(platform.environment["workers"])
                 else:
-                    create_cluster = False
-                    if platform.environment["batch_size"] != 0:
-                        if platform.environment["delay_between_batch"] is None:
-                            # We add 2 to the batch size. 1 for the main thread and 1 for the watcher
-                            while (platform.environment["batch_size"] + 2) <= threading.active_count():
-                                # Wait for thread count to drop before creating another
-                                time.sleep(1)
-                            loop_counter += 1
-                            create_cluster = True
-                        elif batch_count >= platform.environment["batch_size"]:
-                            time.sleep(platform.environment["delay_between_batch"])
-                            batch_count = 0
-                        else:
-                            batch_count += 1
-                            loop_counter += 1
-                            create_cluster = True
-                    else:
-                        loop_counter += 1
-                        create_cluster = True
-                    if create_cluster:
-                        self.increment_counter("clusters_requested")
-                        if platform.environment["workers"].isdigit():
-                            cluster_workers = int(platform.environment["workers"])
-                        else:
-                            cluster_workers = int(platform.environment["workers"].split(",")[(loop_counter - 1) % len(platform.environment["workers"].split(","))])
-                        cluster_name = platform.environment["cluster_name_seed"] + "-" + str(loop_counter)
-                        platform.environment["clusters"][cluster_name] = {}
-                        try:
-                            platform.environment["clusters"][cluster_name]["workers"] = cluster_workers
-                            platform.environment["clusters"][cluster_name]["workers_wait_time"] = platform.environment["workers_wait_time"]
-                            platform.environment["clusters"][cluster_name]["index"] = loop_counter - 1
-                            thread = threading.Thread(target=platform.create_cluster, args=(platform, cluster_name))
-                            platform.environment["clusters"][cluster_name]["status"] = "creating"
-                        except Exception as err:
-                            self.logging.error(f"Failed to create cluster {cluster_name}")
-                            self.logging.error(err)
-                            platform.environment["clusters"][cluster_name]["status"] = "thread_failed"
-                            self.increment_counter("clusters_created_failed")
-                        cluster_thread_list.append(thread)
-                        thread.start()
-                        self.logging.debug("Number of alive threads %d" % threading.active_count())
+                    cluster_workers = int(platform.environment["workers"].split(",")[(loop_counter - 1) % len(platform.environment["workers"].split(","))])
+                cluster_name = platform.environment["cluster_name_seed"] + "-" + str(loop_counter)
+                platform.environment["clusters"][cluster_name] = {}
+                platform.environment["clusters"][cluster_name]["workers"] = cluster_workers
+                platform.environment["clusters"][cluster_name]["workers_wait_time"] = platform.environment["workers_wait_time"]
+                platform.environment["clusters"][cluster_name]["index"] = loop_counter - 1
+                platform.environment["clusters"][cluster_name]["status"] = "queued"
+                self.journal_record(cluster_name, platform.environment["clusters"][cluster_name])
+                pool.submit(self._install_cluster, (platform, cluster_name))
+                self.logging.debug("Number of alive threads %d" % threading.active_count())
         except Exception as err:
             self.logging.error(err)
             self.logging.error("Thread creation failed")
-        return cluster_thread_list
+        pool.close()
+        return pool.threads
+
+    @instrumentation.timed("cluster_operation")
+    def _install_cluster(self, platform, cluster_name):
+        cluster_info = platform.environment["clusters"][cluster_name]
+        if self.force_terminate:
+            self.logging.warning(f"Not starting installation of {cluster_name} after capturing Ctrl-C")
+            cluster_info["status"] = "not started"
+            platform.tracker.finish(cluster_name, cluster_info["status"])
+            return
+        cluster_info["status"] = "creating"
+        self.journal_record(cluster_name, {"status": "creating"})
+        try:
+            platform.create_cluster(platform, cluster_name)
+        except Exception as err:
+            self.logging.error(f"Failed to create cluster {cluster_name}")
+            self.logging.error(err)
+            cluster_info["status"] = "thread_failed"
+            self.increment_counter("clusters_created_failed")
+        self.journal_record(cluster_name, dict(cluster_info, install_finished=True))
+        platform.tracker.finish(cluster_name, cluster_info["status"])
+
+    @instrumentation.timed("cluster_operation")
+    def _resume_cluster(self, platform, cluster_name):
+        cluster_info = platform.environment["clusters"][cluster_name]
+        if self.force_terminate:
+            self.logging.warning(f"Not resuming installation of {cluster_name} after capturing Ctrl-C")
+            platform.tracker.finish(cluster_name, cluster_info["status"])
+            return
+        try:
+            platform.resume_cluster(platform, cluster_name)
+        except Exception as err:
+            self.logging.error(f"Failed to resume cluster {cluster_name}")
+            self.logging.error(err)
+            cluster_info["status"] = "thread_failed"
+            self.increment_counter("clusters_created_failed")
+        self.journal_record(cluster_name, dict(cluster_info, install_finished=True))
+        platform.tracker.finish(cluster_name, cluster_info["status"])
+
+    def _restore_cluster_info(self, journal_state):
+        return {key: value for key, value in journal_state.items() if not key.startswith("journal_")}
 
+    @instrumentation.timed("cluster_operation")
     def cluster_load(self, platform, cluster_name, load=""):
         load_env = os.environ.copy()
         if 'cluster_start_time_on_mc' in platform.environment['clusters'][cluster_name]:
@@ -1,6 +1,7 @@
 import boto3
 import argparse
 import logging
+from concurrent.futures import ThreadPoolExecutor
 from botocore.exceptions import ClientError
 from typing import List, Dict
 
@@ -8,144 +9,155 @@ from typing import List, Dict
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
 
-def get_vpc_dependencies(ec2_client, elbv2_client, elb_client, vpc_id: str) -> Dict:
-    """Gathers all specified dependencies for a given VPC, including load balancers and endpoints."""
-    dependencies = {
-        "Subnets": [], "RouteTables": [], "InternetGateways": [],
-        "NatGateways": [], "NetworkAcls": [], "SecurityGroups": [],
-        "LoadBalancersV2": [], "TargetGroups": [], "ClassicLoadBalancers": [],
-        "VpcEndpoints": []
-    }
-    try:
-        # Standard VPC resources
-        dependencies["Subnets"] = ec2_client.describe_subnets(Filters=[{'Name': 'vpc-id', 'Values': [vpc_id]}])['Subnets']
-        dependencies["RouteTables"] = ec2_client.describe_route_tables(Filters=[{'Name': 'vpc-id', 'Values': [vpc_id]}])['RouteTables']
-        dependencies["InternetGateways"] = ec2_client.describe_internet_gateways(Filters=[{'Name': 'attachment.vpc-id', 'Values': [vpc_id]}])['InternetGateways']
-        dependencies["NatGateways"] = ec2_client.describe_nat_gateways(Filters=[{'Name': 'vpc-id', 'Values': [vpc_id]}])['NatGateways']
-        dependencies["NetworkAcls"] = ec2_client.describe_network_acls(Filters=[{'Name': 'vpc-id', 'Values': [vpc_id]}])['NetworkAcls']
-        dependencies["SecurityGroups"] = ec2_client.describe_security_groups(Filters=[{'Name': 'vpc-id', 'Values': [vpc_id]}])['SecurityGroups']
-        dependencies["VpcEndpoints"] = ec2_client.describe_vpc_endpoints(Filters=[{'Name': 'vpc-id', 'Values': [vpc_id]}])['VpcEndpoints']
-
-        # Load Balancer resources
-        # Note: describe calls for LBs don't have a direct VPC filter, so we filter post-call.
-        all_lbs_v2 = elbv2_client.describe_load_balancers().get('LoadBalancers', [])
-        dependencies["LoadBalancersV2"] = [lb for lb in all_lbs_v2 if lb.get('VpcId') == vpc_id]
-
-        all_tgs = elbv2_client.describe_target_groups().get('TargetGroups', [])
-        dependencies["TargetGroups"] = [tg for tg in all_tgs if tg.get('VpcId') == vpc_id]
-
-        all_clbs = elb_client.describe_load_balancers().get('LoadBalancerDescriptions', [])
-        dependencies["ClassicLoadBalancers"] = [clb for clb in all_clbs if clb.get('VPCId') == vpc_id]
-
-    except ClientError as e:
-        logging.error(f"Could not retrieve dependencies for {vpc_id}: {e}")
-    return dependencies
+# Dependency types of a VPC: (client, operation, result key, field holding the VPC ID).
+# EC2 operations are filtered by VPC ID on the API, load balancers have no VPC filter and are listed once for the whole region.
+DEPENDENCY_SOURCES = {
+    "Subnets": ("ec2", "describe_subnets", "Subnets", "VpcId"),
+    "RouteTables": ("ec2", "describe_route_tables", "RouteTables", "VpcId"),
+    "InternetGateways": ("ec2", "describe_internet_gateways", "InternetGateways", "attachment.vpc-id"),
+    "NatGateways": ("ec2", "describe_nat_gateways", "NatGateways", "VpcId"),
+    "NetworkAcls": ("ec2", "describe_network_acls", "NetworkAcls", "VpcId"),
+    "SecurityGroups": ("ec2", "describe_security_groups", "SecurityGroups", "VpcId"),
+    "LoadBalancersV2": ("elbv2", "describe_load_balancers", "LoadBalancers", "VpcId"),
+    "TargetGroups": ("elbv2", "describe_target_groups", "TargetGroups", "VpcId"),
+    "ClassicLoadBalancers": ("elb", "describe_load_balancers", "LoadBalancerDescriptions", "VPCId"),
+    "VpcEndpoints": ("ec2", "describe_vpc_endpoints", "VpcEndpoints", "VpcId"),
+}
+
+# Maximum number of values of an EC2 filter
+FILTER_VALUES = 200
+
+
+def paginate(client, operation: str, result_key: str, **kwargs) -> List[Dict]:
+    """Returns the items of every page of a describe call."""
+    items = []
+    for page in client.get_paginator(operation).paginate(**kwargs):
+        items.extend(page.get(result_key, []))
+    return items
+
+
+def _item_vpc_ids(item: Dict, vpc_field: str) -> List[str]:
+    if vpc_field == "attachment.vpc-id":
+        return [attachment.get('VpcId') for attachment in item.get('Attachments', [])]
+    return [item.get(vpc_field)]
+
+
+def get_dependency_index(ec2_client, elbv2_client, elb_client, vpc_ids: List[str]) -> Dict[str, Dict]:
+    """Gathers the dependencies of all the VPCs in a single pass over the region, grouped by VPC ID."""
+    clients = {"ec2": ec2_client, "elbv2": elbv2_client, "elb": elb_client}
+    index = {vpc_id: {dep_type: [] for dep_type in DEPENDENCY_SOURCES} for vpc_id in vpc_ids}
+    for dep_type, (client_name, operation, result_key, vpc_field) in DEPENDENCY_SOURCES.items():
+        try:
+            if client_name == "ec2":
+                filter_name = vpc_field if vpc_field == "attachment.vpc-id" else "vpc-id"
+                items = []
+                for chunk in range(0, len(vpc_ids), FILTER_VALUES):
+                    items.extend(paginate(clients[client_name], operation, result_key, Filters=[{'Name': filter_name, 'Values': vpc_ids[chunk:chunk + FILTER_VALUES]}]))
+            else:
+                items = paginate(clients[client_name], operation, result_key)
+        except ClientError as e:
+            logging.error(f"Could not retrieve {dep_type} of the region: {e}")
+            continue
+        for item in items:
+            for vpc_id in _item_vpc_ids(item, vpc_field):
+                if vpc_id in index:
+                    index[vpc_id][dep_type].append(item)
+    return index
 
 
-def delete_vpc_and_dependencies(ec2_client, elbv2_client, elb_client, vpc_id: str, dependencies: Dict, dry_run: bool):
-    """
-    Deletes a VPC and its dependencies in the correct, robust order.
-    """
-    logging.info(f"--- Processing VPC for deletion: {vpc_id} ---")
-
-    # Step 1: Delete Load Balancers and Target Groups
+def delete_load_balancers_v2(ec2_client, elbv2_client, elb_client, vpc_id: str, dependencies: Dict, dry_run: bool):
     # These often have network interfaces in the subnets and must be deleted first.
     lb_v2_arns = [lb['LoadBalancerArn'] for lb in dependencies['LoadBalancersV2']]
     if lb_v2_arns:
         for arn in lb_v2_arns:
-            logging.info(f"Deleting Load Balancer (v2/ALB/NLB): {arn}")
+            logging.info(f"[{vpc_id}] Deleting Load Balancer (v2/ALB/NLB): {arn}")
             if not dry_run:
                 try:
                     elbv2_client.delete_load_balancer(LoadBalancerArn=arn)
                 except ClientError as e:
-                    logging.error(f"Could not delete Load Balancer {arn}: {e}")
+                    logging.error(f"[{vpc_id}] Could not delete Load Balancer {arn}: {e}")
             else:
-                logging.info(f"[DRY RUN] Would delete Load Balancer (v2): {arn}")
+                logging.info(f"[{vpc_id}] [DRY RUN] Would delete Load Balancer (v2): {arn}")
         if not dry_run and lb_v2_arns:
-            logging.info("Waiting for v2 Load Balancer(s) to be deleted...")
+            logging.info(f"[{vpc_id}] Waiting for v2 Load Balancer(s) to be deleted...")
             try:
                 waiter = elbv2_client.get_waiter('load_balancers_deleted')
                 waiter.wait(LoadBalancerArns=lb_v2_arns, WaiterConfig={'Delay': 15, 'MaxAttempts': 40})
-                logging.info("Load Balancer(s) (v2) successfully deleted.")
+                logging.info(f"[{vpc_id}] Load Balancer(s) (v2) successfully deleted.")
             except Exception as e:
-                logging.error(f"Error waiting for v2 load balancers to delete: {e}")
+                logging.error(f"[{vpc_id}] Error waiting for v2 load balancers to delete: {e}")
 
+    # Target Groups can only be deleted once the Load Balancers using them are gone
     tg_arns = [tg['TargetGroupArn'] for tg in dependencies['TargetGroups']]
     if tg_arns:
         for arn in tg_arns:
-            logging.info(f"Deleting Target Group: {arn}")
+            logging.info(f"[{vpc_id}] Deleting Target Group: {arn}")
             if not dry_run:
                 try:
                     elbv2_client.delete_target_group(TargetGroupArn=arn)
                 except ClientError as e:
-                    logging.error(f"Could not delete Target Group {arn}: {e}")
+                    logging.error(f"[{vpc_id}] Could not delete Target Group {arn}: {e}")
             else:
-                logging.info(f"[DRY RUN] Would delete Target Group: {arn}")
+                logging.info(f"[{vpc_id}] [DRY RUN] Would delete Target Group: {arn}")
+
 
+def delete_classic_load_balancers(ec2_client, elbv2_client, elb_client, vpc_id: str, dependencies: Dict, dry_run: bool):
     clb_names = [clb['LoadBalancerName'] for clb in dependencies['ClassicLoadBalancers']]
     if clb_names:
         for name in clb_names:
-            logging.info(f"Deleting Classic Load Balancer: {name}")
+            logging.info(f"[{vpc_id}] Deleting Classic Load Balancer: {name}")
             if not dry_run:
                 try:
                     elb_client.delete_load_balancer(LoadBalancerName=name)
                 except ClientError as e:
-                    logging.error(f"Could not delete Classic Load Balancer {name}: {e}")
+                    logging.error(f"[{vpc_id}] Could not delete Classic Load Balancer {name}: {e}")
             else:
-                logging.info(f"[DRY RUN] Would delete Classic Load Balancer: {name}")
+                logging.info(f"[{vpc_id}] [DRY RUN] Would delete Classic Load Balancer: {name}")
 
-    # Step 2: High-level networking (NAT Gateways, Endpoints, etc.)
+
+def delete_nat_gateways(ec2_client, elbv2_client, elb_client, vpc_id: str, dependencies: Dict, dry_run: bool):
     nat_gateway_ids = [ng['NatGatewayId'] for ng in dependencies['NatGateways'] if ng['State'] != 'deleted']
     if nat_gateway_ids:
         for ng_id in nat_gateway_ids:
-            logging.info(f"Deleting NAT Gateway: {ng_id}")
+            logging.info(f"[{vpc_id}] Deleting NAT Gateway: {ng_id}")
             if not dry_run:
                 try:
                     ec2_client.delete_nat_gateway(NatGatewayId=ng_id)
                 except ClientError as e:
-                    logging.error(f"Could not delete NAT Gateway {ng_id}: {e}")
+                    logging.error(f"[{vpc_id}] Could not delete NAT Gateway {ng_id}: {e}")
             else:
-                logging.info(f"[DRY RUN] Would delete NAT Gateway: {ng_id}")
+                logging.info(f"[{vpc_id}] [DRY RUN] Would delete NAT Gateway: {ng_id}")
         if not dry_run:
-            logging.info("Waiting for NAT Gateway(s) to be deleted...")
+            logging.info(f"[{vpc_id}] Waiting for NAT Gateway(s) to be deleted...")
             try:
                 waiter = ec2_client.get_waiter('nat_gateway_deleted')
                 waiter.wait(NatGatewayIds=nat_gateway_ids, WaiterConfig={'Delay': 15, 'MaxAttempts': 40})
-                logging.info("NAT Gateway(s) successfully deleted.")
+                logging.info(f"[{vpc_id}] NAT Gateway(s) successfully deleted.")
             except Exception as e:
-                logging.error(f"Error waiting for NAT gateways to delete: {e}")
+                logging.error(f"[{vpc_id}] Error waiting for NAT gateways to delete: {e}")
+
 
+def delete_vpc_endpoints(ec2_client, elbv2_client, elb_client, vpc_id: str, dependencies: Dict, dry_run: bool):
     vpc_endpoint_ids = [ep['VpcEndpointId'] for ep in dependencies['VpcEndpoints']]
     if vpc_endpoint_ids:
-        logging.info(f"Deleting {len(vpc_endpoint_ids)} VPC Endpoint(s)...")
+        logging.info(f"[{vpc_id}] Deleting {len(vpc_endpoint_ids)} VPC Endpoint(s)...")
         if not dry_run:
             try:
                 ec2_client.delete_vpc_endpoints(VpcEndpointIds=vpc_endpoint_ids)
-                logging.info("Successfully initiated deletion for VPC Endpoint(s).")
+                logging.info(f"[{vpc_id}] Successfully initiated deletion for VPC Endpoint(s).")
             except ClientError as e:
-                logging.error(f"Could not delete VPC Endpoints: {e}")
+                logging.error(f"[{vpc_id}] Could not delete VPC Endpoints: {e}")
         else:
             for ep_id in vpc_endpoint_ids:
-                logging.info(f"[DRY RUN] Would delete VPC Endpoint: {ep_id}")
+                logging.info(f"[{vpc_id}] [DRY RUN] Would delete VPC Endpoint: {ep_id}")
 
-    # Step 3: Detach and Delete Gateways
-    for igw in dependencies['InternetGateways']:
-        igw_id = igw['InternetGatewayId']
-        logging.info(f"Detaching and deleting Internet Gateway: {igw_id}")
-        if not dry_run:
-            try:
-                ec2_client.detach_internet_gateway(InternetGatewayId=igw_id, VpcId=vpc_id)
-                ec2_client.delete_internet_gateway(InternetGatewayId=igw_id)
-            except ClientError as e:
-                logging.error(f"Could not delete IGW {igw_id}: {e}")
-        else:
-            logging.info(f"[DRY RUN] Would detach and delete Internet Gateway: {igw_id}")
 
-    # Step 4: Revoke Security Group Rules
-    non_default_sgs = [sg for sg in dependencies['SecurityGroups'] if sg['GroupName'] != 'default']
-    for sg in non_default_sgs:
+def revoke_security_group_rules(ec2_client, elbv2_client, elb_client, vpc_id: str, dependencies: Dict, dry_run: bool):
+    for sg in dependencies['SecurityGroups']:
+        if sg['GroupName'] == 'default':
+            continue
         sg_id = sg['GroupId']
-        logging.info(f"Revoking all rules from Security Group: {sg_id}")
+        logging.info(f"[{vpc_id}] Revoking all rules from Security Group: {sg_id}")
         if not dry_run:
             try:
                 if sg.get('IpPermissions'):
@@ -153,61 +165,111 @@ def delete_vpc_and_dependencies(ec2_client, elbv2_client, elb_client, vpc_id: st
                 if sg.get('IpPermissionsEgress'):
                     ec2_client.revoke_security_group_egress(GroupId=sg_id, IpPermissions=sg['IpPermissionsEgress'])
             except ClientError as e:
-                logging.error(f"Could not revoke rules from SG {sg_id}: {e}")
+                logging.error(f"[{vpc_id}] Could not revoke rules from SG {sg_id}: {e}")
+        else:
+            logging.info(f"[{vpc_id}] [DRY RUN] Would revoke all ingress/egress rules from {sg_id}")
+
+
+def delete_internet_gateways(ec2_client, elbv2_client, elb_client, vpc_id: str, dependencies: Dict, dry_run: bool):
+    # Public addresses of NAT Gateways and Load Balancers block the detach, they are deleted on the previous phase
+    for igw in dependencies['InternetGateways']:
+        igw_id = igw['InternetGatewayId']
+        logging.info(f"[{vpc_id}] Detaching and deleting Internet Gateway: {igw_id}")
+        if not dry_run:
+            try:
+                ec2_client.detach_internet_gateway(InternetGatewayId=igw_id, VpcId=vpc_id)
+                ec2_client.delete_internet_gateway(InternetGatewayId=igw_id)
+            except ClientError as e:
+                logging.error(f"[{vpc_id}] Could not delete IGW {igw_id}: {e}")
         else:
-            logging.info(f"[DRY RUN] Would revoke all ingress/egress rules from {sg_id}")
+            logging.info(f"[{vpc_id}] [DRY RUN] Would detach and delete Internet Gateway: {igw_id}")
 
-    # Step 5: Delete non-default Security Groups
-    for sg in non_default_sgs:
+
+def delete_security_groups(ec2_client, elbv2_client, elb_client, vpc_id: str, dependencies: Dict, dry_run: bool):
+    for sg in dependencies['SecurityGroups']:
+        if sg['GroupName'] == 'default':
+            continue
         sg_id = sg['GroupId']
-        logging.info(f"Deleting Security Group: {sg_id}")
+        logging.info(f"[{vpc_id}] Deleting Security Group: {sg_id}")
         if not dry_run:
             try:
                 ec2_client.delete_security_group(GroupId=sg_id)
             except ClientError as e:
-                logging.error(f"Could not delete Security Group {sg_id}. It may still be in use by a resource: {e}")
+                logging.error(f"[{vpc_id}] Could not delete Security Group {sg_id}. It may still be in use by a resource: {e}")
         else:
-            logging.info(f"[DRY RUN] Would delete Security Group: {sg_id}")
+            logging.info(f"[{vpc_id}] [DRY RUN] Would delete Security Group: {sg_id}")
+
 
-    # Step 6: Delete Network ACLs (non-default)
+def delete_network_acls(ec2_client, elbv2_client, elb_client, vpc_id: str, dependencies: Dict, dry_run: bool):
     for nacl in dependencies['NetworkAcls']:
         if not nacl['IsDefault']:
             nacl_id = nacl['NetworkAclId']
-            logging.info(f"Deleting Network ACL: {nacl_id}")
+            logging.info(f"[{vpc_id}] Deleting Network ACL: {nacl_id}")
             if not dry_run:
                 try:
                     ec2_client.delete_network_acl(NetworkAclId=nacl_id)
                 except ClientError as e:
-                    logging.error(f"Could not delete Network ACL {nacl_id}: {e}")
+                    logging.error(f"[{vpc_id}] Could not delete Network ACL {nacl_id}: {e}")
             else:
-                logging.info(f"[DRY RUN] Would delete Network ACL: {nacl_id}")
+                logging.info(f"[{vpc_id}] [DRY RUN] Would delete Network ACL: {nacl_id}")
+
 
-    # Step 7: Delete Subnets
+def delete_subnets(ec2_client, elbv2_client, elb_client, vpc_id: str, dependencies: Dict, dry_run: bool):
     for subnet in dependencies['Subnets']:
         subnet_id = subnet['SubnetId']
-        logging.info(f"Deleting Subnet: {subnet_id}")
+        logging.info(f"[{vpc_id}] Deleting Subnet: {subnet_id}")
         if not dry_run:
             try:
                 ec2_client.delete_subnet(SubnetId=subnet_id)
             except ClientError as e:
-                logging.error(f"Could not delete Subnet {subnet_id}: {e}")
+                logging.error(f"[{vpc_id}] Could not delete Subnet {subnet_id}: {e}")
         else:
-            logging.info(f"[DRY RUN] Would delete Subnet: {subnet_id}")
+            logging.info(f"[{vpc_id}] [DRY RUN] Would delete Subnet: {subnet_id}")
 
-    # Step 8: Delete Route Tables (non-main)
+
+def delete_route_tables(ec2_client, elbv2_client, elb_client, vpc_id: str, dependencies: Dict, dry_run: bool):
     for rt in dependencies['RouteTables']:
         if not any(assoc.get('Main', False) for assoc in rt['Associations']):
             rt_id = rt['RouteTableId']
-            logging.info(f"Deleting Route Table: {rt_id}")
+            logging.info(f"[{vpc_id}] Deleting Route Table: {rt_id}")
             if not dry_run:
                 try:
                     ec2_client.delete_route_table(RouteTableId=rt_id)
                 except ClientError as e:
-                    logging.error(f"Could not delete Route Table {rt_id}: {e}")
+                    logging.error(f"[{vpc_id}] Could not delete Route Table {rt_id}: {e}")
             else:
-                logging.info(f"[DRY RUN] Would delete Route Table: {rt_id}")
+                logging.info(f"[{vpc_id}] [DRY RUN] Would delete Route Table: {rt_id}")
+
+
+# Deletion order of the dependencies. The steps of a phase do not depend on each other and run in parallel,
+# a phase starts once every step of the previous one finished.
+DELETE_PHASES = [
+    # Step 1: Load Balancers, NAT Gateways and Endpoints hold network interfaces and public addresses on the subnets
+    [delete_load_balancers_v2, delete_classic_load_balancers, delete_nat_gateways, delete_vpc_endpoints, revoke_security_group_rules],
+    # Step 2: Gateways, Security Groups and Network ACLs
+    [delete_internet_gateways, delete_security_groups, delete_network_acls],
+    # Step 3: Subnets, their route table associations go with them
+    [delete_subnets],
+    # Step 4: Route Tables (non-main)
+    [delete_route_tables],
+]
 
-    # Step 9: Finally, the VPC itself
+
+def delete_vpc_and_dependencies(ec2_client, elbv2_client, elb_client, vpc_id: str, dependencies: Dict, dry_run: bool):
+    """
+    Deletes a VPC and its dependencies in the correct, robust order.
+    """
+    logging.info(f"--- Processing VPC for deletion: {vpc_id} ---")
+
+    for phase in DELETE_PHASES:
+        with ThreadPoolExecutor(max_workers=len(phase)) as executor:
+            for future in [executor.submit(step, ec2_client, elbv2_client, elb_client, vpc_id, dependencies, dry_run) for step in phase]:
+                try:
+                    future.result()
+                except Exception as e:
+                    logging.error(f"Unexpected error cleaning up VPC '{vpc_id}': {e}")
+
+    # Step 5: Finally, the VPC itself
     logging.info(f"Attempting to delete VPC: {vpc_id}")
     if not dry_run:
         try:
@@ -226,8 +288,7 @@ def find_vpcs(ec2_client, vpc_id: str = None, name_contains: str = None) -> List
     elif name_contains:
         filters.append({'Name': 'tag:Name', 'Values': [f'*{name_contains}*']})
     try:
-        response = ec2_client.describe_vpcs(Filters=filters)
-        return response.get('Vpcs', [])
+        return paginate(ec2_client, 'describe_vpcs', 'Vpcs', Filters=filters)
     except ClientError as e:
         logging.error(f"An AWS API error occurred while searching for VPCs: {e}")
         return []
@@ -253,6 +314,7 @@ def main():
     parser.add_argument("--region", type=str, required=True, help="The AWS region to operate in.")
     parser.add_argument("--delete", action="store_true", help="Enable deletion mode. Without this flag, the script is read-only.")
     parser.add_argument("--dry-run", action="store_true", help="Simulate deletion. Only works if --delete is also specified.")
+    parser.add_argument("--workers", type=int, default=10, help="Number of VPCs deleted at the same time.")
     args = parser.parse_args()
 
     # Create Boto3 clients
@@ -266,12 +328,13 @@ def main():
         return
 
     logging.info(f"Found {len(vpcs_to_process)} VPC(s) to process.")
+    dependency_index = get_dependency_index(ec2_client, elbv2_client, elb_client, [vpc['VpcId'] for vpc in vpcs_to_process])
     for vpc in vpcs_to_process:
         vpc_id = vpc['VpcId']
         vpc_name = next((tag['Value'] for tag in vpc.get('Tags', []) if tag['Key'] == 'Name'), 'N/A')
         print("\n" + "="*60 + f"\nVPC Name: {vpc_name} | ID: {vpc_id}\n" + "="*60)
 
-        dependencies = get_vpc_dependencies(ec2_client, elbv2_client, elb_client, vpc_id)
+        dependencies = dependency_index[vpc_id]
         for dep_type, dep_list in dependencies.items():
             print(f"  > Found {len(dep_list)} {dep_type}:")
             if dep_list:
@@ -293,10 +356,14 @@ def main():
     else:
         logging.warning("\n--- DELETE MODE ENABLED --- Proceeding with resource deletion.\n")
 
-    for vpc in vpcs_to_process:
-        vpc_id = vpc['VpcId']
-        dependencies = get_vpc_dependencies(ec2_client, elbv2_client, elb_client, vpc_id)
-        delete_vpc_and_dependencies(ec2_client, elbv2_client, elb_client, vpc_id, dependencies, args.dry_run)
+    # VPCs do not depend on each other, they are deleted in parallel with the dependencies found by the index
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        futures = {executor.submit(delete_vpc_and_dependencies, ec2_client, elbv2_client, elb_client, vpc['VpcId'], dependency_index[vpc['VpcId']], args.dry_run): vpc['VpcId'] for vpc in vpcs_to_process}
+        for future, vpc_id in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                logging.error(f"❌ Failed to clean up VPC '{vpc_id}': {e}")
 
 
 if __name__ == '__main__':